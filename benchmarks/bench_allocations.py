@@ -0,0 +1,75 @@
+# 扫描路径内存分配基准: 每次扫描新建数组的旧路径 vs 工作区缓冲复用;
+# 用 tracemalloc 统计每次扫描的瞬时内存峰值 (含 scipy 卷积/递推内部临时数组) 与扫描结束后的净增长
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.workspace import release
+
+SWEEPS = 50
+ROUNDS = 10
+
+
+def legacy_sweep(engine):
+    # 工作区之前的写法: 网格/噪声/滤波输出/保持/平均每次扫描都新分配
+    band = engine.current_band
+    freq = np.linspace(band["min"], band["max"], engine.sweep_points)
+    psd = engine.noise_floor + engine.rng.normal(0, 1, len(freq))
+    engine.templates.update(freq, engine.carrier_configs, engine.noise_floor)
+    psd = engine.apply_rb_vb_filtering(engine.templates.apply(psd, engine.rng))
+    max_hold = np.maximum(engine.max_hold, psd) if engine.max_hold is not None else psd.copy()
+    engine.max_hold, engine.min_hold = max_hold, max_hold.copy()
+    return engine.averager.push(psd)
+
+
+def timing(cases):
+    # 两种方式分轮交替计时, 取各自的中位数, 减少机器负载波动的影响; 与界面一样, 每帧用完即归还其缓冲
+    for func, engine in cases:
+        for _ in range(5):
+            release(func(engine))
+    rounds = [[] for _ in cases]
+    for _ in range(ROUNDS):
+        for times, (func, engine) in zip(rounds, cases):
+            t0 = time.perf_counter()
+            for _ in range(SWEEPS // ROUNDS):
+                release(func(engine))
+            times.append((time.perf_counter() - t0) / (SWEEPS // ROUNDS) * 1000)
+    return [float(np.median(times)) for times in rounds]
+
+
+def peak_memory(func, engine):
+    tracemalloc.start()
+    peaks = []
+    for _ in range(SWEEPS):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        result = func(engine)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start)
+        release(result)
+    tracemalloc.stop()
+    return np.median(peaks) / 1e6
+
+
+def main():
+    print(f"{'点数':>9} {'方式':<6} {'ms/次':>8} {'瞬时峰值(MB)':>12} {'末次扫描分配':>10}")
+    for n in (100_000, 1_000_000):
+        cases = []
+        for func in (legacy_sweep, SpectrumEngine.sweep):
+            engine = SpectrumEngine(sweep_points=n, seed=0)
+            engine.avg_enabled = True
+            cases.append((func, engine))
+        for (func, engine), name, elapsed in zip(cases, ("旧路径", "工作区"), timing(cases)):
+            peak_mb = peak_memory(func, engine)
+            last = engine.workspace.last_allocations if func is SpectrumEngine.sweep else "-"
+            print(f"{n:>9} {name:<6} {elapsed:>8.2f} {peak_mb:>12.1f} {last:>10}")
+
+
+if __name__ == "__main__":
+    main()
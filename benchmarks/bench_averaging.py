@@ -0,0 +1,55 @@
+# 轨迹平均基准: 列表 + np.mean 的旧实现 vs 流式滑动窗口/指数平均, 输出每次扫描耗时
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.averaging import Averager
+
+
+class LegacyAverager:
+    def __init__(self, count):
+        self.count = count
+        self.data = []
+
+    def push(self, psd):
+        self.data.append(psd)
+        if len(self.data) > self.count:
+            self.data.pop(0)
+        return np.mean(self.data, axis=0)
+
+
+def ms_per_sweep(avg, sweeps, min_time=1.0):
+    for psd in sweeps:
+        avg.push(psd)
+    reps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < min_time:
+        avg.push(sweeps[reps % len(sweeps)])
+        reps += 1
+    return (time.perf_counter() - t0) / reps * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    sweeps = [-110 + rng.normal(0, 1, n) for _ in range(8)]
+    print(f"{'次数':>6} {'旧实现(ms)':>10} {'滑动窗口(ms)':>12} {'指数(ms)':>9} {'加速比':>7} {'最大误差(dB)':>12}")
+    for count in (5, 50, 500):
+        legacy = LegacyAverager(count)
+        window = Averager(count, "window", "log")
+        for i in range(count + 3):
+            ref = legacy.push(sweeps[i % len(sweeps)])
+            out = window.push(sweeps[i % len(sweeps)])
+        err = np.max(np.abs(out - ref))
+        old = ms_per_sweep(LegacyAverager(count), sweeps)
+        new = ms_per_sweep(Averager(count, "window", "log"), sweeps)
+        exp = ms_per_sweep(Averager(count, "exp", "log"), sweeps)
+        print(f"{count:>6} {old:>10.2f} {new:>12.2f} {exp:>9.2f} {old / new:>7.1f} {err:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
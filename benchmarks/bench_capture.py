@@ -0,0 +1,54 @@
+# 采集写入基准: 内存映射采集文件 vs 原始 tofile 写带宽, 1M 点/次扫描
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.capture import CaptureWriter, read_header
+from satmon.satellites import CHINASAT_SATELLITES
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--sweeps", type=int, default=200)
+    parser.add_argument("--dir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    psd = -110 + rng.normal(0, 1, args.points)
+    freq = np.linspace(3700, 4200, args.points)
+    path = os.path.join(args.dir, "bench_capture.satcap")
+    raw_path = os.path.join(args.dir, "bench_capture.raw")
+
+    t0 = time.perf_counter()
+    writer = CaptureWriter(path, args.points, CHINASAT_SATELLITES)
+    for i in range(args.sweeps):
+        writer.append(writer.stamp(), 2, 0, 1000.0, 100.0, freq[0], freq[-1], psd)
+    writer.close()
+    elapsed = time.perf_counter() - t0
+    size = os.path.getsize(path)
+
+    psd32 = psd.astype(np.float32)
+    t0 = time.perf_counter()
+    with open(raw_path, "wb") as f:
+        for i in range(args.sweeps):
+            psd32.tofile(f)
+    raw_elapsed = time.perf_counter() - t0
+    raw_size = os.path.getsize(raw_path)
+
+    _, n_points, count, _ = read_header(path)
+    print(f"点数 {n_points}, 记录 {count}, 文件 {size / 1e6:.1f} MB")
+    print(f"采集文件: {args.sweeps / elapsed:8.1f} 次扫描/秒  {size / elapsed / 1e6:8.1f} MB/s")
+    print(f"原始写入: {args.sweeps / raw_elapsed:8.1f} 次扫描/秒  {raw_size / raw_elapsed / 1e6:8.1f} MB/s")
+    os.remove(path)
+    os.remove(raw_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# 载波目录基准: 10 万载波的 CSV 加载与建索引耗时, 区间索引查询 vs 逐载波扫描, 按名称查找
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.catalog import Catalog
+from satmon.synthesis import carrier_window
+
+N_CARRIERS = 100_000
+N_SATELLITES = 50
+F_MIN, F_MAX = 3400.0, 30000.0
+MODULATIONS = ("QPSK", "8PSK", "DVB-S2", "QAM", "FM")
+
+
+def write_catalog(path, n, rng):
+    freq = rng.uniform(F_MIN, F_MAX, n)
+    bw = np.round(rng.lognormal(1.0, 1.0, n).clip(0.1, 250), 3)
+    power = rng.uniform(-70, -30, n)
+    sat = rng.integers(0, N_SATELLITES, n)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("satellite", "name", "freq", "bw", "power", "modulation"))
+        for i in range(n):
+            writer.writerow((f"卫星{sat[i]:02d}", f"载波{i}", f"{freq[i]:.4f}", bw[i], f"{power[i]:.1f}", MODULATIONS[i % len(MODULATIONS)]))
+
+
+def linear(carriers, lo, hi):
+    # 旧实现: 每次对该卫星全部载波计算窗口并逐个判断
+    return [c for c in carriers if carrier_window(c)[1] > lo and carrier_window(c)[0] < hi]
+
+
+def ms_per_call(func, reps):
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        func()
+    return (time.perf_counter() - t0) / reps * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.csv")
+        write_catalog(path, N_CARRIERS, rng)
+        t0 = time.perf_counter()
+        catalog = Catalog.load(path)
+        print(f"加载 {len(catalog)} 个载波 / {len(catalog.names)} 颗卫星: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    carriers = catalog.satellites[0]["carriers"]
+    print(f"{'跨度(MHz)':>10} {'命中':>6} {'索引(ms)':>9} {'逐个(ms)':>9} {'全目录索引(ms)':>14}")
+    for span in (1.0, 10.0, 100.0, 1000.0):
+        centres = rng.uniform(F_MIN, F_MAX - span, 20)
+        hits = np.mean([len(catalog.overlapping(c, c + span, sat=0)) for c in centres])
+        it = iter(np.tile(centres, 1000))
+        indexed = ms_per_call(lambda: catalog.overlapping(c := next(it), c + span, sat=0), 200)
+        scan = ms_per_call(lambda: linear(carriers, centres[0], centres[0] + span), 5)
+        whole = ms_per_call(lambda: catalog.overlapping(centres[0], centres[0] + span), 20)
+        print(f"{span:>10g} {hits:>6.1f} {indexed:>9.3f} {scan:>9.2f} {whole:>14.3f}")
+    names = [f"载波{i}" for i in rng.integers(0, N_CARRIERS, 1000)]
+    t0 = time.perf_counter()
+    for name in names:
+        catalog.lookup(name)
+    print(f"按名称查找: {(time.perf_counter() - t0) / len(names) * 1e6:.2f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
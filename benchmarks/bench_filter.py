@@ -0,0 +1,69 @@
+# RBW/VBW 滤波基准: 逐点循环的旧实现 vs 向量化滤波引擎, 输出每秒扫描次数
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.filtering import RbVbFilter
+
+SPAN_MHZ = 500.0
+VB = 100.0
+
+
+def legacy_filter(psd_db, rb, vb, span_mhz):
+    rb = np.clip(rb, 1, 40000)
+    n_points = len(psd_db)
+    rb_sigma_hz = rb / 2.355
+    res_bw_per_point = (span_mhz * 1e6) / n_points
+    sigma_pts = rb_sigma_hz / res_bw_per_point
+    kernel_len = int(sigma_pts * 12)
+    if kernel_len < 5:
+        kernel_len = 5
+    if kernel_len % 2 == 0:
+        kernel_len += 1
+    x = np.arange(kernel_len) - kernel_len // 2
+    kernel = np.exp(-0.5 * (x / sigma_pts) ** 2)
+    kernel /= kernel.sum()
+    rb_filtered = np.convolve(psd_db, kernel, mode='same')
+    vb = np.clip(vb, 1, 400)
+    dt = 0.01
+    tau = 1.0 / (2 * np.pi * vb)
+    alpha = dt / (tau + dt)
+    vb_filtered = np.zeros_like(rb_filtered)
+    vb_filtered[0] = rb_filtered[0]
+    for i in range(1, len(rb_filtered)):
+        vb_filtered[i] = alpha * rb_filtered[i] + (1 - alpha) * vb_filtered[i-1]
+    return vb_filtered
+
+
+def sweeps_per_second(func, psd, rb, min_time=1.0, max_reps=200):
+    func(psd, rb, VB, SPAN_MHZ)
+    reps = 0
+    t0 = time.perf_counter()
+    while reps < max_reps:
+        func(psd, rb, VB, SPAN_MHZ)
+        reps += 1
+        if time.perf_counter() - t0 >= min_time:
+            break
+    return reps / (time.perf_counter() - t0)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    engine = RbVbFilter()
+    print(f"{'点数':>9} {'RB(Hz)':>8} {'旧实现(次/秒)':>14} {'向量化(次/秒)':>14} {'加速比':>8} {'最大误差(dB)':>12}")
+    for n in (1_000, 100_000, 1_000_000):
+        psd = -110 + rng.normal(0, 1, n)
+        for rb in (1000.0, 40000.0):
+            ref = legacy_filter(psd, rb, VB, SPAN_MHZ)
+            err = np.max(np.abs(engine.apply(psd, rb, VB, SPAN_MHZ) - ref))
+            old = sweeps_per_second(legacy_filter, psd, rb, max_reps=3 if n >= 1_000_000 else 200)
+            new = sweeps_per_second(engine.apply, psd, rb)
+            print(f"{n:>9} {rb:>8.0f} {old:>14.1f} {new:>14.1f} {new / old:>8.1f} {err:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
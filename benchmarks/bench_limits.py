@@ -0,0 +1,69 @@
+# 门限告警基准: 不同点数下每次扫描的门限检查耗时 (稳态无变化 / 每次都有告警出现或解除), 与扫描生成耗时对比;
+# 同时用注入的窄带干扰验证去抖与滞回: 干扰持续期间只报告一次告警, 消失后一次解除
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.limits import LimitMonitor
+
+
+def ms_per_call(func, min_time=1.0):
+    func()
+    reps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < min_time:
+        func()
+        reps += 1
+    return (time.perf_counter() - t0) / reps * 1000
+
+
+def inject(psd, freq, center, width, level):
+    lo, hi = np.searchsorted(freq, (center - width / 2, center + width / 2))
+    psd[lo:hi] = np.maximum(psd[lo:hi], level)
+    return psd
+
+
+def check_events(engine):
+    monitor = LimitMonitor()
+    log = []
+    for i in range(20):
+        sweep = engine.sweep()
+        psd = sweep.psd.copy()
+        # 第 3-12 次扫描注入干扰, 告警后电平回落到门限与滞回门限之间, 不应解除
+        if 3 <= i < 13:
+            inject(psd, sweep.freq, 4120.0, 2.0, engine.noise_floor + (14 if i < 7 else 9))
+        report = monitor.check(sweep.freq, psd, engine.noise_floor, engine.carrier_configs, timestamp=i)
+        log += [(event.timestamp, event.state, event.kind, round(event.freq_min, 1), round(event.freq_max, 1)) for event in report.events]
+    return log
+
+
+def main():
+    engine = SpectrumEngine(sat_idx=2, seed=0)
+    print("事件:", check_events(engine))
+    print(f"{'点数':>9} {'扫描(ms)':>9} {'稳态检查(ms)':>12} {'变化检查(ms)':>12} {'占比':>6}")
+    for n in (10_000, 100_000, 1_000_000):
+        engine.set_sweep_points(n)
+        sweep = engine.sweep()
+        monitor = LimitMonitor(debounce=1)
+        quiet = sweep.psd.copy()
+        noisy = inject(quiet.copy(), sweep.freq, 4120.0, 2.0, engine.noise_floor + 20)
+        frames = [quiet, noisy]
+        state = [0]
+
+        def toggling():
+            state[0] += 1
+            monitor.check(sweep.freq, frames[state[0] % 2], engine.noise_floor, engine.carrier_configs)
+
+        sweep_ms = ms_per_call(engine.sweep)
+        steady_ms = ms_per_call(lambda: monitor.check(sweep.freq, quiet, engine.noise_floor, engine.carrier_configs))
+        toggle_ms = ms_per_call(toggling)
+        print(f"{n:>9} {sweep_ms:>9.2f} {steady_ms:>12.2f} {toggle_ms:>12.2f} {steady_ms / sweep_ms:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
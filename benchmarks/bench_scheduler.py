@@ -0,0 +1,80 @@
+# 多频段调度基准: 逐个频段串行扫描 vs 调度器按不同线程数并发 (重访周期 0, 全速), 比较全部频段的总扫描速率.
+# 各方式轮流运行多轮取中位数; 加速比相对串行, 效率 = 加速比 / min(线程数, 核数). 单核机器上只能看出调度开销
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.satellites import CHINASAT_SATELLITES
+from satmon.scheduler import BandScheduler
+from satmon.workspace import release
+
+
+def serial(template, duration):
+    engines = [SpectrumEngine(CHINASAT_SATELLITES, s, b, sweep_points=template.sweep_points, seed=s)
+               for s, sat in enumerate(CHINASAT_SATELLITES) for b in range(len(sat["bands"]))]
+    # 首次扫描建立网格、滤波核与缓冲, 不计入
+    for engine in engines:
+        release(engine.sweep())
+    count = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        for engine in engines:
+            release(engine.sweep())
+            count += 1
+    return count / (time.perf_counter() - t0)
+
+
+def scheduled(template, duration, workers):
+    scheduler = BandScheduler(CHINASAT_SATELLITES, workers=workers, interval=0.0, seed=0)
+    scheduler.follow(template)
+    scheduler.start()
+    while min(s["sweeps"] for s in scheduler.stats().values()) == 0:
+        time.sleep(0.01)
+    t0, start = time.perf_counter(), total(scheduler)
+    time.sleep(duration)
+    rate = (total(scheduler) - start) / (time.perf_counter() - t0)
+    scheduler.stop()
+    return rate
+
+
+def total(scheduler):
+    return sum(s["sweeps"] for s in scheduler.stats().values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多频段调度基准")
+    parser.add_argument("--points", type=int, nargs="+", default=(10_000, 100_000))
+    parser.add_argument("--duration", type=float, default=1.0, help="每轮每种方式的运行秒数")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    bands = sum(len(sat["bands"]) for sat in CHINASAT_SATELLITES)
+    workers = sorted({1, 2, min(cores, bands), min(2 * cores, bands)})
+    template = SpectrumEngine(seed=0)
+    template.sweep()
+    print(f"CPU 核数 {cores}, {bands} 个频段")
+    if cores == 1:
+        print("单核机器: 多线程没有可并行的核, 下列结果只反映调度开销; 多核扩展须在多核机器上运行本基准")
+    for n in args.points:
+        template.set_sweep_points(n)
+        rates = {"serial": []}
+        rates.update({w: [] for w in workers})
+        for _ in range(args.rounds):
+            rates["serial"].append(serial(template, args.duration))
+            for w in workers:
+                rates[w].append(scheduled(template, args.duration, w))
+        base = statistics.median(rates["serial"])
+        print(f"{n} 点: 串行 {base:.1f} 次/秒")
+        for w in workers:
+            rate = statistics.median(rates[w])
+            speedup = rate / base
+            print(f"{n} 点: 调度 {w} 线程 {rate:.1f} 次/秒, 加速比 {speedup:.2f}, 效率 {speedup / min(w, cores):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# SCPI 吞吐测试: 同一组混合命令 (*IDN?, BAND?, FREQ:CENT?, 设置 RBW, TRAC? 二进制块) 分别以
+# 逐条等应答 (锁步) 与连续发送不等应答 (流水线) 两种方式发给本地 SCPI 服务, 比较每秒查询数
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.scpi import ScpiInstrument, ScpiServer
+
+QUERIES = [b"*IDN?", b"BAND?", b"FREQ:CENT?", b"SWE:POIN?", b"FORM REAL,32", b"TRAC? TRACE1", b"BAND:VID?", b"SYST:ERR?"]
+
+
+def command_list(n):
+    return [QUERIES[i % len(QUERIES)] for i in range(n)]
+
+
+def read_response(stream):
+    # 二进制块 #<位数><长度><数据>\n, 否则为一行文本
+    head = stream.read(1)
+    if head != b"#":
+        return head + stream.readline()
+    digits = int(stream.read(1))
+    length = int(stream.read(digits))
+    data = stream.read(length)
+    stream.readline()
+    return data
+
+
+def lock_step(port, commands):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile("rb")
+        start = time.perf_counter()
+        for cmd in commands:
+            sock.sendall(cmd + b"\n")
+            if b"?" in cmd:
+                read_response(stream)
+        return time.perf_counter() - start
+
+
+def pipelined(port, commands):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        stream = sock.makefile("rb")
+        n_responses = sum(1 for cmd in commands if b"?" in cmd)
+        payload = b"\n".join(commands) + b"\n"
+        start = time.perf_counter()
+        # 发送与接收分开进行, 避免双方发送缓冲同时塞满
+        sender = threading.Thread(target=sock.sendall, args=(payload,))
+        sender.start()
+        for _ in range(n_responses):
+            read_response(stream)
+        sender.join()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--points", type=int, default=1000)
+    args = parser.parse_args()
+    engine = SpectrumEngine(sweep_points=args.points, seed=0)
+    instrument = ScpiInstrument(engine)
+    instrument.update(engine.sweep())
+    server = ScpiServer(instrument, port=0).start()
+    commands = command_list(args.queries)
+    n_queries = sum(1 for cmd in commands if b"?" in cmd)
+    print(f"{args.queries} 条命令 (其中查询 {n_queries} 条), 迹线 {args.points} 点")
+    for name, func in (("锁步", lock_step), ("流水线", pipelined)):
+        elapsed = func(server.port, commands)
+        print(f"{name:<6} {elapsed * 1000:8.1f} ms  {args.queries / elapsed:10.0f} 条/秒")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
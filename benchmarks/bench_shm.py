@@ -0,0 +1,94 @@
+# 引擎进程基准: 共享内存环传递一帧 (写入 + 零拷贝读取) 与按管道序列化传递的开销对比;
+# 以及同一线程内 "扫描 + 渲染" 与引擎进程扫描、本进程只渲染的帧率对比 (渲染用忙等模拟)
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.satellites import CHINASAT_SATELLITES
+from satmon.shm import RemoteEngine, SweepRing
+from satmon.workspace import release
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def transfer(n, repeat):
+    engine = SpectrumEngine(sweep_points=n, seed=0)
+    sweep = engine.sweep()
+    ring = SweepRing.create(n)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        seq = ring.write(sweep)
+        _, slot = ring.read(seq - 1)
+        ring.sweep(slot)
+        ring.unpin(slot)
+    t_ring = (time.perf_counter() - t0) / repeat
+    # lease 只在本进程有效, 经管道传递的扫描不带持有计数
+    detached = sweep._replace(lease=None)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        pickle.loads(pickle.dumps(detached, pickle.HIGHEST_PROTOCOL))
+    t_pickle = (time.perf_counter() - t0) / repeat
+    ring.close()
+    return t_ring, t_pickle
+
+
+def in_thread(n, duration, render_s):
+    engine = SpectrumEngine(sweep_points=n, seed=0)
+    count = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        engine.sweep()
+        busy(render_s)
+        count += 1
+    return count / (time.perf_counter() - t0)
+
+
+def in_process(n, duration, render_s):
+    engine = RemoteEngine(CHINASAT_SATELLITES, sweep_points=n, seed=0)
+    while (sweep := engine.acquire()) is None:
+        time.sleep(0.01)
+    release(sweep)
+    count = 0
+    seq0 = int(engine.ring.header["seq"])
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        sweep = engine.acquire()
+        if sweep is None:
+            time.sleep(0.0005)
+            continue
+        busy(render_s)
+        release(sweep)
+        count += 1
+    elapsed = time.perf_counter() - t0
+    produced = (int(engine.ring.header["seq"]) - seq0) / elapsed
+    engine.close()
+    return count / elapsed, produced
+
+
+def main():
+    parser = argparse.ArgumentParser(description="引擎进程 / 共享内存环基准")
+    parser.add_argument("--points", type=int, nargs="+", default=(1_000, 100_000, 1_000_000))
+    parser.add_argument("--duration", type=float, default=2.0)
+    parser.add_argument("--render-ms", type=float, default=5.0, help="模拟每帧渲染耗时")
+    args = parser.parse_args()
+    print(f"CPU 核数 {os.cpu_count() or 1}")
+    for n in args.points:
+        t_ring, t_pickle = transfer(n, max(5, 200_000 // n))
+        print(f"{n} 点: 共享内存环 {t_ring * 1e3:.3f} ms/帧, 序列化 {t_pickle * 1e3:.3f} ms/帧")
+    for n in args.points:
+        local = in_thread(n, args.duration, args.render_ms / 1000)
+        remote, produced = in_process(n, args.duration, args.render_ms / 1000)
+        print(f"{n} 点: 同线程 {local:.1f} 帧/秒, 引擎进程 {remote:.1f} 帧/秒 (进程内扫描 {produced:.1f} 次/秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# 启动耗时基准: 每项都在新的解释器进程中测量, 取多次最小值.
+#   导入 moni      -X importtime 统计的 moni 累计导入耗时, 并列出最重的几个模块
+#   首帧扫描        导入引擎并完成第一次扫描 (包含 scipy 的首次导入)
+#   图形组件        导入 matplotlib/TkAgg 并创建图形 (窗口显示之后才发生)
+# --rev 指定 git 版本时, 在其导出的临时目录中用同样方法测量, 便于对比改动前后
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_SWEEP = """
+import time
+t0 = time.perf_counter()
+from satmon.engine import SpectrumEngine
+SpectrumEngine().sweep()
+print(time.perf_counter() - t0)
+"""
+
+FIGURE = """
+import time
+t0 = time.perf_counter()
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+fig = Figure(figsize=(11, 7))
+fig.add_subplot(211).plot([0, 1])
+fig.canvas.draw()
+print(time.perf_counter() - t0)
+"""
+
+
+def import_times(cwd, module):
+    # 返回 {模块: (嵌套深度, 累计微秒)}; 行格式 "import time: 自身 | 累计 | 缩进的模块名"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=cwd,
+                            capture_output=True, text=True, env=dict(os.environ, MPLBACKEND="Agg"))
+    if result.returncode:
+        raise SystemExit(result.stderr[-2000:])
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times[name.strip()] = (depth, int(parts[1]))
+    return times
+
+
+def seconds(cwd, code, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+        runs.append(float(out.stdout.split()[-1]))
+    return min(runs)
+
+
+def measure(cwd, repeat, top):
+    runs = [import_times(cwd, "moni") for _ in range(repeat)]
+    best = min(runs, key=lambda times: times["moni"][1])
+    print(f"  导入 moni     {best['moni'][1] / 1000:8.0f} ms")
+    # moni 的直接导入中最重的几个
+    heavy = sorted(((us, name) for name, (depth, us) in best.items() if depth == 1), reverse=True)[:top]
+    for us, name in heavy:
+        print(f"      {name:<44} {us / 1000:8.0f} ms")
+    print(f"  首帧扫描      {seconds(cwd, FIRST_SWEEP, repeat) * 1000:8.0f} ms")
+    print(f"  图形组件      {seconds(cwd, FIGURE, repeat) * 1000:8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rev", default=None, help="同时测量该 git 版本 (如 HEAD~1)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=6, help="列出的最重顶层导入数")
+    args = parser.parse_args()
+    if args.rev:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = subprocess.run(["git", "archive", args.rev], cwd=ROOT, capture_output=True, check=True).stdout
+            subprocess.run(["tar", "-x", "-C", tmp], input=archive, check=True)
+            print(f"{args.rev}:")
+            measure(tmp, args.repeat, args.top)
+    print("当前工作区:")
+    measure(ROOT, args.repeat, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# 流水线基准套件: 固定随机种子, 按点数 × 载波数测 generate_spectrum / 载波模板合成 / RBW+VBW 滤波的单次耗时;
+# --json 保存结果, --compare 与保存的基线逐项比较, 变慢超过阈值的项标出并以非零码退出
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+
+SEED = 1234
+POINTS = (1_000, 10_000, 100_000, 1_000_000)
+CARRIER_COUNTS = (1, 8, 48)
+REGRESSION = 0.2
+
+
+def make_carriers(band, n):
+    centres = np.linspace(band["min"] + 10, band["max"] - 10, n)
+    return [{"freq": float(f), "bw": 4.0, "power": -70.0, "modulation": "QPSK" if i % 2 else "8PSK"} for i, f in enumerate(centres)]
+
+
+def ms_per_call(func, min_time=0.3, max_reps=200):
+    func()
+    times = []
+    t_end = time.perf_counter() + min_time
+    while len(times) < max_reps and (len(times) < 3 or time.perf_counter() < t_end):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    # 取中位数, 避免偶发的调度抖动影响比较
+    return float(np.median(times)) * 1000
+
+
+def make_engine(n_points, n_carriers):
+    engine = SpectrumEngine(sweep_points=n_points, seed=SEED)
+    engine.carrier_configs = engine.span_carriers = make_carriers(engine.current_band, n_carriers)
+    return engine
+
+
+def run_case(n_points, n_carriers):
+    engine = make_engine(n_points, n_carriers)
+    freq, psd = engine.generate_raw()
+    noise = engine.workspace.noise(engine.noise_floor, n_points).copy()
+
+    def synthesize():
+        engine.templates.update(freq, engine.carrier_configs, engine.noise_floor)
+        engine.templates.apply(noise.copy(), engine.rng)
+
+    filtered = np.empty(n_points)
+    return {
+        "generate_spectrum": ms_per_call(engine.generate_spectrum),
+        "carrier_synthesis": ms_per_call(synthesize),
+        "apply_rb_vb_filtering": ms_per_call(lambda: engine.apply_rb_vb_filtering(psd, filtered)),
+    }
+
+
+def run_suite(points, carrier_counts):
+    results = {}
+    print(f"{'点数':>9} {'载波数':>6} {'generate_spectrum':>18} {'载波合成':>9} {'RBW+VBW':>9}  (ms)")
+    for n_points in points:
+        for n_carriers in carrier_counts:
+            case = run_case(n_points, n_carriers)
+            results[f"{n_points}x{n_carriers}"] = case
+            print(f"{n_points:>9} {n_carriers:>6} {case['generate_spectrum']:>18.3f} {case['carrier_synthesis']:>9.3f} "
+                  f"{case['apply_rb_vb_filtering']:>9.3f}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = 0
+    print(f"\n与基线比较 (变慢超过 {threshold:.0%} 标记为 !):")
+    for case, timings in results.items():
+        for name, ms in timings.items():
+            base = baseline.get(case, {}).get(name)
+            if not base:
+                continue
+            ratio = ms / base
+            flag = "!" if ratio > 1 + threshold else " "
+            regressions += flag == "!"
+            print(f"{flag} {case:>12} {name:<22} {base:>9.3f} → {ms:>9.3f} ms ({ratio - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="频谱流水线基准套件")
+    parser.add_argument("--points", type=int, nargs="+", default=POINTS)
+    parser.add_argument("--carriers", type=int, nargs="+", default=CARRIER_COUNTS)
+    parser.add_argument("--json", metavar="FILE", help="保存结果")
+    parser.add_argument("--compare", metavar="FILE", help="与保存的基线结果比较")
+    parser.add_argument("--threshold", type=float, default=REGRESSION, help="回退判定阈值 (比例)")
+    args = parser.parse_args()
+
+    results = run_suite(args.points, args.carriers)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"seed": SEED, "numpy": np.__version__, "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        print(f"回退 {regressions} 项")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# 扫描节拍基准: 做完再睡固定时长 vs 按截止时刻排帧, 在不同点数 (计算耗时) 下比较实测速率与目标速率的偏差;
+# 并列出仪表模式下几组跨度 / RBW / VBW 的仿真扫描时间
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.sweeptime import FrameClock, sweep_time
+
+SETTINGS = [(500e6, 1000, 100), (500e6, 40000, 400), (50e6, 10000, 400), (5e6, 1000, 100), (1e6, 100, 10)]
+
+
+def sleep_after(engine, period, duration):
+    count = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        engine.sweep()
+        count += 1
+        time.sleep(period)
+    return count / (time.perf_counter() - t0)
+
+
+def clocked(engine, period, duration):
+    clock = FrameClock(engine.sweep_time, "fixed", period)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < duration:
+        clock.wait()
+        engine.sweep()
+    return clock.rate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="扫描节拍基准")
+    parser.add_argument("--points", type=int, nargs="+", default=(1_000, 20_000, 100_000))
+    parser.add_argument("--period", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    for span, rbw, vbw in SETTINGS:
+        print(f"跨度 {span / 1e6:g} MHz, RBW {rbw:g} Hz, VBW {vbw:g} Hz: 仿真扫描时间 {sweep_time(span, rbw, vbw, 1000) * 1e3:.1f} ms")
+    target = 1.0 / args.period
+    for n in args.points:
+        engine = SpectrumEngine(sweep_points=n, seed=0)
+        engine.sweep()
+        naive = sleep_after(engine, args.period, args.duration)
+        paced = clocked(engine, args.period, args.duration)
+        print(f"{n} 点: 目标 {target:.1f} 次/秒, 做完再睡 {naive:.2f} 次/秒, 截止时刻排帧 {paced:.2f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
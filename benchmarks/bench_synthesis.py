@@ -0,0 +1,65 @@
+# 频谱合成基准: 每次扫描全频带重算载波包络的旧实现 vs 缓存的局部窗口模板, 以纯噪声生成为下限
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.synthesis import JITTER_DB, CarrierTemplates, carrier_envelope, roll_off_for
+
+NOISE_FLOOR = -110.0
+F_MIN, F_MAX = 3700.0, 4200.0
+
+
+def make_carriers(n):
+    centres = np.linspace(F_MIN + 10, F_MAX - 10, n)
+    return [{"freq": float(f), "bw": 4.0, "power": -70.0, "modulation": "QPSK" if i % 2 else "8PSK"} for i, f in enumerate(centres)]
+
+
+def legacy(rng, freq, carriers):
+    psd = NOISE_FLOOR + rng.normal(0, 1, len(freq))
+    for carrier in carriers:
+        envelope = carrier_envelope(freq - carrier["freq"], carrier["bw"], roll_off_for(carrier["modulation"]))
+        curve = envelope * (carrier["power"] - NOISE_FLOOR) + NOISE_FLOOR
+        curve += rng.uniform(-JITTER_DB, JITTER_DB, size=curve.shape)
+        psd = np.maximum(psd, curve)
+    return psd
+
+
+def cached(rng, freq, carriers, templates):
+    psd = NOISE_FLOOR + rng.normal(0, 1, len(freq))
+    templates.update(freq, carriers, NOISE_FLOOR)
+    return templates.apply(psd, rng)
+
+
+def noise_only(rng, freq):
+    return NOISE_FLOOR + rng.normal(0, 1, len(freq))
+
+
+def ms_per_sweep(func, *args, min_time=0.5, max_reps=500):
+    func(*args)
+    reps = 0
+    t0 = time.perf_counter()
+    while reps < max_reps and time.perf_counter() - t0 < min_time:
+        func(*args)
+        reps += 1
+    return (time.perf_counter() - t0) / reps * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'点数':>9} {'载波数':>6} {'旧实现(ms)':>10} {'模板(ms)':>9} {'纯噪声(ms)':>10} {'加速比':>7}")
+    for n in (1_000, 100_000, 1_000_000):
+        freq = np.linspace(F_MIN, F_MAX, n)
+        for n_carriers in (4, 48):
+            carriers = make_carriers(n_carriers)
+            old = ms_per_sweep(legacy, rng, freq, carriers, max_reps=5 if n >= 1_000_000 else 500)
+            new = ms_per_sweep(cached, rng, freq, carriers, CarrierTemplates())
+            base = ms_per_sweep(noise_only, rng, freq)
+            print(f"{n:>9} {n_carriers:>6} {old:>10.2f} {new:>9.2f} {base:>10.2f} {old / new:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
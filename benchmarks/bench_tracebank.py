@@ -0,0 +1,50 @@
+# 曲线库基准: 存入 50 条百万点曲线, 统计存入、A−B、多条取最大/最小、批量减参考、按显示宽度抽取与保存/载入的耗时
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.lod import minmax_decimate
+from satmon.tracebank import TraceBank
+
+
+def timed(func):
+    t0 = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    n_traces, n_points = 50, 1_000_000
+    rng = np.random.default_rng(0)
+    freq = np.linspace(3700, 4200, n_points)
+    sweeps = [rng.standard_normal(n_points) - 110 for _ in range(4)]
+    bank = TraceBank()
+    t0 = time.perf_counter()
+    for i in range(n_traces):
+        bank.store_array(freq, sweeps[i % len(sweeps)], timestamp=time.time())
+    store_ms = (time.perf_counter() - t0) / n_traces * 1000
+    slots = bank.slots()
+    print(f"{n_traces} 条 × {n_points} 点, 存储区 {bank.data.nbytes / 2**20:.0f} MB ({bank.data.shape[0]} 槽位)")
+    print(f"存入            {store_ms:8.1f} ms/条")
+    rows = [("A − B", lambda: bank.difference(slots[0], slots[1])),
+            ("取最大 (25 条)", lambda: bank.reduce("max", slots[:25])),
+            ("取最小 (25 条)", lambda: bank.reduce("min", slots[:25])),
+            ("减参考 (5 条)", lambda: bank.reference_difference(slots[1:6], slots[0])),
+            ("抽取显示 (1 条)", lambda: minmax_decimate(freq, bank.data[slots[0]], 1600))]
+    for name, func in rows:
+        print(f"{name:<14} {timed(func)[1]:8.1f} ms")
+    path = os.path.join(tempfile.mkdtemp(), "bank.npz")
+    _, save_ms = timed(lambda: bank.save(path))
+    count, load_ms = timed(lambda: TraceBank().load(path))
+    print(f"保存 {os.path.getsize(path) / 2**20:.0f} MB     {save_ms:8.1f} ms")
+    print(f"载入 {count} 条       {load_ms:8.1f} ms")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# 谱估计基准: 解析包络 + RBW/VBW 滤波 vs IQ 合成 + Welch, 以中星16号 250 MHz 载波为例;
+# 输出每次扫描耗时、可持续扫描速率与载波平坦段/底噪电平
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.satellites import CHINASAT_SATELLITES
+
+SATELLITE = "中星16号"
+REALTIME_RATE = 10.0
+
+
+def ms_per_sweep(engine, min_time=1.0):
+    engine.sweep()
+    reps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < min_time:
+        sweep = engine.sweep()
+        reps += 1
+    return (time.perf_counter() - t0) / reps * 1000, sweep
+
+
+def main():
+    sat_idx = [sat["name"] for sat in CHINASAT_SATELLITES].index(SATELLITE)
+    carrier = CHINASAT_SATELLITES[sat_idx]["carriers"][0]
+    print(f"{SATELLITE}: {carrier['bw']} MHz 载波 @ {carrier['freq']} MHz, {carrier['power']} dBm; 实时要求 {REALTIME_RATE:.0f} 次/秒")
+    print(f"{'方式':<8} {'点数':>7} {'RB(Hz)':>7} {'VB(Hz)':>7} {'ms/次':>8} {'次/秒':>7} {'FFT':>6} {'平均':>4} {'平坦段(dBm)':>11} {'底噪(dBm)':>9}")
+    for mode in ("analytic", "welch"):
+        for points in (1_000, 100_000):
+            for rb, vb in ((1000.0, 100.0), (40000.0, 400.0), (1000.0, 10.0)):
+                engine = SpectrumEngine(CHINASAT_SATELLITES, sat_idx=sat_idx, sweep_points=points, rb=rb, vb=vb, psd_mode=mode, seed=0)
+                elapsed, sweep = ms_per_sweep(engine)
+                in_band = sweep.psd[np.abs(sweep.freq - carrier["freq"]) < carrier["bw"] * 0.3]
+                noise = sweep.psd[sweep.freq < carrier["freq"] - carrier["bw"]]
+                fft = f"{engine.iq.nfft}" if mode == "welch" else "-"
+                avg = f"{engine.iq.averages}" if mode == "welch" else "-"
+                print(f"{mode:<8} {points:>7} {rb:>7.0f} {vb:>7.0f} {elapsed:>8.2f} {1000 / elapsed:>7.1f} {fft:>6} {avg:>4} "
+                      f"{np.median(in_band):>11.1f} {np.median(noise):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
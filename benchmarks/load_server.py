@@ -0,0 +1,127 @@
+# 推送服务负载测试: 50 个本地订阅者 (TCP 全分辨率 / TCP 抽取 / WebSocket 抽取 各占一部分, 其中若干个故意读得很慢),
+# 发布端以固定速率推送扫描; 统计各类客户端收到的帧数、端到端延迟与慢客户端的丢帧.
+# 快速客户端的延迟 p99 超过 --max-p99-ms 时以非零状态退出 (慢客户端不应拖慢其他客户端)
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.server import FRAME_HEADER, SweepServer, decode_frame
+from satmon.workspace import release
+
+WS_REQUEST = (b"GET /?points=%d HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+              b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+
+
+async def read_ws_frame(reader):
+    head = await reader.readexactly(2)
+    length = head[1] & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    return await reader.readexactly(length)
+
+
+async def read_tcp_frame(reader):
+    header = await reader.readexactly(FRAME_HEADER.size)
+    n_points = FRAME_HEADER.unpack(header)[-1]
+    return header + await reader.readexactly(n_points * 4)
+
+
+async def subscriber(port, kind, n_points, slow, stop, result):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if kind == "ws":
+        writer.write(WS_REQUEST % n_points)
+        await reader.readuntil(b"\r\n\r\n")
+        read_frame = read_ws_frame
+    else:
+        writer.write(b"SUB %d\n" % n_points)
+        read_frame = read_tcp_frame
+    latencies = []
+    try:
+        while not stop.is_set():
+            # 首帧要等发布端预热, 之后超过 2 秒没有新帧即认为发布已结束
+            data = await asyncio.wait_for(read_frame(reader), 2.0 if latencies else 30.0)
+            meta, _ = decode_frame(data)
+            latencies.append(time.time() - meta["timestamp"])
+            if slow:
+                await asyncio.sleep(0.5)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    writer.close()
+    result.append((kind, n_points, slow, latencies))
+
+
+def publisher(server, points, rate, duration):
+    engine = SpectrumEngine(sweep_points=points, seed=0)
+    # 首次扫描要导入 scipy.signal、建立滤波核, 不作为推送延迟计入
+    release(engine.sweep())
+    period = 1.0 / rate
+    start = time.perf_counter()
+    deadline = start
+    while time.perf_counter() - start < duration:
+        sweep = engine.sweep()
+        server.publish(sweep)
+        release(sweep)
+        deadline += period
+        time.sleep(max(deadline - time.perf_counter(), 0))
+
+
+async def main_async(args):
+    server = SweepServer(port=0).start()
+    stop = asyncio.Event()
+    result = []
+    kinds = [("tcp", 0), ("tcp", 1000), ("ws", 500)]
+    tasks = [asyncio.ensure_future(subscriber(server.port, *kinds[i % 3], i < args.slow, stop, result)) for i in range(args.clients)]
+    await asyncio.sleep(0.5)
+    thread = threading.Thread(target=publisher, args=(server, args.points, args.rate, args.duration))
+    thread.start()
+    await asyncio.get_running_loop().run_in_executor(None, thread.join)
+    await asyncio.sleep(0.5)
+    stats = server.stats()
+    stop.set()
+    await asyncio.gather(*tasks)
+    server.stop()
+    return server, stats, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--slow", type=int, default=5, help="故意读得很慢的客户端数")
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--max-p99-ms", type=float, default=250.0, help="快速客户端端到端延迟 p99 的上限")
+    args = parser.parse_args()
+    server, stats, result = asyncio.run(main_async(args))
+    print(f"{args.clients} 个订阅者 ({args.slow} 个慢速), {args.points} 点, {args.rate:.0f} 次/秒, {args.duration:.0f} 秒; "
+          f"发布 {stats['published']} 帧, 服务端丢帧 {stats['dropped']}")
+    print(f"{'类型':<5} {'点数':>7} {'慢速':>4} {'客户端':>6} {'平均收帧':>8} {'延迟中位(ms)':>12} {'延迟p99(ms)':>11}")
+    groups = {}
+    for kind, n_points, slow, latencies in result:
+        groups.setdefault((kind, n_points, slow), []).append(latencies)
+    for (kind, n_points, slow), runs in sorted(groups.items()):
+        lat = np.concatenate([np.array(r) for r in runs]) * 1000
+        frames = np.mean([len(r) for r in runs])
+        median, p99 = (np.median(lat), np.percentile(lat, 99)) if len(lat) else (np.nan, np.nan)
+        print(f"{kind:<5} {n_points or '全部':>7} {'是' if slow else '否':>4} {len(runs):>6} {frames:>8.1f} "
+              f"{median:>12.1f} {p99:>11.1f}")
+    fast = [np.array(latencies) for _, _, slow, latencies in result if not slow and latencies]
+    p99 = np.percentile(np.concatenate(fast), 99) * 1000 if fast else float("inf")
+    ok = p99 <= args.max_p99_ms
+    print(f"快速客户端延迟 p99 {p99:.1f} ms, 上限 {args.max_p99_ms:.0f} ms: {'通过' if ok else '未通过'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# 流水线背压测试: 渲染端 (每帧 RENDER_MS) 慢于扫描端时,
+# 旧方式每次扫描都向事件队列投递一次回调, 新方式只渲染最新帧; 对比积压与显示延迟
+import os
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.pipeline import SweepPipeline
+
+POINTS = 20_000
+RENDER_MS = 50
+DURATION = 5.0
+
+
+def render(sweep, latencies):
+    latencies.append(time.time() - sweep.timestamp)
+    time.sleep(RENDER_MS / 1000)
+
+
+def legacy(engine):
+    # 等价于工作线程里 root.after(0, update_plots, sweep): 事件队列无上限
+    events = queue.Queue()
+    running = True
+
+    def worker():
+        while running:
+            events.put(engine.sweep())
+            time.sleep(0.001)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    latencies, backlog = [], 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < DURATION:
+        render(events.get(), latencies)
+        backlog = max(backlog, events.qsize())
+    running = False
+    thread.join()
+    return len(latencies), 0, backlog, latencies
+
+
+def pipelined(engine):
+    pipeline = SweepPipeline(engine.acquire, [("滤波", engine.filter_frame), ("检测", engine.process_frame)], interval=0.001)
+    pipeline.start()
+    latencies, backlog = [], 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < DURATION:
+        sweep = pipeline.latest.take()
+        if sweep is None:
+            time.sleep(0.005)
+            continue
+        render(sweep, latencies)
+        backlog = max(backlog, sum(size for _, size, _ in pipeline.depths()))
+    pipeline.stop()
+    return len(latencies), pipeline.latest.dropped, backlog, latencies
+
+
+def main():
+    print(f"{POINTS} 点, 渲染 {RENDER_MS} ms/帧, 运行 {DURATION:.0f} 秒")
+    print(f"{'方式':<8} {'渲染帧':>6} {'丢帧':>6} {'最大积压':>8} {'延迟中位(ms)':>12} {'最终延迟(ms)':>12}")
+    for name, func in (("旧方式", legacy), ("流水线", pipelined)):
+        engine = SpectrumEngine(sweep_points=POINTS, seed=0)
+        engine.detect_enabled = True
+        rendered, dropped, backlog, latencies = func(engine)
+        lat = np.array(latencies) * 1000
+        print(f"{name:<8} {rendered:>6} {dropped:>6} {backlog:>8} {np.median(lat):>12.1f} {lat[-1]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# 渲染浸泡测试: 峰值搜索 + 平均持续开启, 模拟 10 帧/秒 运行一小时,
+# 检查持久图元 + blit 的单帧耗时是否保持平稳 (--legacy 对比旧的逐帧重建方式)
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.lod import minmax_decimate
+from satmon.render import BlitManager
+
+
+def make_sweep(rng, freq):
+    psd = -110 + rng.normal(0, 1, len(freq))
+    carrier = np.abs(freq - 3950) < 27
+    psd[carrier] = -40 + rng.uniform(-0.8, 0.8, carrier.sum())
+    return psd
+
+
+def run(frames, points, legacy, blocks=10):
+    rng = np.random.default_rng(0)
+    fig = Figure(figsize=(11, 7), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_xlim(3700, 4200)
+    ax.set_ylim(-110, -30)
+    freq = np.linspace(3700, 4200, points)
+    x0 = np.array([3700.0, 4200.0])
+    spectrum_line, = ax.plot(x0, x0 * 0, label='实时频谱')
+    max_line, = ax.plot(x0, x0 * 0, linestyle='--', label='最大保持')
+    avg_line, = ax.plot(x0, x0 * 0, label='Average')
+    peak_marker, = ax.plot([], [], marker="o", linestyle='')
+    peak_text = ax.text(0, 0, "")
+    ax.legend(loc='upper right')
+    columns = int(ax.bbox.width)
+    blit = BlitManager(canvas, [spectrum_line, max_line, avg_line, peak_marker, peak_text], enabled=not legacy)
+    canvas.draw()
+
+    max_hold = np.full(points, -1e9)
+    avg_data = []
+    per_block = max(frames // blocks, 1)
+    block_times = []
+    t_block = 0.0
+    for i in range(frames):
+        psd = make_sweep(rng, freq)
+        max_hold = np.maximum(max_hold, psd)
+        avg_data.append(psd)
+        if len(avg_data) > 5:
+            avg_data.pop(0)
+        avg_curve = np.mean(avg_data, axis=0)
+        idx = np.argmax(psd)
+
+        t0 = time.perf_counter()
+        spectrum_line.set_data(*minmax_decimate(freq, psd, columns))
+        max_line.set_data(*minmax_decimate(freq, max_hold, columns))
+        if legacy:
+            # 旧实现: 每帧新建平均线/峰值标记/峰值文字并重建图例, 文字从不移除
+            avg_line.remove()
+            avg_line, = ax.plot(*minmax_decimate(freq, avg_curve, columns), label='Average')
+            peak_marker.remove()
+            peak_marker, = ax.plot(freq[idx], psd[idx], marker="o")
+            ax.text(freq[idx], psd[idx], f"峰值: {freq[idx]:.2f} MHz\n{psd[idx]:.1f} dBm")
+            ax.legend(loc='upper right')
+            canvas.draw()
+        else:
+            avg_line.set_data(*minmax_decimate(freq, avg_curve, columns))
+            peak_marker.set_data([freq[idx]], [psd[idx]])
+            peak_text.set_position((freq[idx], psd[idx]))
+            peak_text.set_text(f"峰值: {freq[idx]:.2f} MHz\n{psd[idx]:.1f} dBm")
+            blit.update()
+        t_block += time.perf_counter() - t0
+        if (i + 1) % per_block == 0:
+            block_times.append(t_block / per_block * 1e3)
+            t_block = 0.0
+    return block_times, len(ax.get_children())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=36000, help="帧数 (默认 36000 = 10 帧/秒 × 1 小时)")
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--legacy", action="store_true", help="使用旧的逐帧重建图元方式")
+    args = parser.parse_args()
+    block_times, n_artists = run(args.frames, args.points, args.legacy)
+    print(f"模式: {'逐帧重建' if args.legacy else '持久图元 + blit'}  帧数: {args.frames}  点数: {args.points}")
+    for i, ms in enumerate(block_times):
+        print(f"  第 {i + 1:2d} 段  平均单帧渲染 {ms:7.2f} ms")
+    drift = block_times[-1] / block_times[0] if block_times and block_times[0] > 0 else float('nan')
+    print(f"末段/首段 = {drift:.2f}  坐标轴图元数: {n_artists}")
+
+
+if __name__ == "__main__":
+    main()
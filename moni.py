@@ -1,21 +1,36 @@
 import numpy as np
-import matplotlib
-matplotlib.use("TkAgg")
-import matplotlib.pyplot as plt
-from scipy import signal
 import datetime
 import tkinter as tk
-from tkinter import ttk, messagebox
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+from tkinter import ttk, messagebox, filedialog
 import threading
 import time
-import matplotlib.colors as mcolors
-from matplotlib.ticker import AutoMinorLocator
-from matplotlib.widgets import RectangleSelector
+import os
 import platform
+import queue
 import sys
 
+from satmon.averaging import AVG_MODES, AVG_SCALES
+from satmon.capture import CaptureReader, CaptureWriter
+from satmon.catalog import Catalog
+from satmon.engine import Frame, SpectrumEngine, Sweep
+from satmon.eventlog import AsyncJsonlWriter
+from satmon.fleet import FleetSimulator
+from satmon.iq import PSD_MODES
+from satmon.lod import minmax_decimate
+from satmon.pipeline import LatestSlot, SweepPipeline
+from satmon.render import BlitManager, FrameRateMeter
+from satmon.replay import PLAYBACK_SPEEDS, CapturePlayer
+from satmon.satellites import CHINASAT_SATELLITES
+from satmon.scheduler import BandScheduler
+from satmon.sweeptime import CLOCK_MODES, FrameClock
+from satmon.tracebank import TraceBank
+from satmon.waterfall import WaterfallBuffer
+from satmon.workspace import release, retain
+
+RENDER_POLL_MS = 30
+# 窗口先显示, 稍后再导入 matplotlib 并构建图形
+STARTUP_DELAY_MS = 20
+
 # ---- 中文显示兼容 ----
 if sys.platform.startswith("win"):
     zh_font = "Microsoft YaHei"
@@ -23,80 +38,14 @@ elif sys.platform.startswith("darwin"):
     zh_font = "PingFang SC"
 else:
     zh_font = "Noto Sans CJK SC"
-plt.rcParams["font.sans-serif"] = [zh_font]
-plt.rcParams["axes.unicode_minus"] = False
-
-CHINASAT_SATELLITES = [
-    {
-        "name": "中星6A",
-        "position": "125.0°E",
-        "bands": [
-            {"name": "C波段下行", "min": 3700, "max": 4200, "center": 3950, "unit": "MHz", "noise_floor": -110}
-        ],
-        "cover": "中国、亚太地区",
-        "carriers": [
-            {"freq": 3920, "bw": 36, "power": -42, "name": "电视转发", "modulation": "DVB-S"},
-            {"freq": 4015, "bw": 27, "power": -46, "name": "数据", "modulation": "QPSK"}
-        ]
-    },
-    {
-        "name": "中星9号",
-        "position": "92.2°E",
-        "bands": [
-            {"name": "Ku波段下行", "min": 12250, "max": 12750, "center": 12500, "unit": "MHz", "noise_floor": -110}
-        ],
-        "cover": "中国全境及周边",
-        "carriers": [
-            {"freq": 12380, "bw": 36, "power": -44, "name": "直播星", "modulation": "QPSK"}
-        ]
-    },
-    {
-        "name": "中星10号",
-        "position": "110.5°E",
-        "bands": [
-            {"name": "C波段下行", "min": 3700, "max": 4200, "center": 3950, "unit": "MHz", "noise_floor": -110}
-        ],
-        "cover": "中国全境、东南亚",
-        "carriers": [
-            {"freq": 3850, "bw": 36, "power": -45, "name": "电视传输", "modulation": "DVB-S2"},
-            {"freq": 3950, "bw": 54, "power": -40, "name": "数据链路", "modulation": "8PSK"},
-            {"freq": 4050, "bw": 27, "power": -50, "name": "通信系统", "modulation": "QPSK"}
-        ]
-    },
-    {
-        "name": "中星16号",
-        "position": "110.5°E",
-        "bands": [
-            {"name": "Ka波段下行", "min": 19500, "max": 20200, "center": 19850, "unit": "MHz", "noise_floor": -110}
-        ],
-        "cover": "中国全境、重点覆盖东部",
-        "carriers": [
-            {"freq": 19800, "bw": 250, "power": -30, "name": "宽带互联网", "modulation": "QAM"}
-        ]
-    },
-    {
-        "name": "中星6C",
-        "position": "130.0°E",
-        "bands": [
-            {"name": "C波段下行", "min": 3700, "max": 4200, "center": 3950, "unit": "MHz", "noise_floor": -110}
-        ],
-        "cover": "中国及周边",
-        "carriers": [
-            {"freq": 4000, "bw": 36, "power": -43, "name": "电视", "modulation": "DVB-S2"}
-        ]
-    },
-    {
-        "name": "中星9B",
-        "position": "101.4°E",
-        "bands": [
-            {"name": "Ku波段下行", "min": 12200, "max": 12700, "center": 12450, "unit": "MHz", "noise_floor": -110}
-        ],
-        "cover": "中国全境",
-        "carriers": [
-            {"freq": 12400, "bw": 54, "power": -46, "name": "直播星", "modulation": "QPSK"}
-        ]
-    }
-]
+
+WATERFALL_COLUMNS = 1024
+
+def load_matplotlib():
+    import matplotlib
+    matplotlib.use("TkAgg")
+    matplotlib.rcParams["font.sans-serif"] = [zh_font]
+    matplotlib.rcParams["axes.unicode_minus"] = False
 
 def set_light_style(root):
     style = ttk.Style(root)
@@ -113,7 +62,7 @@ def set_light_style(root):
     return style
 
 class SatelliteSpectrumMonitor:
-    def __init__(self, root):
+    def __init__(self, root, engine_process=False, clock_mode="fixed"):
         self.root = root
         set_light_style(root)
         self.root.title("中国卫通卫星频谱监测系统")
@@ -123,39 +72,66 @@ class SatelliteSpectrumMonitor:
         self.current_utc = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         self.user = "piaosir"
 
-        self.satellites = CHINASAT_SATELLITES
-        self.sat_names = [sat["name"] for sat in self.satellites]
-        self.selected_sat_idx = 2
-        self.selected_sat = self.satellites[self.selected_sat_idx]
-        self.selected_band_idx = 0
-        self.current_band = self.selected_sat["bands"][self.selected_band_idx]
-        self.noise_floor = self.current_band["noise_floor"]
-        self.carrier_configs = self.selected_sat["carriers"]
-        self.rb = 1000.0     # Hz
-        self.vb = 100.0      # Hz
+        # 推送 / SCPI 服务 (asyncio) 与引擎进程 (multiprocessing) 用到时才导入, 不拖慢启动
+        self.remote = engine_process
+        if engine_process:
+            # 扫描在独立进程中进行, 经共享内存环取帧
+            from satmon.shm import RemoteEngine
+            self.engine = RemoteEngine(CHINASAT_SATELLITES, sat_idx=2, clock_mode=clock_mode)
+            self.clock = self.engine.clock
+        else:
+            self.engine = SpectrumEngine(CHINASAT_SATELLITES, sat_idx=2)
+            # 扫描节拍: 默认固定周期 (FIXED_PERIOD_S); --sweep-time 或界面切换后按跨度 / RBW / VBW 模拟仪表扫描时间
+            self.clock = FrameClock(self.engine.sweep_time, clock_mode)
+        self.satellites = self.engine.satellites
+        self.sat_names = self.engine.sat_names
+        self.catalog_version = self.engine.catalog_version
+        self.waterfall_rows = 200
 
         self.zoom_freq_min = None
         self.zoom_freq_max = None
         self.zoom_active = False
+        self.replay_span = None
 
         self.markers = []
         self.rect_selector = None
 
-        self.traces = []  # 记录trace数据
-        self.traces_max = 5
-        self.peak_search_enabled = False
-        self.avg_enabled = False
-        self.avg_count = 5
-        self.avg_data = []
+        self.traces = []  # 当前显示的存储曲线
+        self.trace_bank = TraceBank()
+        self.trace_view_key = None
+        self.bank_window = None
+        self.last_sweep = None
         self.ylim_scale = 10   # dB/div
         self.ref_level = -30   # dBm, 参考电平
 
+        self.recorder = None
+        self.recorder_lock = threading.Lock()
+        self.server = None
+        self.scpi = None
+        self.remote_calls = queue.Queue()
+        self.player = None
+        self.scrub_updating = False
+
+        self.fleet = None
+        self.fleet_window = None
+        self.fleet_stop = None   # 每次开启卫星群监测各用一个停止事件, 关闭后旧线程不会因再次开启而继续运行
+        self.fleet_slot = LatestSlot()
+        self.scheduler = None
+
+        # 生成 → 滤波 → 保持/平均/检测 在后台线程流水处理, 绘图在主线程轮询最新一帧
+        self.pipeline = SweepPipeline(self.next_frame, [("滤波", self.engine.filter_frame), ("检测", self.process_frame)], release=release)
+
         self.create_color_scheme()
         self.create_widgets()
         self.running = True
-        self.update_thread = threading.Thread(target=self.update_simulation)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        # 后台流水线立即开始出帧 (首帧时导入 scipy), 与主线程构建图形同时进行
+        self.pipeline.start()
+        self.root.after(STARTUP_DELAY_MS, self.finish_startup)
+
+    def finish_startup(self):
+        self.loading_label.destroy()
+        self.create_display_area()
+        self.root.after(RENDER_POLL_MS, self.poll_render)
 
     def create_color_scheme(self):
         self.colors = {
@@ -178,20 +154,11 @@ class SatelliteSpectrumMonitor:
             "marker": "#d2691e",
             "trace": "#f08080"
         }
-        n_colors = 256
-        colors = []
-        for i in range(n_colors):
-            r1, g1, b1 = self.hex_to_rgb(self.colors["accent_blue"])
-            r2, g2, b2 = self.hex_to_rgb(self.colors["accent_purple"])
-            r = r1 + (r2 - r1) * i / (n_colors - 1)
-            g = g1 + (g2 - g1) * i / (n_colors - 1)
-            b = b1 + (b2 - b1) * i / (n_colors - 1)
-            colors.append((r/255, g/255, b/255))
-        self.spectrum_cmap = mcolors.LinearSegmentedColormap.from_list("spectrum", colors)
-
-    def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+    def create_spectrum_cmap(self):
+        # 蓝 → 紫线性渐变, 256 级
+        from matplotlib.colors import LinearSegmentedColormap
+        return LinearSegmentedColormap.from_list("spectrum", [self.colors["accent_blue"], self.colors["accent_purple"]], N=256)
 
     def create_widgets(self):
         self.root.grid_columnconfigure(0, minsize=295)
@@ -205,7 +172,8 @@ class SatelliteSpectrumMonitor:
         self.display_frame.grid(row=0, column=1, sticky="nsew", padx=(0, 18), pady=18)
 
         self.create_control_panel()
-        self.create_display_area()
+        self.loading_label = ttk.Label(self.display_frame, text="正在加载频谱显示...", style='TLabel', anchor="center")
+        self.loading_label.pack(fill=tk.BOTH, expand=True)
 
     def create_control_panel(self):
         title = ttk.Label(self.panel, text="中国卫通卫星频谱仪", font=(zh_font, 16, "bold"),
@@ -220,10 +188,11 @@ class SatelliteSpectrumMonitor:
 
         sat_box = ttk.LabelFrame(self.panel, text="卫星选择", style='TLabelframe')
         sat_box.pack(fill="x", pady=(18, 2), padx=3)
-        self.sat_var = tk.StringVar(value=self.sat_names[self.selected_sat_idx])
+        self.sat_var = tk.StringVar(value=self.sat_names[self.engine.selected_sat_idx])
         self.sat_combo = ttk.Combobox(sat_box, textvariable=self.sat_var, values=self.sat_names, state="readonly", style='TCombobox')
         self.sat_combo.pack(fill="x", padx=5, pady=6)
         self.sat_combo.bind("<<ComboboxSelected>>", self.on_satellite_select)
+        ttk.Button(sat_box, text="加载卫星目录 (JSON/CSV)", command=self.load_catalog).pack(fill="x", padx=5, pady=(0, 6))
 
         satinfo_box = ttk.LabelFrame(self.panel, text="卫星信息", style='TLabelframe')
         satinfo_box.pack(fill="x", pady=(8,2), padx=3)
@@ -242,32 +211,81 @@ class SatelliteSpectrumMonitor:
         rb_frame = ttk.Frame(rbvb_box, style='TFrame')
         rb_frame.pack(fill="x", pady=5, padx=2)
         ttk.Label(rb_frame, text="RB (1Hz-40kHz):", font=(zh_font, 10)).pack(side="left")
-        self.rb_var = tk.StringVar(value=f"{int(self.rb)} Hz")
-        rb_scale = ttk.Scale(rb_frame, from_=1, to=40000, orient="horizontal", command=self.update_rb, style='Horizontal.TScale')
-        rb_scale.set(self.rb)
-        rb_scale.pack(fill="x", padx=(6,0), expand=True)
+        self.rb_var = tk.StringVar(value=f"{int(self.engine.rb)} Hz")
+        self.rb_scale = ttk.Scale(rb_frame, from_=1, to=40000, orient="horizontal", command=self.update_rb, style='Horizontal.TScale')
+        self.rb_scale.set(self.engine.rb)
+        self.rb_scale.pack(fill="x", padx=(6,0), expand=True)
         rb_label = ttk.Label(rb_frame, textvariable=self.rb_var, foreground=self.colors["accent_blue"], width=9, anchor="e")
         rb_label.pack(side="right", padx=(5,3))
 
         vb_frame = ttk.Frame(rbvb_box, style='TFrame')
         vb_frame.pack(fill="x", pady=5, padx=2)
         ttk.Label(vb_frame, text="VB (1Hz-400Hz):", font=(zh_font, 10)).pack(side="left")
-        self.vb_var = tk.StringVar(value=f"{int(self.vb)} Hz")
-        vb_scale = ttk.Scale(vb_frame, from_=1, to=400, orient="horizontal", command=self.update_vb, style='Horizontal.TScale')
-        vb_scale.set(self.vb)
-        vb_scale.pack(fill="x", padx=(6,0), expand=True)
+        self.vb_var = tk.StringVar(value=f"{int(self.engine.vb)} Hz")
+        self.vb_scale = ttk.Scale(vb_frame, from_=1, to=400, orient="horizontal", command=self.update_vb, style='Horizontal.TScale')
+        self.vb_scale.set(self.engine.vb)
+        self.vb_scale.pack(fill="x", padx=(6,0), expand=True)
         vb_label = ttk.Label(vb_frame, textvariable=self.vb_var, foreground=self.colors["accent_blue"], width=9, anchor="e")
         vb_label.pack(side="right", padx=(5,3))
 
+        points_frame = ttk.Frame(rbvb_box, style='TFrame')
+        points_frame.pack(fill="x", pady=5, padx=2)
+        ttk.Label(points_frame, text="扫描点数:", font=(zh_font, 10)).pack(side="left")
+        self.points_var = tk.IntVar(value=self.engine.sweep_points)
+        points_entry = ttk.Entry(points_frame, textvariable=self.points_var, width=10)
+        points_entry.pack(side="left", padx=(4,8))
+        ttk.Button(points_frame, text="设置", command=self.set_sweep_points).pack(side="left")
+
+        psd_frame = ttk.Frame(rbvb_box, style='TFrame')
+        psd_frame.pack(fill="x", pady=5, padx=2)
+        ttk.Label(psd_frame, text="谱估计:", font=(zh_font, 10)).pack(side="left")
+        self.psd_mode_var = tk.StringVar(value=PSD_MODES[self.engine.psd_mode])
+        psd_combo = ttk.Combobox(psd_frame, textvariable=self.psd_mode_var, values=list(PSD_MODES.values()), state="readonly", width=12, style='TCombobox')
+        psd_combo.pack(side="left", padx=(4,0))
+        psd_combo.bind("<<ComboboxSelected>>", self.on_psd_mode_select)
+
+        clock_frame = ttk.Frame(rbvb_box, style='TFrame')
+        clock_frame.pack(fill="x", pady=5, padx=2)
+        ttk.Label(clock_frame, text="扫描节拍:", font=(zh_font, 10)).pack(side="left")
+        self.clock_mode_var = tk.StringVar(value=CLOCK_MODES[self.clock.mode])
+        clock_combo = ttk.Combobox(clock_frame, textvariable=self.clock_mode_var, values=list(CLOCK_MODES.values()), state="readonly", width=12, style='TCombobox')
+        clock_combo.pack(side="left", padx=(4,0))
+        clock_combo.bind("<<ComboboxSelected>>", self.on_clock_mode_select)
+
         # 现代频谱仪功能
         trace_box = ttk.LabelFrame(self.panel, text="现代频谱仪功能", style='TLabelframe')
         trace_box.pack(fill="x", pady=(14,2), padx=3)
         ttk.Button(trace_box, text="保持当前曲线 (Trace Hold)", command=self.hold_trace).pack(fill="x", padx=4, pady=2)
         ttk.Button(trace_box, text="清除所有曲线", command=self.clear_traces).pack(fill="x", padx=4, pady=2)
+        ttk.Button(trace_box, text="曲线库 / 曲线运算", command=self.toggle_trace_bank).pack(fill="x", padx=4, pady=2)
         ttk.Checkbutton(trace_box, text="峰值搜索 (Peak Search)", command=self.toggle_peak_search, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
         ttk.Checkbutton(trace_box, text="平均 (Average)", command=self.toggle_avg, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
+        avg_frame = ttk.Frame(trace_box, style='TFrame')
+        avg_frame.pack(fill="x", padx=4, pady=2)
+        ttk.Label(avg_frame, text="次数:").pack(side="left")
+        self.avg_count_var = tk.IntVar(value=self.engine.avg_count)
+        ttk.Entry(avg_frame, textvariable=self.avg_count_var, width=6).pack(side="left", padx=(2,4))
+        self.avg_mode_var = tk.StringVar(value=AVG_MODES[self.engine.averager.mode])
+        ttk.Combobox(avg_frame, textvariable=self.avg_mode_var, values=list(AVG_MODES.values()), state="readonly", width=7, style='TCombobox').pack(side="left")
+        self.avg_scale_var = tk.StringVar(value=AVG_SCALES[self.engine.averager.scale])
+        ttk.Combobox(avg_frame, textvariable=self.avg_scale_var, values=list(AVG_SCALES.values()), state="readonly", width=8, style='TCombobox').pack(side="left", padx=(4,0))
+        ttk.Button(avg_frame, text="设置", command=self.set_averaging, width=4).pack(side="right")
+        ttk.Checkbutton(trace_box, text="多载波检测 (Detect)", command=self.toggle_detection, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
+        ttk.Checkbutton(trace_box, text="门限告警 (Limit)", command=self.toggle_limits, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
+        ttk.Checkbutton(trace_box, text="快速渲染 (Blit)", command=self.toggle_blit, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
         ttk.Button(trace_box, text="清除所有标点", command=self.clear_markers).pack(fill="x", padx=4, pady=2)
         ttk.Button(trace_box, text="导出当前频谱数据", command=self.export_spectrum).pack(fill="x", padx=4, pady=2)
+        ttk.Button(trace_box, text="导出性能统计 (JSON)", command=self.export_profile).pack(fill="x", padx=4, pady=2)
+        ttk.Button(trace_box, text="卫星群监测", command=self.toggle_fleet).pack(fill="x", padx=4, pady=2)
+        ttk.Checkbutton(trace_box, text="多频段调度", command=self.toggle_scheduler, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
+        ttk.Checkbutton(trace_box, text="录制 (Record)", command=self.toggle_record, variable=tk.IntVar()).pack(fill="x", padx=4, pady=2)
+        self.serve_var = tk.IntVar()
+        ttk.Checkbutton(trace_box, text="网络推送 (TCP / WebSocket)", command=self.toggle_server, variable=self.serve_var).pack(fill="x", padx=4, pady=2)
+        self.scpi_var = tk.IntVar()
+        ttk.Checkbutton(trace_box, text="远程控制 (SCPI)", command=self.toggle_scpi, variable=self.scpi_var).pack(fill="x", padx=4, pady=2)
+        # 默认只监听本机; 勾选后下次开启的服务监听所有网卡
+        self.lan_var = tk.IntVar()
+        ttk.Checkbutton(trace_box, text="允许局域网访问", variable=self.lan_var).pack(fill="x", padx=4, pady=2)
         ttk.Button(trace_box, text="重置最大/最小保持", command=self.reset_zoom).pack(fill="x", padx=4, pady=2)
         ttk.Button(trace_box, text="全部重置", command=self.reset_all).pack(fill="x", padx=4, pady=2)
 
@@ -290,12 +308,34 @@ class SatelliteSpectrumMonitor:
         reflevel_entry.pack(side="left", padx=(4,8))
         ttk.Button(reflevel_frame, text="设置", command=self.set_reflevel).pack(side="left")
 
+        # 采集文件回放
+        replay_box = ttk.LabelFrame(self.panel, text="回放", style='TLabelframe')
+        replay_box.pack(fill="x", pady=(14,2), padx=3)
+        replay_frame = ttk.Frame(replay_box, style='TFrame')
+        replay_frame.pack(fill="x", pady=4, padx=4)
+        ttk.Button(replay_frame, text="打开", command=self.open_capture, width=5).pack(side="left")
+        self.play_button = ttk.Button(replay_frame, text="播放", command=self.toggle_playback, width=5)
+        self.play_button.pack(side="left", padx=(4,0))
+        ttk.Button(replay_frame, text="实时", command=self.stop_replay, width=5).pack(side="left", padx=(4,0))
+        self.speed_var = tk.StringVar(value="1x")
+        speed_combo = ttk.Combobox(replay_frame, textvariable=self.speed_var, values=[f"{s:g}x" for s in PLAYBACK_SPEEDS], state="readonly", width=5, style='TCombobox')
+        speed_combo.pack(side="right")
+        speed_combo.bind("<<ComboboxSelected>>", self.on_speed_select)
+        self.scrub_scale = ttk.Scale(replay_box, from_=0, to=1, orient="horizontal", command=self.on_scrub, style='Horizontal.TScale')
+        self.scrub_scale.pack(fill="x", padx=4, pady=2)
+        self.replay_label = ttk.Label(replay_box, text="实时监测", style='TLabel')
+        self.replay_label.pack(fill="x", padx=4, pady=(0,4))
+
         self.status_bar = ttk.Label(self.panel, text="系统就绪，监测中...", style="Status.TLabel", anchor="w")
         self.status_bar.pack(fill="x", pady=(20, 6), padx=3, side="bottom")
+        self.pipeline_label = ttk.Label(self.panel, text="", style="Status.TLabel", anchor="w")
+        self.pipeline_label.pack(fill="x", pady=(6, 0), padx=3, side="bottom")
+        self.profile_label = ttk.Label(self.panel, text="", style="Status.TLabel", anchor="w")
+        self.profile_label.pack(fill="x", pady=(6, 0), padx=3, side="bottom")
 
     def update_satellite_labels(self):
-        sat = self.selected_sat
-        band = sat['bands'][self.selected_band_idx]
+        sat = self.engine.selected_sat
+        band = self.engine.current_band
         self.satellite_data = {
             "卫星名称": sat["name"],
             "卫星位置": sat["position"],
@@ -306,43 +346,123 @@ class SatelliteSpectrumMonitor:
             label.config(text=self.satellite_data.get(key, ""))
 
     def on_satellite_select(self, event):
-        idx = self.sat_names.index(self.sat_var.get())
-        self.selected_sat_idx = idx
-        self.selected_sat = self.satellites[idx]
-        self.selected_band_idx = 0
-        self.current_band = self.selected_sat["bands"][self.selected_band_idx]
-        self.noise_floor = self.current_band["noise_floor"]
-        self.carrier_configs = self.selected_sat["carriers"]
-        self.reset_zoom()
-        self.status_bar.config(text=f"已切换至 {self.selected_sat['name']}")
+        idx = self.engine.catalog.satellite_index(self.sat_var.get())
+        self.engine.select_satellite(idx)
+        self.refresh_band()
+
+    def load_catalog(self):
+        path = filedialog.askopenfilename(title="加载卫星目录", filetypes=[("卫星目录", "*.json *.csv"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            catalog = Catalog.load(path)
+        except Exception as e:
+            messagebox.showerror("加载失败", f"无法加载卫星目录: {e}")
+            return
+        self.engine.set_catalog(catalog)
+        # 文件修改后由扫描线程自动重新加载
+        self.engine.catalog_watch = True
+        self.apply_catalog()
+        self.status_bar.config(text=f"已加载卫星目录: {os.path.basename(path)} ({len(catalog.names)} 颗卫星, {len(catalog)} 个载波)")
+
+    def apply_catalog(self):
+        self.catalog_version = self.engine.catalog_version
+        self.satellites = self.engine.satellites
+        self.sat_names = self.engine.sat_names
+        self.sat_combo.configure(values=self.sat_names)
+        self.sat_var.set(self.engine.selected_sat["name"])
+        self.refresh_band()
+
+    def refresh_band(self):
+        band = self.engine.current_band
+        self.noise_floor_line.set_data([band["min"], band["max"]], [self.engine.noise_floor, self.engine.noise_floor])
+        self.update_satellite_labels()
+        self.apply_span()
+        if self.scheduler is not None:
+            # 各频段的保持/平均状态由调度器分别保存, 切换时直接显示该频段最近一次扫描
+            last = self.scheduler.last(self.view_key())
+            if last is not None:
+                self.pipeline.latest.put(last)
+        self.status_bar.config(text=f"已切换至 {self.engine.selected_sat['name']}")
+
+    def on_psd_mode_select(self, event):
+        mode = next(k for k, v in PSD_MODES.items() if v == self.psd_mode_var.get())
+        self.engine.set_psd_mode(mode)
+        if mode == "welch":
+            band = self.engine.current_band
+            self.engine.iq.configure(self.engine.rb, self.engine.vb, (band["max"] - band["min"]) * 1e6)
+            self.status_bar.config(text=f"IQ + Welch: FFT {self.engine.iq.nfft} 点, 等效 RBW {self.engine.iq.rbw / 1e3:.1f} kHz")
+        else:
+            self.status_bar.config(text="解析包络谱")
+
+    def on_clock_mode_select(self, event):
+        mode = next(k for k, v in CLOCK_MODES.items() if v == self.clock_mode_var.get())
+        if self.remote:
+            self.engine.set_clock(mode)
+        else:
+            self.clock.configure(mode)
+        if mode == "instrument":
+            self.status_bar.config(text=f"仪表扫描时间: {self.engine.sweep_time() * 1e3:.1f} ms")
+        else:
+            self.status_bar.config(text=f"扫描节拍: {self.clock_mode_var.get()}")
 
     def create_display_area(self):
+        load_matplotlib()
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        self.spectrum_cmap = self.create_spectrum_cmap()
         self.fig = Figure(figsize=(11, 7), dpi=100, facecolor=self.colors["bg_light"])
-        self.ax_spectrum = self.fig.add_subplot(111)
+        grid = self.fig.add_gridspec(2, 1, height_ratios=(3, 1))
+        self.ax_spectrum = self.fig.add_subplot(grid[0])
+        self.ax_waterfall = self.fig.add_subplot(grid[1], sharex=self.ax_spectrum)
         self.style_axis(self.ax_spectrum)
+        self.style_axis(self.ax_waterfall)
         self.ax_spectrum.set_title('卫星频谱（现代化模拟）', color=self.colors["accent_blue"], fontsize=14, pad=20, fontproperties=zh_font)
-        self.ax_spectrum.set_xlabel('频率 (MHz)', color=self.colors["fg_primary"], fontsize=12, labelpad=14, fontproperties=zh_font)
         self.ax_spectrum.set_ylabel('功率 (dBm)', color=self.colors["fg_primary"], fontsize=12, labelpad=14, fontproperties=zh_font)
-        band_info = self.current_band
+        self.ax_spectrum.tick_params(labelbottom=False)
+        self.ax_waterfall.set_xlabel('频率 (MHz)', color=self.colors["fg_primary"], fontsize=12, labelpad=14, fontproperties=zh_font)
+        self.ax_waterfall.set_ylabel('扫描', color=self.colors["fg_primary"], fontsize=12, labelpad=14, fontproperties=zh_font)
+        band_info = self.engine.current_band
         freq_min = band_info["min"]
         freq_max = band_info["max"]
-        x = np.linspace(freq_min, freq_max, 1000)
+        x = np.array([freq_min, freq_max], dtype=float)
         y = np.zeros_like(x)
         self.spectrum_line, = self.ax_spectrum.plot(x, y, color=self.colors["spectrum"], linewidth=2.5, alpha=0.93, label='实时频谱')
         self.max_hold_line, = self.ax_spectrum.plot(x, y, color=self.colors["spectrum_max"], linewidth=1.5, alpha=0.8, linestyle='--', label='最大保持')
         self.min_hold_line, = self.ax_spectrum.plot(x, y, color=self.colors["accent_green"], linewidth=1.5, alpha=0.7, linestyle=':', label='最小保持')
-        self.noise_floor_line, = self.ax_spectrum.plot([freq_min, freq_max], [self.noise_floor, self.noise_floor], color=self.colors["noise_floor"], linestyle='-.', linewidth=1.6, alpha=0.95, label='噪声底')
+        self.noise_floor_line, = self.ax_spectrum.plot([freq_min, freq_max], [self.engine.noise_floor, self.engine.noise_floor], color=self.colors["noise_floor"], linestyle='-.', linewidth=1.6, alpha=0.95, label='噪声底')
+        self.waterfall = WaterfallBuffer(self.waterfall_rows, WATERFALL_COLUMNS)
+        self.waterfall_image = self.ax_waterfall.imshow(self.waterfall.view(), aspect='auto', origin='lower', interpolation='nearest', cmap=self.spectrum_cmap,
+                                                        extent=(freq_min, freq_max, 0, self.waterfall_rows))
         self.trace_lines = []
-        self.peak_marker = None
-        self.avg_line = None
+        self.avg_line, = self.ax_spectrum.plot(x, y, color=self.colors["accent_orange"], linestyle='-', linewidth=2, alpha=0.8, label='Average', visible=False)
+        self.peak_marker, = self.ax_spectrum.plot([], [], marker="o", color=self.colors["accent_red"], markersize=12, markeredgecolor="white", linestyle='', zorder=20, visible=False)
+        self.peak_text = self.ax_spectrum.text(0, 0, "", color=self.colors["accent_red"], fontsize=10, ha='left', va='bottom', backgroundcolor="#fff8e1", zorder=21, visible=False)
+        self.known_markers, = self.ax_spectrum.plot([], [], marker="v", color=self.colors["accent_green"], markersize=9, markeredgecolor="white", linestyle='', zorder=19, visible=False)
+        self.unknown_markers, = self.ax_spectrum.plot([], [], marker="v", color=self.colors["accent_red"], markersize=9, markeredgecolor="white", linestyle='', zorder=19, visible=False)
+        self.detection_text = self.ax_spectrum.text(0.02, 0.93, "", color=self.colors["fg_secondary"], fontsize=10, ha='left', va='top', transform=self.ax_spectrum.transAxes, visible=False)
+        self.limit_line, = self.ax_spectrum.plot([], [], color=self.colors["accent_red"], linestyle='--', linewidth=1.2, alpha=0.7, label='门限', visible=False)
+        self.limit_lower_line, = self.ax_spectrum.plot([], [], color=self.colors["accent_red"], linestyle=':', linewidth=1.2, alpha=0.7, visible=False)
+        # 告警频段画在图顶部 (x 为数据坐标, y 为坐标轴比例)
+        self.alarm_line, = self.ax_spectrum.plot([], [], color=self.colors["accent_red"], linewidth=6, solid_capstyle='projecting', transform=self.ax_spectrum.get_xaxis_transform(), zorder=22, visible=False)
+        self.alarm_text = self.ax_spectrum.text(0.02, 0.88, "", color=self.colors["accent_red"], fontsize=10, ha='left', va='top', transform=self.ax_spectrum.transAxes, visible=False)
+        self.last_limit_event = None
+        self.legend_handles = None
 
         self.set_ylim_by_scale()
-        self.ax_spectrum.legend(loc='upper right', facecolor=self.colors["bg_panel"], edgecolor=self.colors["accent_blue"], labelcolor=self.colors["fg_primary"], fontsize=10, prop={'family': zh_font})
-        self.rb_vb_text = self.ax_spectrum.text(0.02, 0.02, f"RB: {int(self.rb)} Hz | VB: {int(self.vb)} Hz", color=self.colors["fg_secondary"], fontsize=10, ha='left', va='bottom', transform=self.ax_spectrum.transAxes)
+        self.refresh_legend()
+        self.rb_vb_text = self.ax_spectrum.text(0.02, 0.02, f"RB: {int(self.engine.rb)} Hz | VB: {int(self.engine.vb)} Hz", color=self.colors["fg_secondary"], fontsize=10, ha='left', va='bottom', transform=self.ax_spectrum.transAxes)
         self.cursor_text = self.ax_spectrum.text(0.98, 0.02, "", color=self.colors["fg_primary"], fontsize=10, ha='right', va='bottom', transform=self.ax_spectrum.transAxes, bbox=dict(boxstyle="round,pad=0.2", facecolor="#e3e9f0", edgecolor="#98c1fe"))
+        self.fps_text = self.ax_spectrum.text(0.02, 0.98, "", color=self.colors["fg_muted"], fontsize=9, ha='left', va='top', transform=self.ax_spectrum.transAxes)
         self.fig.tight_layout(rect=(0, 0, 1, 1))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.display_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=0)
+        self.frame_meter = FrameRateMeter()
+        self.blit_manager = BlitManager(self.canvas, [
+            self.spectrum_line, self.max_hold_line, self.min_hold_line, self.avg_line,
+            self.peak_marker, self.peak_text, self.rb_vb_text, self.cursor_text, self.fps_text, self.waterfall_image,
+            self.known_markers, self.unknown_markers, self.detection_text,
+            self.limit_line, self.limit_lower_line, self.alarm_line, self.alarm_text])
         self.canvas.draw()
         self.setup_mouse_interactions()
 
@@ -352,8 +472,28 @@ class SatelliteSpectrumMonitor:
         scale = self.ylim_scale
         ndiv = 8
         self.ax_spectrum.set_ylim(ref - scale * ndiv, ref)
+        self.waterfall_image.set_clim(ref - scale * ndiv, ref)
+        for marker in self.markers:
+            marker['label'].set_y(ref)
+
+    def refresh_legend(self):
+        # 仅在曲线集合变化时重建图例, 返回是否重建
+        handles = [self.spectrum_line, self.max_hold_line, self.min_hold_line, self.noise_floor_line] + self.traces
+        if self.avg_line.get_visible():
+            handles.append(self.avg_line)
+        if self.limit_line.get_visible():
+            handles.append(self.limit_line)
+        if handles == self.legend_handles:
+            return False
+        self.legend_handles = handles
+        self.ax_spectrum.legend(handles=handles, loc='upper right', facecolor=self.colors["bg_panel"], edgecolor=self.colors["accent_blue"], labelcolor=self.colors["fg_primary"], fontsize=10, prop={'family': zh_font})
+        return True
+
+    def request_redraw(self):
+        self.blit_manager.update()
 
     def style_axis(self, ax):
+        from matplotlib.ticker import AutoMinorLocator
         ax.set_facecolor(self.colors["bg_light"])
         ax.grid(True, color=self.colors["grid"], linestyle='--', alpha=0.5)
         ax.tick_params(axis='x', colors=self.colors["fg_secondary"], labelsize=11)
@@ -365,6 +505,7 @@ class SatelliteSpectrumMonitor:
         ax.tick_params(which='minor', length=3, color=self.colors["grid"], width=1)
 
     def setup_mouse_interactions(self):
+        from matplotlib.widgets import RectangleSelector
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
         self.canvas.mpl_connect('button_press_event', self.on_mouse_click)
         self.canvas.mpl_connect('button_press_event', self.on_marker_click)
@@ -380,7 +521,7 @@ class SatelliteSpectrumMonitor:
             cursor_power = event.ydata
             if cursor_freq is not None and cursor_power is not None:
                 self.cursor_text.set_text(f"频率: {cursor_freq:.3f} MHz | 电平: {cursor_power:.2f} dBm")
-                self.canvas.draw_idle()
+                self.request_redraw()
 
     def on_mouse_click(self, event):
         if event.inaxes == self.ax_spectrum and event.button == 1 and event.dblclick:
@@ -392,12 +533,23 @@ class SatelliteSpectrumMonitor:
         if x1 is not None and x2 is not None:
             if x1 > x2:
                 x1, x2 = x2, x1
-            self.zoom_freq_min = x1
-            self.zoom_freq_max = x2
-            self.zoom_active = True
-            self.ax_spectrum.set_xlim(x1, x2)
-            self.status_bar.config(text=f"放大显示区域: {x1:.1f} MHz - {x2:.1f} MHz")
-            self.canvas.draw_idle()
+            if self.player is not None:
+                # 回放的扫描网格已固定, 只放大显示
+                self.zoom_freq_min = x1
+                self.zoom_freq_max = x2
+                self.zoom_active = True
+                self.ax_spectrum.set_xlim(x1, x2)
+                self.status_bar.config(text=f"放大显示区域: {x1:.1f} MHz - {x2:.1f} MHz")
+                self.canvas.draw_idle()
+                return
+            try:
+                self.engine.set_span(x1, x2)
+            except ValueError as e:
+                self.status_bar.config(text=str(e))
+                return
+            self.apply_span()
+            freq_min, freq_max = self.engine.sweep_range
+            self.status_bar.config(text=f"扫描跨度: {freq_min:.3f} MHz - {freq_max:.3f} MHz, {self.engine.sweep_points} 点")
 
     def on_marker_click(self, event):
         if event.inaxes == self.ax_spectrum and event.button == 3:
@@ -412,13 +564,16 @@ class SatelliteSpectrumMonitor:
                     self.canvas.draw_idle()
                     self.status_bar.config(text=f"移除标点: {marker['freq']:.2f} MHz")
                     return
-            ylim = self.ax_spectrum.get_ylim()
-            line = self.ax_spectrum.axvline(freq, color=self.colors["marker"], linestyle='--', linewidth=2)
-            label = self.ax_spectrum.text(freq, ylim[1], f"{freq:.2f} MHz", color=self.colors["marker"],
-                                         fontsize=10, ha='center', va='bottom', backgroundcolor="#fff8e1", zorder=10)
-            self.markers.append({'freq': freq, 'line': line, 'label': label})
-            self.canvas.draw_idle()
-            self.status_bar.config(text=f"添加标点: {freq:.2f} MHz")
+            self.add_marker(freq)
+
+    def add_marker(self, freq):
+        ylim = self.ax_spectrum.get_ylim()
+        line = self.ax_spectrum.axvline(freq, color=self.colors["marker"], linestyle='--', linewidth=2)
+        label = self.ax_spectrum.text(freq, ylim[1], f"{freq:.2f} MHz", color=self.colors["marker"],
+                                     fontsize=10, ha='center', va='bottom', backgroundcolor="#fff8e1", zorder=10)
+        self.markers.append({'freq': freq, 'line': line, 'label': label})
+        self.canvas.draw_idle()
+        self.status_bar.config(text=f"添加标点: {freq:.2f} MHz")
 
     def clear_markers(self):
         for marker in self.markers:
@@ -429,68 +584,248 @@ class SatelliteSpectrumMonitor:
         self.status_bar.config(text="已清除所有标点")
 
     def hold_trace(self):
-        freq, psd = self.generate_spectrum()
-        if len(self.traces) >= self.traces_max:
-            old_line = self.traces.pop(0)
-            old_line.remove()
-        line, = self.ax_spectrum.plot(freq, psd, linestyle='-', alpha=0.5, linewidth=1.5, color=self.colors["trace"], label=f'Trace {len(self.traces)+1}')
-        self.traces.append(line)
-        self.ax_spectrum.legend(loc='upper right', facecolor=self.colors["bg_panel"], edgecolor=self.colors["accent_blue"], labelcolor=self.colors["fg_primary"], fontsize=10, prop={'family': zh_font})
-        self.canvas.draw_idle()
-        self.status_bar.config(text=f"已保持曲线（Trace Hold）")
+        # 冻结最近一次显示的扫描
+        sweep = self.last_sweep
+        if sweep is None:
+            self.status_bar.config(text="暂无可保持的扫描")
+            return
+        try:
+            slot = self.trace_bank.store(sweep)
+        except ValueError:
+            if not messagebox.askyesno("曲线库", "当前扫描的点数或频率范围与已存曲线不同, 是否清空曲线库后保存?"):
+                return
+            self.trace_bank.clear()
+            slot = self.trace_bank.store(sweep)
+        self.redraw_traces()
+        self.status_bar.config(text=f"已保持曲线 {self.trace_bank.name(slot)}（Trace Hold）")
 
     def clear_traces(self):
+        self.trace_bank.clear()
+        self.redraw_traces()
+        self.status_bar.config(text="已清除所有曲线")
+
+    def redraw_traces(self):
+        self.refresh_trace_lines()
+        self.refresh_legend()
+        self.canvas.draw_idle()
+        self.refresh_bank_list()
+
+    def refresh_trace_lines(self):
+        # 只画选中显示的曲线; 曲线集合、显示范围或参考电平变化时才重新抽取, 返回是否重建
+        bank = self.trace_bank
+        key = (bank.version, self.ax_spectrum.get_xlim(), self.display_columns(), self.ref_level, self.ylim_scale)
+        if key == self.trace_view_key:
+            return False
+        self.trace_view_key = key
         for line in self.traces:
             line.remove()
-        self.traces.clear()
-        self.ax_spectrum.legend(loc='upper right', facecolor=self.colors["bg_panel"], edgecolor=self.colors["accent_blue"], labelcolor=self.colors["fg_primary"], fontsize=10, prop={'family': zh_font})
-        self.canvas.draw_idle()
-        self.status_bar.config(text="已清除所有曲线")
+        self.traces = []
+        slots = bank.slots(visible_only=True)
+        if not len(slots):
+            return True
+        freq = bank.grid()
+        # 差值曲线 (dB) 以屏幕中线为 0 dB 绘制
+        midline = self.ref_level - self.ylim_scale * 4
+        for slot in slots:
+            x, y = self.decimate_for_display(freq, bank.data[slot])
+            relative = bank.meta["relative"][slot]
+            label = f"{bank.name(slot)} (中线 0 dB)" if relative else bank.name(slot)
+            line, = self.ax_spectrum.plot(x, y + midline if relative else y, linestyle='-', alpha=0.5, linewidth=1.5,
+                                          color=self.colors["accent_purple" if relative else "trace"], label=label)
+            self.traces.append(line)
+        return True
+
+    def toggle_trace_bank(self):
+        if self.bank_window is not None:
+            self.close_trace_bank()
+            return
+        self.bank_window = tk.Toplevel(self.root)
+        self.bank_window.title("曲线库")
+        self.bank_window.configure(bg=self.colors["bg_light"])
+        self.bank_window.protocol("WM_DELETE_WINDOW", self.close_trace_bank)
+        self.bank_list = tk.Listbox(self.bank_window, selectmode="extended", width=56, height=16, exportselection=False)
+        self.bank_list.pack(side="left", fill=tk.BOTH, expand=True, padx=4, pady=4)
+        buttons = ttk.Frame(self.bank_window, style='TFrame')
+        buttons.pack(side="right", fill="y", padx=4, pady=4)
+        for text, command in (("显示所选", lambda: self.show_selected_traces(True)), ("隐藏所选", lambda: self.show_selected_traces(False)),
+                              ("删除所选", self.remove_selected_traces), ("A − B", self.trace_difference),
+                              ("所选取最大", lambda: self.trace_reduce("max")), ("所选取最小", lambda: self.trace_reduce("min")),
+                              ("减参考 (首条)", self.trace_reference_difference), ("保存曲线库", self.save_trace_bank),
+                              ("载入曲线库", self.load_trace_bank)):
+            ttk.Button(buttons, text=text, command=command).pack(fill="x", pady=2)
+        self.bank_slots = []
+        self.refresh_bank_list()
+
+    def close_trace_bank(self):
+        if self.bank_window is not None:
+            self.bank_window.destroy()
+            self.bank_window = None
+
+    def refresh_bank_list(self):
+        if self.bank_window is None:
+            return
+        bank = self.trace_bank
+        self.bank_slots = list(bank.slots())
+        self.bank_list.delete(0, tk.END)
+        for slot in self.bank_slots:
+            meta = bank.meta[slot]
+            sat = self.sat_names[meta["sat"]] if 0 <= meta["sat"] < len(self.sat_names) else "运算"
+            stamp = datetime.datetime.fromtimestamp(meta["timestamp"]).strftime('%H:%M:%S') if meta["timestamp"] else ""
+            self.bank_list.insert(tk.END, f"{bank.name(slot):<16} {sat} {stamp} {'显示' if meta['visible'] else '隐藏'}")
+
+    def selected_traces(self):
+        return [self.bank_slots[i] for i in self.bank_list.curselection()]
+
+    def show_selected_traces(self, visible):
+        self.trace_bank.set_visible(self.selected_traces(), visible)
+        self.redraw_traces()
+
+    def remove_selected_traces(self):
+        self.trace_bank.remove(self.selected_traces())
+        self.redraw_traces()
+
+    def trace_difference(self):
+        slots = self.selected_traces()
+        if len(slots) != 2:
+            messagebox.showinfo("曲线运算", "A − B 需要恰好选择两条曲线 (按列表顺序, 上减下)")
+            return
+        slot = self.trace_bank.difference(*slots)
+        self.redraw_traces()
+        self.status_bar.config(text=f"曲线运算: {self.trace_bank.name(slot)}")
+
+    def trace_reduce(self, op):
+        slots = self.selected_traces()
+        if len(slots) < 2:
+            messagebox.showinfo("曲线运算", "请至少选择两条曲线")
+            return
+        slot = self.trace_bank.reduce(op, slots)
+        self.redraw_traces()
+        self.status_bar.config(text=f"曲线运算: {self.trace_bank.name(slot)}")
+
+    def trace_reference_difference(self):
+        slots = self.selected_traces()
+        if len(slots) < 2:
+            messagebox.showinfo("曲线运算", "请选择参考曲线 (列表中最上面一条) 及至少一条其他曲线")
+            return
+        results = self.trace_bank.reference_difference(slots[1:], slots[0])
+        self.redraw_traces()
+        self.status_bar.config(text=f"曲线运算: {len(results)} 条曲线减去参考 {self.trace_bank.name(slots[0])}")
+
+    def save_trace_bank(self):
+        path = filedialog.asksaveasfilename(title="保存曲线库", defaultextension=".npz", filetypes=[("曲线库", "*.npz")])
+        if not path:
+            return
+        try:
+            self.trace_bank.save(path)
+            self.status_bar.config(text=f"曲线库已保存: {path}")
+        except Exception as e:
+            messagebox.showerror("保存失败", f"无法保存曲线库: {e}")
+
+    def load_trace_bank(self):
+        path = filedialog.askopenfilename(title="载入曲线库", filetypes=[("曲线库", "*.npz"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            count = self.trace_bank.load(path)
+        except Exception as e:
+            messagebox.showerror("载入失败", f"无法载入曲线库: {e}")
+            return
+        self.redraw_traces()
+        self.status_bar.config(text=f"已载入 {count} 条曲线: {path}")
 
     def toggle_peak_search(self):
-        self.peak_search_enabled = not self.peak_search_enabled
-        self.status_bar.config(text=f"{'启用' if self.peak_search_enabled else '关闭'}峰值搜索（Peak Search）")
+        self.engine.peak_search_enabled = not self.engine.peak_search_enabled
+        self.status_bar.config(text=f"{'启用' if self.engine.peak_search_enabled else '关闭'}峰值搜索（Peak Search）")
 
     def toggle_avg(self):
-        self.avg_enabled = not self.avg_enabled
-        self.status_bar.config(text=f"{'启用' if self.avg_enabled else '关闭'}平均（Average）")
-        if not self.avg_enabled and self.avg_line:
-            self.avg_line.remove()
-            self.avg_line = None
+        self.engine.avg_enabled = not self.engine.avg_enabled
+        self.status_bar.config(text=f"{'启用' if self.engine.avg_enabled else '关闭'}平均（Average）")
+        if not self.engine.avg_enabled:
+            self.avg_line.set_visible(False)
+            self.refresh_legend()
             self.canvas.draw_idle()
 
+    def set_averaging(self):
+        try:
+            count = int(self.avg_count_var.get())
+            mode = next(k for k, v in AVG_MODES.items() if v == self.avg_mode_var.get())
+            scale = next(k for k, v in AVG_SCALES.items() if v == self.avg_scale_var.get())
+            self.engine.configure_averaging(count, mode, scale)
+            self.status_bar.config(text=f"平均设置: {count} 次, {AVG_MODES[mode]}, {AVG_SCALES[scale]}")
+        except Exception as e:
+            messagebox.showerror("输入错误", f"无效的平均设置: {e}")
+
+    def toggle_detection(self):
+        self.engine.detect_enabled = not self.engine.detect_enabled
+        if self.engine.detect_enabled:
+            path = f"detections_{self.engine.selected_sat['name']}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            self.engine.detection_log = AsyncJsonlWriter(path)
+            self.status_bar.config(text=f"启用多载波检测, 日志: {path}")
+        else:
+            log, self.engine.detection_log = self.engine.detection_log, None
+            if log is not None:
+                log.close()
+            self.status_bar.config(text="关闭多载波检测")
+
+    def toggle_limits(self):
+        self.engine.limits_enabled = not self.engine.limits_enabled
+        if self.engine.limits_enabled:
+            path = f"limits_{self.engine.selected_sat['name']}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            self.engine.limit_log = AsyncJsonlWriter(path)
+            self.status_bar.config(text=f"启用门限告警, 日志: {path}")
+        else:
+            log, self.engine.limit_log = self.engine.limit_log, None
+            if log is not None:
+                log.close()
+            self.last_limit_event = None
+            self.status_bar.config(text="关闭门限告警")
+
+    def toggle_blit(self):
+        self.blit_manager.set_enabled(not self.blit_manager.enabled)
+        self.status_bar.config(text=f"{'启用' if self.blit_manager.enabled else '关闭'}快速渲染（Blit）")
+
     def update_rb(self, value):
-        self.rb = float(value)
-        self.rb_var.set(f"{int(self.rb)} Hz")
-        self.rb_vb_text.set_text(f"RB: {int(self.rb)} Hz | VB: {int(self.vb)} Hz")
+        self.engine.rb = float(value)
+        self.rb_var.set(f"{int(self.engine.rb)} Hz")
+        self.rb_vb_text.set_text(f"RB: {int(self.engine.rb)} Hz | VB: {int(self.engine.vb)} Hz")
+        self.request_redraw()
 
     def update_vb(self, value):
-        self.vb = float(value)
-        self.vb_var.set(f"{int(self.vb)} Hz")
-        self.rb_vb_text.set_text(f"RB: {int(self.rb)} Hz | VB: {int(self.vb)} Hz")
+        self.engine.vb = float(value)
+        self.vb_var.set(f"{int(self.engine.vb)} Hz")
+        self.rb_vb_text.set_text(f"RB: {int(self.engine.rb)} Hz | VB: {int(self.engine.vb)} Hz")
+        self.request_redraw()
 
     def reset_zoom(self):
-        band_info = self.current_band
-        freq_min = band_info["min"]
-        freq_max = band_info["max"]
+        self.engine.set_span()
+        self.apply_span()
+        self.engine.reset_holds()
+        if self.scheduler is not None:
+            self.scheduler.reset_holds(self.view_key())
+        self.status_bar.config(text="最大/最小保持已重置")
+
+    def apply_span(self):
+        # 坐标轴与瀑布图跟随引擎的扫描跨度 (回放时跟随记录的跨度); 流水线中按旧跨度生成的帧直接丢弃
+        if self.player is None:
+            freq_min, freq_max = self.engine.sweep_range
+            self.pipeline.flush()
+        else:
+            freq_min, freq_max = self.replay_span
         self.ax_spectrum.set_xlim(freq_min, freq_max)
-        self.zoom_active = False
-        self.zoom_freq_min = None
-        self.zoom_freq_max = None
-        n = 1000
-        self.max_hold = np.full(n, -1e9)
-        self.min_hold = np.full(n, 1e9)
+        self.waterfall.clear()
+        self.waterfall_image.set_data(self.waterfall.view())
+        self.waterfall_image.set_extent((freq_min, freq_max, 0, self.waterfall_rows))
+        self.zoom_active = self.engine.span is not None
+        self.zoom_freq_min, self.zoom_freq_max = self.engine.span or (None, None)
         self.set_ylim_by_scale()
         self.canvas.draw_idle()
-        self.status_bar.config(text="最大/最小保持已重置")
 
     def reset_all(self):
         self.reset_zoom()
         self.clear_markers()
         self.clear_traces()
-        self.peak_search_enabled = False
-        self.avg_enabled = False
-        self.avg_data.clear()
+        self.engine.peak_search_enabled = False
+        self.engine.avg_enabled = False
         self.ylim_scale = 10
         self.ref_level = -30
         self.scale_var.set(self.ylim_scale)
@@ -510,6 +845,15 @@ class SatelliteSpectrumMonitor:
         except Exception as e:
             messagebox.showerror("输入错误", f"无效的Scale值: {e}")
 
+    def set_sweep_points(self):
+        try:
+            value = int(self.points_var.get())
+            self.engine.set_sweep_points(value)
+            self.apply_span()
+            self.status_bar.config(text=f"扫描点数设为 {value}")
+        except Exception as e:
+            messagebox.showerror("输入错误", f"无效的扫描点数: {e}")
+
     def set_reflevel(self):
         try:
             value = float(self.reflevel_var.get())
@@ -520,150 +864,503 @@ class SatelliteSpectrumMonitor:
         except Exception as e:
             messagebox.showerror("输入错误", f"无效的Ref Level: {e}")
 
-    def apply_rb_vb_filtering(self, psd_db):
-        rb = np.clip(self.rb, 1, 40000)
-        freq_span = self.current_band["max"] - self.current_band["min"]
-        n_points = len(psd_db)
-        rb_sigma_hz = rb / 2.355
-        res_bw_per_point = (freq_span * 1e6) / n_points
-        sigma_pts = rb_sigma_hz / res_bw_per_point
-        kernel_len = int(sigma_pts * 12)
-        if kernel_len < 5:
-            kernel_len = 5
-        if kernel_len % 2 == 0:
-            kernel_len += 1
-        x = np.arange(kernel_len) - kernel_len // 2
-        kernel = np.exp(-0.5 * (x / sigma_pts) ** 2)
-        kernel /= kernel.sum()
-        rb_filtered = np.convolve(psd_db, kernel, mode='same')
-        vb = np.clip(self.vb, 1, 400)
-        dt = 0.01
-        tau = 1.0 / (2 * np.pi * vb)
-        alpha = dt / (tau + dt)
-        vb_filtered = np.zeros_like(rb_filtered)
-        vb_filtered[0] = rb_filtered[0]
-        for i in range(1, len(rb_filtered)):
-            vb_filtered[i] = alpha * rb_filtered[i] + (1 - alpha) * vb_filtered[i-1]
-        return vb_filtered
-
-    def modulation_spectrum(self, freq, center_freq, bandwidth, power, modulation):
-        bw = bandwidth
-        roll_off = 0.35 if "QAM" in modulation or "PSK" in modulation else 0.2
-        symbol_bw = bw * (1 + roll_off)
-        dist = freq - center_freq
-        envelope = np.zeros_like(freq)
-        inband = np.abs(dist) <= (bw/2)
-        envelope[inband] = 1.0
-        rolloff_band = (np.abs(dist) > (bw/2)) & (np.abs(dist) <= (symbol_bw/2))
-        envelope[rolloff_band] = 0.5 * (1 + np.cos(np.pi * (np.abs(dist[rolloff_band]) - bw/2) / (symbol_bw/2 - bw/2)))
-        envelope += 0.08 * np.exp(-0.5 * ((dist/(symbol_bw/2))**2))
-        envelope = envelope.clip(0, 1)
-        spectrum = envelope * (power - self.noise_floor) + self.noise_floor
-        spectrum += np.random.uniform(-0.8, 0.8, size=spectrum.shape)
-        return spectrum
-
-    def generate_spectrum(self):
-        band_info = self.current_band
-        freq_min = band_info["min"]
-        freq_max = band_info["max"]
-        freq = np.linspace(freq_min, freq_max, 1000)
-        noise_variation = np.random.normal(0, 1, len(freq))
-        psd = self.noise_floor + noise_variation
-        for carrier in self.carrier_configs:
-            carrier_freq = carrier["freq"]
-            bandwidth = carrier["bw"]
-            power = carrier["power"]
-            mod = carrier["modulation"]
-            mod_curve = self.modulation_spectrum(freq, carrier_freq, bandwidth, power, mod)
-            psd = np.maximum(psd, mod_curve)
-        psd = self.apply_rb_vb_filtering(psd)
-        return freq, psd
-
-    def update_simulation(self):
-        while self.running:
+    def next_frame(self):
+        player = self.player
+        if player is not None:
+            return self.replay_frame(player)
+        if self.scheduler is not None:
+            # 实时扫描改由调度器完成
+            self.clock.reset()
+            return None
+        if self.remote:
+            # 引擎进程按自己的节拍扫描, 这里只取最新一帧
+            return self.engine.acquire()
+        if not self.clock.wait(lambda: self.pipeline.running and self.player is None and self.scheduler is None):
+            return None
+        return self.engine.acquire()
+
+    def process_frame(self, frame):
+        sweep = self.engine.process_frame(frame)
+        # 引擎进程送来的是已处理完的扫描
+        if isinstance(frame, Sweep) or frame.replay is None:
+            self.record_sweep(sweep)
+        self.publish_sweep(sweep)
+        return sweep
+
+    def publish_sweep(self, sweep):
+        server = self.server
+        if server is not None:
+            server.publish(sweep)
+        scpi = self.scpi
+        if scpi is not None:
+            scpi.instrument.update(sweep)
+
+    def view_key(self):
+        return self.engine.selected_sat_idx, self.engine.selected_band_idx
+
+    def toggle_scheduler(self):
+        if self.scheduler is not None:
+            scheduler, self.scheduler = self.scheduler, None
+            scheduler.stop()
+            self.engine.reset_holds()
+            if self.remote:
+                self.engine.pause(False)
+            self.status_bar.config(text="关闭多频段调度")
+            return
+        scheduler = BandScheduler(self.engine.catalog, on_sweep=self.scheduled_sweep)
+        scheduler.follow(self.engine)
+        if self.remote:
+            self.engine.pause()
+        self.pipeline.flush()
+        self.scheduler = scheduler.start()
+        self.status_bar.config(text=f"多频段调度: {len(scheduler)} 个频段, {scheduler.workers} 个工作线程")
+
+    def scheduled_sweep(self, key, sweep):
+        # 在线程池中调用: 当前查看的频段送显示/录制/SCPI, 所有频段都推送给网络客户端
+        if key != self.view_key():
+            server = self.server
+            if server is not None:
+                server.publish(sweep)
+            return
+        if self.player is None:
+            self.record_sweep(sweep)
+            # 回调返回后调度器可能释放这一帧, 交给显示的一份另行持有
+            self.pipeline.latest.put(retain(sweep))
+        self.publish_sweep(sweep)
+
+    def poll_render(self):
+        # 主线程: 只取最新一帧绘制, 其间被覆盖的帧由流水线计为丢帧
+        if not self.running:
+            return
+        t0 = time.perf_counter()
+        sweep = self.pipeline.latest.take()
+        if sweep is not None:
             try:
-                freq, psd = self.generate_spectrum()
-                if not hasattr(self, 'max_hold') or len(self.max_hold) != len(psd):
-                    self.max_hold = psd.copy()
-                else:
-                    self.max_hold = np.maximum(self.max_hold, psd)
-                if not hasattr(self, 'min_hold') or len(self.min_hold) != len(psd):
-                    self.min_hold = psd.copy()
-                else:
-                    self.min_hold = np.minimum(self.min_hold, psd)
-
-                # Average
-                if self.avg_enabled:
-                    self.avg_data.append(psd)
-                    if len(self.avg_data) > self.avg_count:
-                        self.avg_data.pop(0)
-                    avg_curve = np.mean(self.avg_data, axis=0)
-                else:
-                    self.avg_data.clear()
-                    avg_curve = None
-
-                # Peak Search
-                peak_freq = peak_val = None
-                if self.peak_search_enabled:
-                    idx = np.argmax(psd)
-                    peak_freq = freq[idx]
-                    peak_val = psd[idx]
-
-                self.root.after(0, self.update_plots, freq, psd, avg_curve, peak_freq, peak_val)
-                self.current_utc = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-                self.time_label.config(text=f"UTC: {self.current_utc}")
-                time.sleep(0.1)
+                self.update_plots(sweep)
             except Exception as e:
-                print(f"更新错误: {e}")
-                time.sleep(1.0)
-
-    def update_plots(self, freq, psd, avg_curve, peak_freq, peak_val):
-        self.spectrum_line.set_data(freq, psd)
-        self.max_hold_line.set_data(freq, self.max_hold)
-        self.min_hold_line.set_data(freq, self.min_hold)
-        self.noise_floor_line.set_data([self.current_band["min"], self.current_band["max"]], [self.noise_floor, self.noise_floor])
-        self.set_ylim_by_scale()
+                print(f"绘图错误: {e}")
+        fleet = self.fleet_slot.take()
+        if fleet is not None and fleet[0] is self.fleet:
+            self.update_fleet_plots(*fleet[1:])
+        while not self.remote_calls.empty():
+            self.apply_remote(*self.remote_calls.get_nowait())
+        utc = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        if utc != self.current_utc:
+            self.current_utc = utc
+            self.time_label.config(text=f"UTC: {utc}")
+            text = f"{self.pipeline.status_text()} | 分配 {self.engine.workspace.last_allocations}"
+            if self.server is not None:
+                stats = self.server.stats()
+                text += f" | 客户端 {stats['clients']} 丢帧 {stats['dropped']}"
+            if self.scheduler is not None:
+                text += f" | {self.scheduler.status_text()}"
+            if self.remote:
+                text += f" | {self.engine.status_text()}"
+            elif self.scheduler is None and self.player is None:
+                text += f" | {self.clock.status_text()}"
+            if self.scheduler is not None:
+                # 调度时由界面线程代模板引擎检查目录文件
+                self.scheduler.check_catalog()
+            if self.engine.catalog_version != self.catalog_version:
+                self.apply_catalog()
+                self.status_bar.config(text=f"卫星目录已重新加载 ({len(self.engine.catalog)} 个载波)")
+            self.pipeline_label.config(text=text)
+            self.profile_label.config(text=self.engine.profiler.status_text())
+        # 绘制慢于轮询间隔时相应拉长间隔: 期间到达的帧在邮箱中合并为最新一帧, 界面事件也有机会处理
+        busy_ms = (time.perf_counter() - t0) * 1000
+        self.root.after(max(RENDER_POLL_MS, int(busy_ms)), self.poll_render)
+
+    def capture_path(self):
+        base = f"capture_{self.engine.selected_sat['name']}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path, n = f"{base}.satcap", 1
+        while os.path.exists(path):
+            n += 1
+            path = f"{base}_{n}.satcap"
+        return path
+
+    def bind_host(self):
+        return "0.0.0.0" if self.lan_var.get() else "127.0.0.1"
+
+    def toggle_server(self):
+        server, self.server = self.server, None
+        if server is not None:
+            server.stop()
+            self.status_bar.config(text="网络推送已关闭")
+            return
+        from satmon.server import SweepServer
+        try:
+            # 勾选 "允许局域网访问" 时其他控制台也可订阅
+            self.server = SweepServer(self.bind_host()).start()
+        except OSError as e:
+            self.serve_var.set(0)
+            messagebox.showerror("推送失败", f"无法启动推送服务: {e}")
+            return
+        self.status_bar.config(text=f"网络推送已开启: 端口 {self.server.port} (TCP / WebSocket)")
+
+    def toggle_scpi(self):
+        scpi, self.scpi = self.scpi, None
+        if scpi is not None:
+            scpi.stop()
+            self.status_bar.config(text="SCPI 远程控制已关闭")
+            return
+        from satmon.scpi import ScpiInstrument, ScpiServer
+        # 命令在 SCPI 线程内直接修改引擎与显示参数, 控件和图形经 remote_calls 回到主线程同步
+        instrument = ScpiInstrument(self.engine, display=self, ui=lambda name, value: self.remote_calls.put((name, value)),
+                                    export_dir=os.getcwd())
+        try:
+            self.scpi = ScpiServer(instrument, self.bind_host()).start()
+        except OSError as e:
+            self.scpi_var.set(0)
+            messagebox.showerror("远程控制失败", f"无法启动 SCPI 服务: {e}")
+            return
+        self.status_bar.config(text=f"SCPI 远程控制已开启: 端口 {self.scpi.port}")
+
+    def apply_remote(self, name, value):
+        if name == "rb":
+            self.rb_scale.set(value)
+            self.update_rb(value)
+        elif name == "vb":
+            self.vb_scale.set(value)
+            self.update_vb(value)
+        elif name == "points":
+            self.points_var.set(value)
+            self.apply_span()
+        elif name == "satellite":
+            self.sat_var.set(self.sat_names[value])
+            self.refresh_band()
+        elif name in ("ref_level", "ylim_scale"):
+            self.reflevel_var.set(self.ref_level)
+            self.scale_var.set(self.ylim_scale)
+            self.set_ylim_by_scale()
+            self.canvas.draw_idle()
+        elif name == "view":
+            self.apply_span()
+        elif name == "hold":
+            self.hold_trace()
+        elif name == "marker":
+            self.add_marker(value)
+        elif name == "reset":
+            self.reset_all()
+            self.rb_scale.set(self.engine.rb)
+            self.vb_scale.set(self.engine.vb)
+            self.update_rb(self.engine.rb)
+            self.update_vb(self.engine.vb)
+
+    def toggle_record(self):
+        with self.recorder_lock:
+            recorder, self.recorder = self.recorder, None
+            if recorder is None:
+                try:
+                    self.recorder = CaptureWriter(self.capture_path(), self.engine.sweep_points, self.satellites)
+                except Exception as e:
+                    messagebox.showerror("录制失败", f"无法创建采集文件: {e}")
+                    return
+                self.status_bar.config(text=f"开始录制: {self.recorder.path}")
+                return
+            recorder.close()
+        self.status_bar.config(text=f"录制结束: {recorder.path} ({recorder.count} 次扫描, {recorder.nbytes / 1e6:.1f} MB)")
+
+    def record_sweep(self, sweep):
+        with self.recorder_lock:
+            if self.recorder is None:
+                return
+            if len(sweep.psd) != self.recorder.n_points:
+                # 点数变化后另起一个采集文件
+                self.recorder.close()
+                self.recorder = CaptureWriter(self.capture_path(), len(sweep.psd), self.satellites)
+            self.recorder.append_sweep(sweep)
+
+    def open_capture(self):
+        path = filedialog.askopenfilename(title="打开采集文件", filetypes=[("采集文件", "*.satcap"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            reader = CaptureReader(path)
+        except Exception as e:
+            messagebox.showerror("打开失败", f"无法打开采集文件: {e}")
+            return
+        self.stop_replay()
+        self.pipeline.flush()
+        name = reader.satellite_name(0)
+        if name in self.engine.catalog.sat_index:
+            self.sat_var.set(name)
+            self.engine.select_satellite(self.engine.catalog.sat_index[name], int(reader.records["band"][0]))
+            band = self.engine.current_band
+            self.noise_floor_line.set_data([band["min"], band["max"]], [self.engine.noise_floor, self.engine.noise_floor])
+            self.update_satellite_labels()
+        self.engine.reset_holds()
+        self.show_replay_span(float(reader.records["freq_min"][0]), float(reader.records["freq_max"][0]))
+        self.player = CapturePlayer(reader)
+        self.player.set_speed(float(self.speed_var.get().rstrip("x")))
+        self.scrub_scale.configure(to=max(self.player.duration, 1e-3))
+        self.player.play()
+        self.play_button.config(text="暂停")
+        self.status_bar.config(text=f"回放: {os.path.basename(path)} ({len(reader)} 次扫描)")
+
+    def toggle_playback(self):
+        if self.player is None:
+            return
+        if self.player.playing:
+            self.player.pause()
+            self.play_button.config(text="播放")
+        else:
+            self.player.play()
+            self.play_button.config(text="暂停")
+
+    def stop_replay(self):
+        player, self.player = self.player, None
+        if player is None:
+            return
+        # 流水线线程可能正在读取回放文件: 先停下并等其退出, 再关闭文件、丢弃残留的回放帧
+        self.pipeline.stop(timeout=None)
+        player.reader.close()
+        self.pipeline.flush()
+        self.pipeline.start()
+        self.play_button.config(text="播放")
+        self.replay_label.config(text="实时监测")
+        self.reset_zoom()
+        self.status_bar.config(text="已返回实时监测")
+
+    def on_speed_select(self, event):
+        if self.player is not None:
+            self.player.set_speed(float(self.speed_var.get().rstrip("x")))
+
+    def on_scrub(self, value):
+        if self.scrub_updating or self.player is None:
+            return
+        self.player.seek(self.player.reader.start_time + float(value))
+
+    def show_replay_span(self, freq_min, freq_max):
+        # 回放按记录的跨度显示, 不改变实时扫描的跨度
+        self.replay_span = (freq_min, freq_max)
+        self.ax_spectrum.set_xlim(freq_min, freq_max)
+        self.waterfall.clear()
+        self.waterfall_image.set_data(self.waterfall.view())
+        self.waterfall_image.set_extent((freq_min, freq_max, 0, self.waterfall_rows))
+        self.canvas.draw_idle()
+
+    def replay_frame(self, player):
+        i = player.next_index()
+        if i is None:
+            return None
+        reader = player.reader
+        record = reader.records[i]
+        replay = dict(sat_idx=int(record["sat"]), band_idx=int(record["band"]), rb=float(record["rb"]), vb=float(record["vb"]))
+        return Frame(reader.frequencies(i), reader.psd[i], float(record["timestamp"]), replay, filtered=True)
+
+    def update_replay_status(self, sweep):
+        player = self.player
+        if player is None:
+            return
+        elapsed = sweep.timestamp - player.reader.start_time
+        self.scrub_updating = True
+        self.scrub_scale.set(elapsed)
+        self.scrub_updating = False
+        self.replay_label.config(text=f"回放 {elapsed:.1f}/{player.duration:.1f} 秒 | RB {sweep.rb:g} Hz | VB {sweep.vb:g} Hz")
+
+    def display_columns(self):
+        return max(int(self.ax_spectrum.bbox.width), 100)
+
+    def decimate_for_display(self, freq, data):
+        x_min, x_max = self.ax_spectrum.get_xlim()
+        return minmax_decimate(freq, data, self.display_columns(), x_min, x_max)
+
+    def update_plots(self, sweep):
+        t0 = time.perf_counter()
+        # 从邮箱取出的每一帧都带一份持有; 最近显示的一帧留给保持曲线 / 导出使用, 换下的一帧归还
+        release(self.last_sweep)
+        self.last_sweep = sweep
+        freq, psd = sweep.freq, sweep.psd
+        if self.player is not None and (freq[0], freq[-1]) != self.replay_span:
+            # 采集过程中改过跨度
+            self.show_replay_span(float(freq[0]), float(freq[-1]))
+        self.spectrum_line.set_data(*self.decimate_for_display(freq, psd))
+        self.max_hold_line.set_data(*self.decimate_for_display(freq, sweep.max_hold))
+        self.min_hold_line.set_data(*self.decimate_for_display(freq, sweep.min_hold))
+        self.waterfall.push(psd)
+        self.waterfall_image.set_data(self.waterfall.view())
+        if self.player is not None:
+            self.update_replay_status(sweep)
 
-        # Draw traces
-        for marker in self.markers:
-            marker['line'].set_ydata([self.ax_spectrum.get_ylim()[0], self.ax_spectrum.get_ylim()[1]])
-            marker['label'].set_y(self.ax_spectrum.get_ylim()[1])
         # Peak marker
-        if hasattr(self, 'peak_marker') and self.peak_marker:
-            self.peak_marker.remove()
-            self.peak_marker = None
-        if self.peak_search_enabled and peak_freq is not None and peak_val is not None:
-            self.peak_marker = self.ax_spectrum.plot(peak_freq, peak_val, marker="o", color=self.colors["accent_red"],
-                                                     markersize=12, markeredgecolor="white", zorder=20)[0]
-            self.ax_spectrum.text(peak_freq, peak_val, f"峰值: {peak_freq:.2f} MHz\n{peak_val:.1f} dBm",
-                                  color=self.colors["accent_red"], fontsize=10, ha='left', va='bottom', backgroundcolor="#fff8e1", zorder=21)
+        show_peak = self.engine.peak_search_enabled and sweep.peak_freq is not None
+        if show_peak:
+            self.peak_marker.set_data([sweep.peak_freq], [sweep.peak_val])
+            self.peak_text.set_position((sweep.peak_freq, sweep.peak_val))
+            self.peak_text.set_text(f"峰值: {sweep.peak_freq:.2f} MHz\n{sweep.peak_val:.1f} dBm")
+        self.peak_marker.set_visible(show_peak)
+        self.peak_text.set_visible(show_peak)
         # Average
-        if hasattr(self, 'avg_line') and self.avg_line:
-            self.avg_line.remove()
-            self.avg_line = None
-        if self.avg_enabled and avg_curve is not None:
-            self.avg_line, = self.ax_spectrum.plot(freq, avg_curve, color=self.colors["accent_orange"], linestyle='-', linewidth=2, alpha=0.8, label='Average')
-        self.ax_spectrum.legend(loc='upper right', facecolor=self.colors["bg_panel"], edgecolor=self.colors["accent_blue"], labelcolor=self.colors["fg_primary"], fontsize=10, prop={'family': zh_font})
-        self.canvas.draw_idle()
+        show_avg = self.engine.avg_enabled and sweep.avg is not None
+        if show_avg:
+            self.avg_line.set_data(*self.decimate_for_display(freq, sweep.avg))
+        self.avg_line.set_visible(show_avg)
+        # Carrier detection
+        report = sweep.detections
+        show_det = self.engine.detect_enabled and report is not None
+        if show_det:
+            known = [det for det in report.detections if det.carrier is not None]
+            unknown = [det for det in report.detections if det.carrier is None]
+            self.known_markers.set_data([det.freq for det in known], [det.level + 2 for det in known])
+            self.unknown_markers.set_data([det.freq for det in unknown], [det.level + 2 for det in unknown])
+            text = f"检测载波 {len(report.detections)} | 未知 {report.unknown} | 缺失 {len(report.missing)}"
+            if report.missing:
+                text += f": {'、'.join(report.missing)}"
+            self.detection_text.set_text(text)
+        self.known_markers.set_visible(show_det)
+        self.unknown_markers.set_visible(show_det)
+        self.detection_text.set_visible(show_det)
+        # Limit mask alarms
+        limits = sweep.limits
+        mask = self.engine.limits.mask
+        show_limits = self.engine.limits_enabled and limits is not None and mask.upper is not None and len(mask.upper) == len(freq)
+        if show_limits:
+            self.limit_line.set_data(*self.decimate_for_display(freq, mask.upper))
+            self.limit_lower_line.set_data(*self.decimate_for_display(freq, np.where(np.isfinite(mask.lower), mask.lower, np.nan)))
+            ranges = limits.ranges
+            segments = np.column_stack((ranges, np.full(len(ranges), np.nan))).ravel()
+            self.alarm_line.set_data(segments, np.full(len(segments), 0.97))
+            alarms = [event for event in limits.events if event.state == "alarm"]
+            if alarms:
+                self.last_limit_event = max(alarms, key=lambda event: event.excess)
+            text = f"门限告警 {len(ranges)} 段 | 累计 {self.engine.limits.alarms} 次"
+            event = self.last_limit_event
+            if event is not None:
+                kind = "超上限" if event.kind == "over" else "低于下限"
+                text += f" | 最近: {event.freq_min:.2f}-{event.freq_max:.2f} MHz {kind} {event.excess:.1f} dB"
+            self.alarm_text.set_text(text)
+        for artist in (self.limit_line, self.limit_lower_line, self.alarm_line, self.alarm_text):
+            artist.set_visible(show_limits)
+
+        self.fps_text.set_text(f"{self.frame_meter.tick():.1f} 帧/秒")
+        if self.refresh_trace_lines() | self.refresh_legend():
+            self.canvas.draw_idle()
+        else:
+            self.request_redraw()
+        self.engine.profiler.lap("渲染", t0)
+
+    def toggle_fleet(self):
+        if self.fleet_window is not None:
+            self.close_fleet_view()
+            return
+        self.fleet = FleetSimulator(self.satellites, n_points=self.engine.sweep_points, rb=self.engine.rb, vb=self.engine.vb, avg_count=self.engine.avg_count,
+                                    avg_mode=self.engine.averager.mode, avg_scale=self.engine.averager.scale)
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        self.fleet_window = tk.Toplevel(self.root)
+        self.fleet_window.title("卫星群监测")
+        self.fleet_window.configure(bg=self.colors["bg_light"])
+        self.fleet_window.protocol("WM_DELETE_WINDOW", self.close_fleet_view)
+
+        n_rows = len(self.fleet.rows)
+        fig = Figure(figsize=(9, 1.3 * n_rows), dpi=100, facecolor=self.colors["bg_light"])
+        axes = fig.subplots(n_rows, 1, squeeze=False)[:, 0]
+        self.fleet_lines = []
+        for r, ax in enumerate(axes):
+            self.style_axis(ax)
+            ax.tick_params(labelsize=8)
+            ax.set_xlim(self.fleet.freq_min[r], self.fleet.freq_max[r])
+            ax.set_ylim(self.ref_level - self.ylim_scale * 8, self.ref_level)
+            ax.text(0.01, 0.92, self.fleet.labels[r], color=self.colors["accent_blue"], fontsize=9, ha='left', va='top', transform=ax.transAxes, fontproperties=zh_font)
+            live, = ax.plot([], [], color=self.colors["spectrum"], linewidth=1)
+            max_hold, = ax.plot([], [], color=self.colors["spectrum_max"], linewidth=0.8, linestyle='--')
+            min_hold, = ax.plot([], [], color=self.colors["accent_green"], linewidth=0.8, linestyle=':')
+            avg, = ax.plot([], [], color=self.colors["accent_orange"], linewidth=1)
+            self.fleet_lines.append((ax, live, max_hold, min_hold, avg))
+        fig.tight_layout(pad=0.4)
+        self.fleet_canvas = FigureCanvasTkAgg(fig, master=self.fleet_window)
+        self.fleet_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        self.fleet_stop = threading.Event()
+        self.fleet_thread = threading.Thread(target=self.update_fleet, args=(self.fleet, self.fleet_stop))
+        self.fleet_thread.daemon = True
+        self.fleet_thread.start()
+        self.status_bar.config(text=f"卫星群监测已开启: {n_rows} 个频段")
+
+    def close_fleet_view(self):
+        if self.fleet_stop is not None:
+            self.fleet_stop.set()
+            self.fleet_stop = None
+        self.fleet_slot.clear()
+        if self.fleet_window is not None:
+            self.fleet_window.destroy()
+            self.fleet_window = None
+        self.status_bar.config(text="卫星群监测已关闭")
+
+    def update_fleet(self, fleet, stop):
+        # 帧带上所属的模拟器, 界面只绘制当前这一次开启的结果
+        while not stop.is_set():
+            try:
+                fleet.rb = self.engine.rb
+                fleet.vb = self.engine.vb
+                psd = fleet.sweep()
+                self.fleet_slot.put((fleet, psd, fleet.max_hold.copy(), fleet.min_hold.copy(), fleet.average))
+                stop.wait(0.2)
+            except Exception as e:
+                print(f"卫星群更新错误: {e}")
+                stop.wait(1.0)
+
+    def update_fleet_plots(self, psd, max_hold, min_hold, avg):
+        if self.fleet_window is None:
+            return
+        for r, (ax, live, max_line, min_line, avg_line) in enumerate(self.fleet_lines):
+            freq = self.fleet.freq[r]
+            columns = max(int(ax.bbox.width), 100)
+            live.set_data(*minmax_decimate(freq, psd[r], columns))
+            max_line.set_data(*minmax_decimate(freq, max_hold[r], columns))
+            min_line.set_data(*minmax_decimate(freq, min_hold[r], columns))
+            avg_line.set_data(*minmax_decimate(freq, avg[r], columns))
+        self.fleet_canvas.draw_idle()
 
     def export_spectrum(self):
-        freq, psd = self.generate_spectrum()
+        sweep = self.last_sweep
+        if sweep is None:
+            self.status_bar.config(text="暂无可导出的扫描")
+            return
         try:
-            import pandas as pd
-            file = f"spectrum_export_{self.selected_sat['name']}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            pd.DataFrame({'Frequency_MHz': freq, 'PSD_dBm': psd}).to_csv(file, index=False)
+            file = f"spectrum_export_{self.engine.selected_sat['name']}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            np.savetxt(file, np.column_stack((sweep.freq, sweep.psd)), delimiter=",", fmt="%.6f",
+                       header="Frequency_MHz,PSD_dBm", comments="")
             messagebox.showinfo("导出成功", f"频谱数据已导出至: {file}")
             self.status_bar.config(text=f"频谱数据已导出: {file}")
         except Exception as e:
             messagebox.showerror("导出失败", f"导出失败: {e}")
 
+    def export_profile(self):
+        file = f"profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            self.engine.profiler.dump(file)
+            self.status_bar.config(text=f"性能统计已导出: {file}")
+        except Exception as e:
+            messagebox.showerror("导出失败", f"导出失败: {e}")
+
     def on_closing(self):
         self.running = False
+        if self.fleet_stop is not None:
+            self.fleet_stop.set()
+        self.pipeline.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.server is not None:
+            self.server.stop()
+        if self.scpi is not None:
+            self.scpi.stop()
         time.sleep(0.2)
+        with self.recorder_lock:
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+        if self.engine.detection_log is not None:
+            self.engine.detection_log.close()
+        if self.engine.limit_log is not None:
+            self.engine.limit_log.close()
+        if self.remote:
+            self.engine.close()
         self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = SatelliteSpectrumMonitor(root)
+    app = SatelliteSpectrumMonitor(root, engine_process="--engine-process" in sys.argv,
+                                   clock_mode="instrument" if "--sweep-time" in sys.argv else "fixed")
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
@@ -0,0 +1 @@
+# 卫星频谱监测数值内核（与 Tk 界面解耦）
@@ -0,0 +1,5 @@
+import sys
+
+from satmon.cli import main
+
+sys.exit(main())
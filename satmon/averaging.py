@@ -0,0 +1,103 @@
+import numpy as np
+
+AVG_MODES = {"window": "滑动窗口", "exp": "指数"}
+AVG_SCALES = {"log": "对数(dB)", "power": "功率(RMS)", "voltage": "电压"}
+MAX_RING_BYTES = 1 << 30
+LN10 = np.log(10.0)
+
+
+def to_scale(psd_db, scale, out=None):
+    # 线性域写入 out (10^(x/10) = e^(x·ln10/10), 不产生临时数组); 对数域直接返回输入, 调用方不得原地修改
+    if scale == "log":
+        return np.asarray(psd_db, dtype=float)
+    if out is None:
+        out = np.empty(np.shape(psd_db))
+    np.multiply(psd_db, LN10 / (10 if scale == "power" else 20), out=out)     # mW / 电压
+    return np.exp(out, out=out)
+
+
+def from_scale(values, scale):
+    # 原地换算, values 须为调用方自有的数组
+    if scale == "power":
+        np.log10(values, out=values)
+        values *= 10
+    elif scale == "voltage":
+        np.log10(values, out=values)
+        values *= 20
+    return values
+
+
+class Averager:
+    # 每次扫描 O(N), 与平均次数无关:
+    #   window - 预分配环形缓冲 + 累加和, 新入一条、减去最旧一条
+    #   exp    - 指数平均, 前 count 次按累计平均起步
+    # scale 决定在哪个域求平均: 对数 dB / 线性功率 mW (即 RMS) / 线性电压
+    def __init__(self, count=5, mode="window", scale="log", max_ring_bytes=MAX_RING_BYTES):
+        self.max_ring_bytes = max_ring_bytes
+        self.configure(count, mode, scale)
+
+    def configure(self, count=None, mode=None, scale=None):
+        count = self.count if count is None else int(count)
+        mode = self.mode if mode is None else mode
+        scale = self.scale if scale is None else scale
+        if count < 1:
+            raise ValueError("平均次数必须为正整数")
+        if mode not in AVG_MODES:
+            raise ValueError(f"未知平均方式: {mode}")
+        if scale not in AVG_SCALES:
+            raise ValueError(f"未知平均域: {scale}")
+        self.count = count
+        self.mode = mode
+        self.scale = scale
+        self.reset()
+
+    def reset(self):
+        self.ring = None
+        self.total = None
+        self.scratch = None
+        self.pos = 0
+        self.filled = 0
+
+    def check_memory(self, shape):
+        nbytes = self.count * int(np.prod(shape)) * 4
+        if self.mode == "window" and nbytes > self.max_ring_bytes:
+            raise ValueError(f"滑动窗口需要 {nbytes / 1e9:.1f} GB 缓冲, 请减少平均次数或改用指数平均")
+
+    def push(self, psd_db, out=None):
+        shape = np.shape(psd_db)
+        if self.total is None or self.total.shape != shape:
+            self.check_memory(shape)
+            self.total = np.zeros(shape)
+            self.scratch = np.empty(shape)
+            if self.mode == "window":
+                self.ring = np.zeros((self.count,) + shape, dtype=np.float32)
+            self.pos = 0
+            self.filled = 0
+        # 线性域换算与指数平均的差值都写入自有的 scratch, 每次扫描不再新分配
+        x = to_scale(psd_db, self.scale, self.scratch)
+
+        if self.mode == "exp":
+            self.filled = min(self.filled + 1, self.count)
+            delta = np.subtract(x, self.total, out=self.scratch)
+            delta /= self.filled
+            self.total += delta
+        else:
+            # 先写入 float32 环形缓冲再从缓冲累加, 加减的是同一舍入值, 累加和不会漂移
+            slot = self.ring[self.pos]
+            self.total -= slot
+            slot[...] = x
+            self.total += slot
+            self.pos = (self.pos + 1) % self.count
+            self.filled = min(self.filled + 1, self.count)
+        return self.value(out)
+
+    def value(self, out=None):
+        if self.total is None or not self.filled:
+            return None
+        if out is None:
+            out = np.empty_like(self.total)
+        if self.mode == "exp":
+            out[...] = self.total
+        else:
+            np.divide(self.total, self.filled, out=out)
+        return from_scale(out, self.scale)
@@ -0,0 +1,180 @@
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"SATCAP1\0"
+VERSION = 1
+HEADER_SIZE = 4096
+# 文件头: 魔数, 版本, 每次扫描点数, 已写入记录数; 其后是 JSON 元数据
+HEADER_STRUCT = struct.Struct("<8sIIQ")
+META_OFFSET = 64
+CHUNK_BYTES = 64 << 20
+# 写端异常退出时最多丢失的时长: 每写满一块或每隔这么久把记录数写回文件头
+SYNC_INTERVAL_S = 1.0
+META_FIELDS = ("timestamp", "sat", "band", "rb", "vb", "freq_min", "freq_max")
+
+
+def record_dtype(n_points):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("sat", "<i4"),
+        ("band", "<i4"),
+        ("rb", "<f4"),
+        ("vb", "<f4"),
+        ("freq_min", "<f8"),
+        ("freq_max", "<f8"),
+        ("psd", "<f4", (n_points,)),
+    ])
+
+
+class CaptureWriter:
+    # 预分配、按块扩展的内存映射采集文件, 每次扫描只做一次定长二进制拷贝.
+    # 时间索引取自单调时钟 (以打开时的系统时间为起点), 系统校时不会使其倒退
+    def __init__(self, path, n_points, satellites=(), chunk_bytes=CHUNK_BYTES, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.origin = time.time() - clock()
+        self.n_points = n_points
+        self.dtype = record_dtype(n_points)
+        self.chunk_records = max(1, chunk_bytes // self.dtype.itemsize)
+        self.count = 0
+        self.capacity = 0
+        self.records = None
+        meta = json.dumps({
+            "satellites": [{"name": sat["name"], "bands": [band["name"] for band in sat["bands"]]} for sat in satellites],
+        }, ensure_ascii=False).encode("utf-8")
+        if META_OFFSET + len(meta) > HEADER_SIZE:
+            raise ValueError("采集文件元数据过大")
+        self.file = open(path, "w+b")
+        self.file.write(HEADER_STRUCT.pack(MAGIC, VERSION, n_points, 0))
+        self.file.seek(META_OFFSET)
+        self.file.write(meta)
+        self.grow()
+        self.synced = clock()
+
+    def stamp(self):
+        return self.origin + self.clock()
+
+    def unmap(self):
+        # Windows 上映射中的文件不能改变长度: 截断前先释放全部视图并关闭映射
+        if self.records is None:
+            return
+        self.records.flush()
+        mapping = self.records._mmap
+        self.fields = self.psd = self.records = None
+        if mapping is not None:
+            mapping.close()
+
+    def grow(self):
+        if self.records is not None:
+            self.flush()
+        self.unmap()
+        self.capacity += self.chunk_records
+        self.file.truncate(HEADER_SIZE + self.capacity * self.dtype.itemsize)
+        self.records = np.memmap(self.file, dtype=self.dtype, mode="r+", offset=HEADER_SIZE, shape=(self.capacity,))
+        self.fields = [self.records[name] for name in META_FIELDS]
+        self.psd = self.records["psd"]
+
+    def append(self, timestamp, sat, band, rb, vb, freq_min, freq_max, psd):
+        if len(psd) != self.n_points:
+            raise ValueError(f"扫描点数 {len(psd)} 与采集文件 {self.n_points} 不一致")
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        # 时间戳最后写入: 非零即表示该条记录已完整写入 (见 read_header)
+        self.psd[i] = psd
+        for field, value in zip(self.fields[1:], (sat, band, rb, vb, freq_min, freq_max)):
+            field[i] = value
+        self.fields[0][i] = timestamp
+        self.count += 1
+        if self.clock() - self.synced >= SYNC_INTERVAL_S:
+            self.flush()
+
+    def append_sweep(self, sweep):
+        self.append(self.stamp(), sweep.sat_idx, sweep.band_idx, sweep.rb, sweep.vb, sweep.freq[0], sweep.freq[-1], sweep.psd)
+
+    def flush(self):
+        self.records.flush()
+        self.file.seek(0)
+        self.file.write(HEADER_STRUCT.pack(MAGIC, VERSION, self.n_points, self.count))
+        self.file.flush()
+        self.synced = self.clock()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.unmap()
+        self.file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self.file.close()
+
+    @property
+    def nbytes(self):
+        return HEADER_SIZE + self.count * self.dtype.itemsize
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, version, n_points, count = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+        if magic != MAGIC:
+            raise ValueError(f"不是采集文件: {path}")
+        f.seek(META_OFFSET)
+        meta = json.loads(f.read(HEADER_SIZE - META_OFFSET).rstrip(b"\0").decode("utf-8") or "{}")
+    # 计数在每写满一块 / 每 SYNC_INTERVAL_S 写回, 以文件实际长度为上限防止截断的文件越界;
+    # 写端异常退出时文件仍是预分配长度, 计数之后时间戳非零的连续记录也已写完整, 一并恢复
+    dtype = record_dtype(n_points)
+    capacity = max(os.path.getsize(path) - HEADER_SIZE, 0) // dtype.itemsize
+    count = min(count, capacity)
+    if count < capacity:
+        tail = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE + count * dtype.itemsize, shape=(capacity - count,))
+        empty = np.flatnonzero(tail["timestamp"] == 0)
+        count += int(empty[0]) if len(empty) else capacity - count
+        del tail
+    return version, n_points, count, meta
+
+
+class CaptureReader:
+    # 只读内存映射: 打开与切片均不复制数据, 时间戳列即时间索引 (单调递增, 二分查找)
+    def __init__(self, path):
+        self.path = path
+        self.version, self.n_points, self.count, self.meta = read_header(path)
+        if self.count == 0:
+            raise ValueError(f"采集文件为空: {path}")
+        self.records = np.memmap(path, dtype=record_dtype(self.n_points), mode="r", offset=HEADER_SIZE, shape=(self.count,))
+        self.timestamps = self.records["timestamp"]
+        self.psd = self.records["psd"]
+        self._freq_key = None
+        self._freq = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def start_time(self):
+        return float(self.timestamps[0])
+
+    @property
+    def end_time(self):
+        return float(self.timestamps[-1])
+
+    def index_at(self, timestamp):
+        i = int(np.searchsorted(self.timestamps, timestamp, side="right")) - 1
+        return min(max(i, 0), self.count - 1)
+
+    def frequencies(self, i):
+        key = (float(self.records["freq_min"][i]), float(self.records["freq_max"][i]))
+        if key != self._freq_key:
+            self._freq_key = key
+            self._freq = np.linspace(key[0], key[1], self.n_points)
+        return self._freq
+
+    def satellite_name(self, i):
+        satellites = self.meta.get("satellites", [])
+        sat = int(self.records["sat"][i])
+        return satellites[sat]["name"] if 0 <= sat < len(satellites) else None
+
+    def close(self):
+        self.timestamps = self.psd = self.records = None
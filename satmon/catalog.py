@@ -0,0 +1,173 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from satmon.satellites import CHINASAT_SATELLITES
+from satmon.synthesis import SKIRT_EXTENT, roll_off_for
+
+CSV_FIELDS = ("satellite", "name", "freq", "bw", "power", "modulation")
+DEFAULT_NOISE_FLOOR = -110.0
+
+
+class IntervalIndex:
+    # 区间按长度分级 (同级长度相差不超过 2 倍), 每级按起点排序. 查询 [a, b) 时每级二分出起点落在
+    # [a - 该级最大长度, b) 的候选再按终点过滤: 起点 ≥ a - 最短长度的候选必然命中, 误报只来自其前半个长度的窗口,
+    # 总代价 O(级数 · log n + k), 级数只取决于最宽与最窄区间之比
+    def __init__(self, lo, hi):
+        width = np.maximum(hi - lo, 1e-9)
+        level = np.floor(np.log2(width)).astype(np.int64)
+        self.levels = []
+        for value in np.unique(level):
+            rows = np.flatnonzero(level == value)
+            rows = rows[np.argsort(lo[rows], kind="stable")]
+            self.levels.append((rows, lo[rows], hi[rows], float(width[rows].max())))
+
+    def query(self, a, b):
+        found = []
+        for rows, lo, hi, max_width in self.levels:
+            start, stop = np.searchsorted(lo, (a - max_width, b))
+            hit = rows[start:stop][hi[start:stop] > a]
+            if len(hit):
+                found.append(hit)
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(found))
+
+
+class Catalog:
+    # 卫星 / 载波目录: 载波按频率排序存为列数组 (频率/带宽/电平/所属卫星), 每颗卫星一个区间索引,
+    # 按名称查卫星与载波都是字典查找. 各卫星字典是输入的浅拷贝 (不改动调用方的数据),
+    # 其 "carriers" 列表同样按频率排序, 元素即原载波字典
+    def __init__(self, satellites, path=None):
+        self.path = path
+        self.stamp = file_stamp(path) if path else None
+        self.names = [sat["name"] for sat in satellites]
+        self.sat_index = {name: i for i, name in enumerate(self.names)}
+        records, owner = [], []
+        for s, sat in enumerate(satellites):
+            records.extend(sat["carriers"])
+            owner.extend([s] * len(sat["carriers"]))
+        freq = np.array([c["freq"] for c in records], dtype=float)
+        order = np.argsort(freq, kind="stable")
+        self.records = np.empty(len(records), dtype=object)
+        self.records[:] = records
+        self.records = self.records[order]
+        self.sat = np.array(owner, dtype=np.int32)[order]
+        self.freq = freq[order]
+        self.bw = np.array([c["bw"] for c in self.records], dtype=float)
+        self.power = np.array([c["power"] for c in self.records], dtype=float)
+        roll_off = np.array([roll_off_for(c["modulation"]) for c in self.records], dtype=float)
+        # 区间取载波合成的计算窗口 (含高斯裙边), 与 carrier_window 一致
+        half = SKIRT_EXTENT * self.bw * (1 + roll_off) / 2
+        self.lo, self.hi = self.freq - half, self.freq + half
+        self.by_name = {}
+        for row, carrier in enumerate(self.records):
+            self.by_name.setdefault(carrier["name"], []).append(row)
+        self.satellites = []
+        self.indexes = []
+        for s, sat in enumerate(satellites):
+            rows = np.flatnonzero(self.sat == s)
+            self.satellites.append({**sat, "carriers": list(self.records[rows])})
+            self.indexes.append((rows, IntervalIndex(self.lo[rows], self.hi[rows])))
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_satellites(cls, satellites):
+        return satellites if isinstance(satellites, cls) else cls(satellites)
+
+    @classmethod
+    def load(cls, path, base=CHINASAT_SATELLITES):
+        if path.lower().endswith(".csv"):
+            satellites = read_csv(path, base)
+        else:
+            satellites = read_json(path)
+        return cls(satellites, path)
+
+    def satellite_index(self, name):
+        idx = self.sat_index.get(name)
+        if idx is None:
+            raise ValueError(f"未知卫星: {name}")
+        return idx
+
+    def lookup(self, name):
+        return [self.records[row] for row in self.by_name.get(name, ())]
+
+    def overlapping(self, freq_min, freq_max, sat=None):
+        # 计算窗口与 [freq_min, freq_max) 相交的载波行号, 按频率排序
+        if sat is None:
+            return np.flatnonzero((self.lo < freq_max) & (self.hi > freq_min))
+        rows, index = self.indexes[sat]
+        return rows[index.query(freq_min, freq_max)]
+
+    def carriers(self, rows):
+        return list(self.records[rows])
+
+    def reload(self):
+        # 文件修改时间或大小变化时重新加载, 返回新目录; 未变化或无法读取时返回 None
+        if self.path is None or file_stamp(self.path) == self.stamp:
+            return None
+        try:
+            return type(self).load(self.path)
+        except (OSError, ValueError) as e:
+            self.stamp = file_stamp(self.path)
+            print(f"目录重新加载失败: {e}")
+            return None
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    satellites = data.get("satellites") if isinstance(data, dict) else data
+    if not isinstance(satellites, list):
+        raise ValueError("目录文件须为卫星列表或含 satellites 字段的对象")
+    for sat in satellites:
+        if not sat.get("bands"):
+            raise ValueError(f"卫星 {sat.get('name')} 未配置频段")
+        sat.setdefault("carriers", [])
+    return satellites
+
+
+def read_csv(path, base=CHINASAT_SATELLITES):
+    # 每行一个载波; 卫星的频段等信息取自 base 中的同名卫星, 未知卫星按其载波范围生成一个频段
+    known = {sat["name"]: sat for sat in base}
+    satellites = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = set(CSV_FIELDS) - set(header)
+        if missing:
+            raise ValueError(f"目录文件缺少列: {', '.join(sorted(missing))}")
+        # 按列号取值, 不逐行构造字典
+        i_sat, i_name, i_freq, i_bw, i_power, i_mod = (header.index(field) for field in CSV_FIELDS)
+        for line, row in enumerate(reader, 2):
+            try:
+                carrier = {"freq": float(row[i_freq]), "bw": float(row[i_bw]), "power": float(row[i_power]),
+                           "name": row[i_name], "modulation": row[i_mod]}
+            except (ValueError, IndexError):
+                raise ValueError(f"第 {line} 行格式错误")
+            name = row[i_sat]
+            sat = satellites.get(name)
+            if sat is None:
+                template = known.get(name, {"name": name, "position": "", "cover": "", "bands": []})
+                sat = satellites[name] = {**template, "carriers": []}
+            sat["carriers"].append(carrier)
+    for sat in satellites.values():
+        if not sat["bands"]:
+            freq = np.array([c["freq"] for c in sat["carriers"]])
+            bw = np.array([c["bw"] for c in sat["carriers"]])
+            lo, hi = float(np.floor((freq - bw).min())), float(np.ceil((freq + bw).max()))
+            sat["bands"] = [{"name": "目录频段", "min": lo, "max": hi, "center": (lo + hi) / 2, "unit": "MHz",
+                             "noise_floor": DEFAULT_NOISE_FLOOR}]
+    return list(satellites.values())
@@ -0,0 +1,255 @@
+import argparse
+import sys
+import time
+
+from satmon.averaging import AVG_MODES, AVG_SCALES
+from satmon.catalog import Catalog
+from satmon.engine import SpectrumEngine
+from satmon.eventlog import AsyncJsonlWriter
+from satmon.iq import PSD_MODES
+from satmon.limits import DEBOUNCE_SWEEPS, MARGIN_DB, TOLERANCE_DB
+from satmon.satellites import CHINASAT_SATELLITES
+from satmon.scheduler import REVISIT_S, BandScheduler
+from satmon.scpi import DEFAULT_PORT as SCPI_PORT, ScpiInstrument, ScpiServer
+from satmon.server import DEFAULT_PORT, SweepServer
+from satmon.sweeptime import FrameClock
+from satmon.workspace import release
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m satmon", description="无界面卫星频谱扫描")
+    parser.add_argument("--satellite", default=None, help=f"卫星名称, 默认 {CHINASAT_SATELLITES[2]['name']}")
+    parser.add_argument("--catalog", default=None, metavar="FILE", help="从 JSON/CSV 文件加载卫星与载波目录, 文件修改后自动重新加载")
+    parser.add_argument("--band", type=int, default=0, help="频段序号")
+    parser.add_argument("--points", type=int, default=1000, help="每次扫描点数")
+    parser.add_argument("--span", type=float, nargs=2, default=None, metavar=("START", "STOP"),
+                        help="扫描起止频率 (MHz), 默认整个频段")
+    parser.add_argument("--rb", type=float, default=1000.0, help="分辨率带宽 (Hz)")
+    parser.add_argument("--vb", type=float, default=100.0, help="视频带宽 (Hz)")
+    parser.add_argument("--rate", type=float, default=0.0, help="目标扫描速率 (次/秒), 0 表示全速")
+    parser.add_argument("--sweep-time", action="store_true", help="按跨度 / RBW / VBW / 点数模拟真实频谱仪的扫描时间 (忽略 --rate)")
+    parser.add_argument("--sweeps", type=int, default=0, help="扫描次数, 0 表示不限")
+    parser.add_argument("--duration", type=float, default=0.0, help="运行时长 (秒), 0 表示不限")
+    parser.add_argument("--avg", action="store_true", help="开启平均")
+    parser.add_argument("--psd-mode", choices=sorted(PSD_MODES), default="analytic", help="谱估计方式: 解析包络 / IQ 合成 + Welch")
+    parser.add_argument("--avg-count", type=int, default=5, help="平均次数")
+    parser.add_argument("--avg-mode", choices=sorted(AVG_MODES), default="window", help="平均方式")
+    parser.add_argument("--avg-scale", choices=sorted(AVG_SCALES), default="log", help="平均域")
+    parser.add_argument("--peak", action="store_true", help="开启峰值搜索")
+    parser.add_argument("--detect", action="store_true", help="开启多载波检测")
+    parser.add_argument("--detect-log", default=None, help="检测结果写入 JSON Lines 文件")
+    parser.add_argument("--limits", action="store_true", help="开启门限告警")
+    parser.add_argument("--limit-log", default=None, help="门限告警事件写入 JSON Lines 文件")
+    parser.add_argument("--limit-margin", type=float, default=MARGIN_DB, help="载波外门限高于噪声底的余量 (dB)")
+    parser.add_argument("--limit-tolerance", type=float, default=TOLERANCE_DB, help="载波内上下限相对标称电平的容差 (dB)")
+    parser.add_argument("--limit-debounce", type=int, default=DEBOUNCE_SWEEPS, help="连续越限多少次扫描才告警")
+    parser.add_argument("--all-bands", action="store_true", help="在线程池上并发扫描全部卫星的全部频段")
+    parser.add_argument("--workers", type=int, default=0, help="多频段扫描的工作线程数, 0 表示 CPU 核数")
+    parser.add_argument("--revisit", type=float, default=REVISIT_S, help="多频段扫描时每个频段的重访周期 (秒)")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--serve", nargs="?", const=f"127.0.0.1:{DEFAULT_PORT}", default=None, metavar="[HOST:]PORT",
+                        help=f"推送扫描到 TCP/WebSocket 客户端 (默认 127.0.0.1:{DEFAULT_PORT}, 局域网用 0.0.0.0)")
+    parser.add_argument("--scpi", nargs="?", const=f"127.0.0.1:{SCPI_PORT}", default=None, metavar="[HOST:]PORT",
+                        help=f"开启 SCPI 远程控制 (默认 127.0.0.1:{SCPI_PORT})")
+    parser.add_argument("--export-dir", default=".", metavar="DIR", help="SCPI MMEMory 命令写文件的目录")
+    parser.add_argument("--profile", nargs="?", const="-", default=None, metavar="FILE",
+                        help="结束时输出各阶段耗时统计 (JSON), 默认打印到标准输出")
+    parser.add_argument("--quiet", action="store_true", help="只输出最终统计")
+    return parser
+
+
+def create_engine(args, parser):
+    try:
+        catalog = Catalog.load(args.catalog) if args.catalog else Catalog(CHINASAT_SATELLITES)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"无法加载卫星目录: {e}")
+    if args.satellite is None:
+        sat_idx = catalog.sat_index.get(CHINASAT_SATELLITES[2]["name"], 0)
+    elif args.satellite in catalog.sat_index:
+        sat_idx = catalog.sat_index[args.satellite]
+    else:
+        parser.error(f"未知卫星: {args.satellite} (可选: {', '.join(catalog.names)})")
+    bands = catalog.satellites[sat_idx]["bands"]
+    if not 0 <= args.band < len(bands):
+        parser.error(f"频段序号 {args.band} 超出范围: {catalog.names[sat_idx]} 有 {len(bands)} 个频段 (0-{len(bands) - 1})")
+    engine = SpectrumEngine(catalog, sat_idx=sat_idx, band_idx=args.band,
+                            rb=args.rb, vb=args.vb, psd_mode=args.psd_mode, seed=args.seed)
+    engine.catalog_watch = args.catalog is not None
+    try:
+        engine.set_sweep_points(args.points)
+        if args.span:
+            engine.set_span(*args.span)
+        engine.configure_averaging(args.avg_count, args.avg_mode, args.avg_scale)
+        engine.limits.configure(args.limit_margin, args.limit_tolerance, debounce=args.limit_debounce)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    engine.avg_enabled = args.avg
+    engine.peak_search_enabled = args.peak
+    engine.detect_enabled = args.detect or args.detect_log is not None
+    if args.detect_log:
+        engine.detection_log = AsyncJsonlWriter(args.detect_log)
+    engine.limits_enabled = args.limits or args.limit_log is not None
+    if args.limit_log:
+        engine.limit_log = AsyncJsonlWriter(args.limit_log)
+    return engine
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def create_clock(engine, args):
+    if args.sweep_time:
+        return FrameClock(engine.sweep_time, "instrument")
+    if args.rate > 0:
+        return FrameClock(engine.sweep_time, "fixed", 1.0 / args.rate)
+    return FrameClock(engine.sweep_time, "max")
+
+
+def run(engine, clock, sweeps=0, duration=0.0, report=None, publish=None):
+    start = last_report = time.perf_counter()
+    count = reported = 0
+    while (not sweeps or count < sweeps) and (not duration or time.perf_counter() - start < duration):
+        if not clock.wait(lambda: not duration or time.perf_counter() - start < duration):
+            break
+        result = engine.sweep()
+        count += 1
+        if publish is not None:
+            publish(result)
+        now = time.perf_counter()
+        if report is not None and now - last_report >= 1.0:
+            report(result, count, (count - reported) / (now - last_report))
+            last_report, reported = now, count
+        release(result)
+    return count, time.perf_counter() - start
+
+
+def run_bands(scheduler, sweeps=0, duration=0.0, report=None):
+    # sweeps 为全部频段的扫描总数; 调度在后台线程池进行, 这里只负责计时与定期报告
+    scheduler.budget = sweeps or None
+    scheduler.start()
+    start = last_report = time.perf_counter()
+    count = reported = 0
+    try:
+        while (not sweeps or count < sweeps) and (not duration or time.perf_counter() - start < duration):
+            time.sleep(0.05)
+            scheduler.check_catalog()
+            count = sum(stats["sweeps"] for stats in scheduler.stats().values())
+            now = time.perf_counter()
+            if report is not None and now - last_report >= 1.0:
+                report(scheduler, count, (count - reported) / (now - last_report))
+                last_report, reported = now, count
+    finally:
+        scheduler.stop()
+    return count, time.perf_counter() - start
+
+
+def print_band_report(scheduler, count, rate):
+    print(f"{scheduler.status_text()} | {rate:.1f} 次/秒", flush=True)
+
+
+def print_band_stats(scheduler):
+    for (s, b), stats in scheduler.stats().items():
+        sat = scheduler.satellites[s]
+        print(f"  {sat['name']} {sat['bands'][b]['name']}: {stats['sweeps']} 次, {stats['rate']:.1f} 次/秒, "
+              f"单次 {stats['mean_ms']:.1f} ms, 平均延迟 {stats['late_ms']:.1f} ms")
+
+
+def print_report(result, count, rate):
+    line = f"扫描 {count} 次 | {rate:.1f} 次/秒"
+    if result.peak_freq is not None:
+        line += f" | 峰值 {result.peak_freq:.3f} MHz {result.peak_val:.1f} dBm"
+    if result.detections is not None:
+        report = result.detections
+        line += f" | 载波 {len(report.detections)} 未知 {report.unknown} 缺失 {len(report.missing)}"
+    if result.limits is not None:
+        line += f" | 告警 {len(result.limits.ranges)} 段"
+    print(line, flush=True)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    engine = create_engine(args, parser)
+    band = engine.current_band
+    freq_min, freq_max = engine.sweep_range
+    print(f"{engine.selected_sat['name']} {band['name']} ({freq_min:g}-{freq_max:g} {band['unit']}), "
+          f"{engine.sweep_points} 点, RB {args.rb:g} Hz, VB {args.vb:g} Hz", flush=True)
+    server = None
+    if args.serve:
+        try:
+            server = SweepServer(*parse_address(args.serve)).start()
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"无法启动推送服务: {e}")
+        print(f"推送服务: {server.host}:{server.port} (TCP 发送 \"SUB [点数]\" 或 WebSocket /?points=N)", flush=True)
+    scpi = None
+    if args.scpi:
+        try:
+            scpi = ScpiServer(ScpiInstrument(engine, export_dir=args.export_dir), *parse_address(args.scpi)).start()
+        except (OSError, ValueError) as e:
+            if server is not None:
+                server.stop()
+            raise SystemExit(f"无法启动 SCPI 服务: {e}")
+        print(f"SCPI 服务: {scpi.host}:{scpi.port}", flush=True)
+    publishers = []
+    if server is not None:
+        publishers.append(server.publish)
+    if scpi is not None:
+        publishers.append(scpi.instrument.update)
+
+    def publish(result):
+        for func in publishers:
+            func(result)
+
+    scheduler = None
+    if args.all_bands:
+        scheduler = BandScheduler(engine.catalog, workers=args.workers or None, interval=args.revisit, seed=args.seed,
+                                  on_sweep=(lambda key, sweep: publish(sweep)) if publishers else None)
+        scheduler.follow(engine)
+        print(f"多频段扫描: {len(scheduler)} 个频段, {scheduler.workers} 个工作线程, 重访周期 {args.revisit:g} 秒", flush=True)
+    clock = None
+    try:
+        if scheduler is not None:
+            count, elapsed = run_bands(scheduler, args.sweeps, args.duration, None if args.quiet else print_band_report)
+        else:
+            clock = create_clock(engine, args)
+            if clock.mode == "instrument":
+                print(f"仿真扫描时间 {engine.sweep_time() * 1e3:.1f} ms", flush=True)
+            count, elapsed = run(engine, clock, args.sweeps, args.duration, None if args.quiet else print_report,
+                                 publish if publishers else None)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if engine.detection_log is not None:
+            engine.detection_log.close()
+        if engine.limit_log is not None:
+            engine.limit_log.close()
+        if server is not None:
+            server.stop()
+        if scpi is not None:
+            scpi.stop()
+    if scheduler is not None:
+        # 模板引擎自身不扫描, 统计各频段引擎的工作区
+        allocations = sum(scheduler.engine(key).workspace.last_allocations for key in scheduler.tasks)
+        buffers = f"各频段末次扫描新分配缓冲合计 {allocations} 个, 共享空闲缓冲 {len(scheduler.pool.free)} 个"
+    else:
+        buffers = f"末次扫描新分配缓冲 {engine.workspace.last_allocations} 个"
+    print(f"共 {count} 次扫描, 用时 {elapsed:.2f} 秒, 平均 {count / elapsed if elapsed else 0:.1f} 次/秒, {buffers}")
+    if clock is not None and clock.mode != "max":
+        print(clock.status_text())
+    if scheduler is not None:
+        print_band_stats(scheduler)
+    if engine.limits_enabled:
+        print(f"门限告警 {engine.limits.alarms} 次")
+    if args.profile == "-":
+        print(engine.profiler.to_json())
+    elif args.profile:
+        engine.profiler.dump(args.profile)
+    if engine.psd_mode == "welch":
+        print(f"Welch: FFT {engine.iq.nfft} 点, 等效 RBW {engine.iq.rbw / 1e3:.1f} kHz, 平均 {engine.iq.averages} 帧")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
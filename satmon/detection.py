@@ -0,0 +1,65 @@
+import collections
+
+import numpy as np
+
+Detection = collections.namedtuple("Detection", "freq level bandwidth carrier")
+DetectionReport = collections.namedtuple("DetectionReport", "timestamp detections unknown missing")
+
+
+class CarrierDetector:
+    # 多载波检测: 门限相对噪声底, 用突出度/宽度排除噪声与载波顶部抖动
+    def __init__(self, threshold_db=10.0, prominence_db=6.0, min_width_mhz=0.5, max_points=16384):
+        self.threshold_db = threshold_db
+        self.prominence_db = prominence_db
+        self.min_width_mhz = min_width_mhz
+        self.max_points = max_points
+        self._edges_key = None
+        self._edges = None
+        self._last = None
+
+    def block_edges(self, n_points):
+        # 各块的起点与末点下标
+        if self._edges_key != n_points:
+            block = -(-n_points // self.max_points)
+            self._edges_key = n_points
+            self._edges = np.arange(0, n_points, block)
+            self._last = np.append(self._edges[1:], n_points) - 1
+        return self._edges, self._last
+
+    def detect(self, freq, psd, noise_floor, carriers, timestamp=None):
+        # 高点数扫描先按块取峰值降到 max_points 以内, 载波顶部抖动产生的局部极大值随之减少;
+        # 每块的频率取块中心, 检测频率不会整体偏向低端半个块宽
+        span = (freq[0], freq[-1])
+        if len(psd) > self.max_points:
+            edges, last = self.block_edges(len(psd))
+            psd = np.maximum.reduceat(psd, edges)
+            freq = (freq[edges] + freq[last]) / 2
+        from scipy import signal
+        df = (freq[-1] - freq[0]) / (len(freq) - 1)
+        peaks, props = signal.find_peaks(psd, height=noise_floor + self.threshold_db, prominence=self.prominence_db,
+                                         width=max(self.min_width_mhz / df, 1.0), rel_height=0.5)
+        # 半突出度处的两侧交点: 中点作中心频率, 间距作带宽估计
+        left = np.interp(props["left_ips"], np.arange(len(freq)), freq)
+        right = np.interp(props["right_ips"], np.arange(len(freq)), freq)
+        det_freq = (left + right) / 2
+        det_level = psd[peaks]
+        det_bw = right - left
+
+        if not carriers:
+            # 目录中没有载波 (或跨度内没有): 所有检测都是未知载波, 也无缺失
+            detections = [Detection(float(f), float(level), float(bw), None) for f, level, bw in zip(det_freq, det_level, det_bw)]
+            return DetectionReport(timestamp, detections, len(detections), [])
+
+        names = [carrier["name"] for carrier in carriers]
+        c_freq = np.array([carrier["freq"] for carrier in carriers], dtype=float)
+        c_bw = np.array([carrier["bw"] for carrier in carriers], dtype=float)
+        # 检测中心落在配置载波带宽内即视为匹配 (检测 × 载波 广播)
+        match = np.abs(det_freq[:, None] - c_freq[None, :]) <= c_bw[None, :] / 2
+        matched_carrier = np.where(match.any(axis=1), match.argmax(axis=1), -1)
+        in_span = (c_freq >= span[0]) & (c_freq <= span[1])
+        missing = [names[i] for i in np.flatnonzero(in_span & ~match.any(axis=0))]
+
+        detections = [Detection(float(f), float(level), float(bw), names[c] if c >= 0 else None)
+                      for f, level, bw, c in zip(det_freq, det_level, det_bw, matched_carrier)]
+        unknown = int(np.count_nonzero(matched_carrier < 0))
+        return DetectionReport(timestamp, detections, unknown, missing)
@@ -0,0 +1,304 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+from satmon.averaging import Averager
+from satmon.catalog import Catalog
+from satmon.detection import CarrierDetector
+from satmon.filtering import RbVbFilter
+from satmon.iq import PSD_MODES, WelchPsdEngine
+from satmon.limits import LimitMonitor
+from satmon.profiling import StageProfiler
+from satmon.satellites import CHINASAT_SATELLITES
+from satmon.sweeptime import sweep_time
+from satmon.synthesis import CarrierTemplates
+from satmon.workspace import SweepWorkspace
+
+MIN_SWEEP_POINTS = 101
+MAX_SWEEP_POINTS = 8_000_000
+MIN_SPAN_MHZ = 0.01
+CATALOG_POLL_S = 1.0
+
+# lease: 曲线缓冲的持有计数 (见 workspace.Lease), 保存扫描以便稍后读取的一方须 retain(), 用完 release()
+Sweep = collections.namedtuple("Sweep", "timestamp sat_idx band_idx rb vb freq psd max_hold min_hold avg peak_freq peak_val detections limits lease",
+                               defaults=(None, None, None))
+# 流水线中的一帧: replay 为回放记录的元数据 (实时帧为 None), filtered 表示 psd 已经过 RBW/VBW
+Frame = collections.namedtuple("Frame", "freq psd timestamp replay filtered", defaults=(None, False))
+
+
+class SpectrumEngine:
+    # 无界面的频谱仿真引擎: 生成 → RBW/VBW → 保持/平均/峰值.
+    # 界面 / SCPI 线程修改卫星、跨度、点数与保持平均状态, 流水线线程读取与更新它们, 两边都在 self.lock 内进行
+    def __init__(self, satellites=CHINASAT_SATELLITES, sat_idx=2, band_idx=0, sweep_points=1000,
+                 rb=1000.0, vb=100.0, avg_count=5, avg_mode="window", avg_scale="log", psd_mode="analytic", seed=None, pool=None):
+        self.lock = threading.RLock()
+        self.catalog = Catalog.from_satellites(satellites)
+        self.satellites = self.catalog.satellites
+        self.sat_names = self.catalog.names
+        # 目录从文件加载时可开启热加载, 由扫描线程每 CATALOG_POLL_S 秒检查一次文件
+        self.catalog_watch = False
+        self.catalog_version = 0
+        self.catalog_checked = 0.0
+        self.rng = np.random.default_rng(seed)
+        self.workspace = SweepWorkspace(self.rng, pool)
+        self.hold_lease = None
+        self.profiler = StageProfiler()
+        self.rbvb_filter = RbVbFilter(profiler=self.profiler, on_alloc=self.workspace.count)
+        self.iq = WelchPsdEngine(self.rng, on_alloc=self.workspace.count)
+        self.psd_mode = psd_mode
+        self.rb = rb     # Hz
+        self.vb = vb     # Hz
+        self.sweep_points = sweep_points
+        self.peak_search_enabled = False
+        self.avg_enabled = False
+        self.averager = Averager(avg_count, avg_mode, avg_scale)
+        self.detector = CarrierDetector()
+        self.detect_enabled = False
+        self.detection_log = None
+        self.limits = LimitMonitor()
+        self.limits_enabled = False
+        self.limit_log = None
+        self.templates = CarrierTemplates()
+        self.select_satellite(sat_idx, band_idx)
+
+    def select_satellite(self, sat_idx, band_idx=0):
+        with self.lock:
+            self.selected_sat_idx = sat_idx
+            self.selected_sat = self.satellites[sat_idx]
+            self.selected_band_idx = band_idx
+            self.current_band = self.selected_sat["bands"][band_idx]
+            self.noise_floor = self.current_band["noise_floor"]
+            self.carrier_configs = self.selected_sat["carriers"]
+            self.span = None
+            self.update_span_carriers()
+            self.reset_holds()
+
+    def set_catalog(self, catalog):
+        # 切换目录后按名称保留当前卫星 (已不存在则选第一颗) 与扫描跨度
+        with self.lock:
+            name, band_idx, span = self.selected_sat["name"], self.selected_band_idx, self.span
+            self.catalog = catalog
+            self.satellites = catalog.satellites
+            self.sat_names = catalog.names
+            sat_idx = catalog.sat_index.get(name)
+            if sat_idx is None:
+                sat_idx, band_idx, span = 0, 0, None
+            elif band_idx >= len(self.satellites[sat_idx]["bands"]):
+                band_idx, span = 0, None
+            self.select_satellite(sat_idx, band_idx)
+            if span is not None:
+                try:
+                    self.set_span(*span)
+                except ValueError:
+                    pass
+            self.catalog_version += 1
+
+    def check_catalog(self):
+        now = time.monotonic()
+        if not self.catalog_watch or now - self.catalog_checked < CATALOG_POLL_S:
+            return False
+        self.catalog_checked = now
+        catalog = self.catalog.reload()
+        if catalog is None:
+            return False
+        self.set_catalog(catalog)
+        return True
+
+    def update_span_carriers(self):
+        # 区间索引查询与扫描范围相交的载波, 只在卫星 / 跨度 / 目录变化时进行
+        rows = self.catalog.overlapping(*self.sweep_range, sat=self.selected_sat_idx)
+        self.span_carriers = self.catalog.carriers(rows)
+
+    def set_span(self, freq_min=None, freq_max=None):
+        # 扫描起止频率 (MHz), 限制在当前频段内; 不带参数或覆盖整个频段即恢复全频段扫描.
+        # 扫描点数全部落在跨度内, 载波合成只考虑与跨度相交的载波; 跨度变化时保持与平均重新开始
+        with self.lock:
+            band = self.current_band
+            span = None
+            if freq_min is not None or freq_max is not None:
+                lo = band["min"] if freq_min is None else max(float(freq_min), band["min"])
+                hi = band["max"] if freq_max is None else min(float(freq_max), band["max"])
+                if hi - lo < MIN_SPAN_MHZ:
+                    raise ValueError(f"扫描跨度须不小于 {MIN_SPAN_MHZ * 1e3:g} kHz")
+                if lo > band["min"] or hi < band["max"]:
+                    span = (lo, hi)
+            if span == self.span:
+                return
+            self.span = span
+            self.update_span_carriers()
+            self.reset_holds()
+
+    @property
+    def sweep_range(self):
+        if self.span is not None:
+            return self.span
+        return self.current_band["min"], self.current_band["max"]
+
+    def sweep_time(self):
+        # 真实频谱仪在当前跨度 / RBW / VBW / 点数下的扫描时间 (秒)
+        freq_min, freq_max = self.sweep_range
+        return sweep_time((freq_max - freq_min) * 1e6, self.rb, self.vb, self.sweep_points)
+
+    def set_sweep_points(self, n_points):
+        if not MIN_SWEEP_POINTS <= n_points <= MAX_SWEEP_POINTS:
+            raise ValueError(f"点数须在 {MIN_SWEEP_POINTS}-{MAX_SWEEP_POINTS} 之间")
+        with self.lock:
+            self.sweep_points = n_points
+            self.reset_holds()
+
+    def set_psd_mode(self, mode):
+        if mode not in PSD_MODES:
+            raise ValueError(f"未知谱估计方式: {mode}")
+        with self.lock:
+            self.psd_mode = mode
+            self.reset_holds()
+
+    def reset_holds(self):
+        with self.lock:
+            self.max_hold = None
+            self.min_hold = None
+            if self.hold_lease is not None:
+                self.hold_lease.release()
+                self.hold_lease = None
+            self.averager.reset()
+
+    @property
+    def avg_count(self):
+        return self.averager.count
+
+    def configure_averaging(self, count=None, mode=None, scale=None):
+        with self.lock:
+            self.averager.configure(count, mode, scale)
+
+    def generate_raw(self):
+        t0 = time.perf_counter()
+        # 在锁内取一份一致的扫描参数, 生成本身在锁外进行
+        with self.lock:
+            freq_min, freq_max = self.sweep_range
+            carriers = self.span_carriers
+            n_points, noise_floor, psd_mode = self.sweep_points, self.noise_floor, self.psd_mode
+        self.workspace.begin_sweep()
+        freq = self.workspace.frequencies(freq_min, freq_max, n_points)
+        if psd_mode == "welch":
+            # IQ + Welch 估计: RBW 由 FFT 长度决定, 不再经过解析 RBW/VBW 滤波; 采样率即扫描跨度
+            psd = self.iq.sweep(freq, {"min": freq_min, "max": freq_max}, carriers, noise_floor, self.rb, self.vb,
+                                self.workspace.buffer(n_points))
+            self.profiler.lap("IQ+Welch", t0)
+            return freq, psd
+        psd = self.workspace.noise(noise_floor, n_points)
+        t0 = self.profiler.lap("噪声", t0)
+        # 载波包络模板只在载波或频率网格变化时重建
+        self.templates.update(freq, carriers, noise_floor)
+        psd = self.templates.apply(psd, self.rng)
+        self.profiler.lap("载波合成", t0)
+        return freq, psd
+
+    def generate_spectrum(self):
+        freq, psd = self.generate_raw()
+        if self.psd_mode == "welch":
+            return freq, psd
+        return freq, self.apply_rb_vb_filtering(psd)
+
+    def apply_rb_vb_filtering(self, psd_db, out=None):
+        freq_min, freq_max = self.sweep_range
+        freq_span = freq_max - freq_min
+        return self.rbvb_filter.apply(psd_db, self.rb, self.vb, freq_span, out)
+
+    def process(self, freq, psd, timestamp=None):
+        with self.lock:
+            return self.process_locked(freq, psd, timestamp)
+
+    def process_locked(self, freq, psd, timestamp):
+        if timestamp is None:
+            timestamp = time.time()
+        t0 = time.perf_counter()
+        # 保持曲线每次写入新的工作区缓冲而非原地修改, 已交出的 Sweep 不会被改写; 引擎自己也持有上一帧,
+        # 直到本帧的保持曲线算完. 按频率网格判断: 跨度或点数变化前已在流水线中的帧不会混入新网格的保持曲线
+        previous, self.hold_lease = self.hold_lease, None
+        n = len(psd)
+        grid = (n, freq[0], freq[-1])
+        if self.max_hold is None or grid != self.hold_grid:
+            self.hold_grid = grid
+            self.averager.reset()
+            self.max_hold = self.workspace.buffer(n)
+            self.max_hold[...] = psd
+            self.min_hold = self.workspace.buffer(n)
+            self.min_hold[...] = psd
+        else:
+            self.max_hold = np.maximum(self.max_hold, psd, out=self.workspace.buffer(n))
+            self.min_hold = np.minimum(self.min_hold, psd, out=self.workspace.buffer(n))
+
+        avg_curve = None
+        if self.avg_enabled:
+            avg_curve = self.averager.push(psd, out=self.workspace.buffer(n))
+        elif self.averager.filled:
+            self.averager.reset()
+
+        t0 = self.profiler.lap("保持/平均", t0)
+
+        peak_freq = peak_val = None
+        if self.peak_search_enabled:
+            idx = np.argmax(psd)
+            peak_freq = freq[idx]
+            peak_val = psd[idx]
+
+        detections = None
+        if self.detect_enabled:
+            detections = self.detector.detect(freq, psd, self.noise_floor, self.span_carriers, timestamp)
+            if self.detection_log is not None:
+                self.detection_log.write(self.detection_record(detections))
+            t0 = self.profiler.lap("检测", t0)
+
+        limits = None
+        if self.limits_enabled:
+            limits = self.limits.check(freq, psd, self.noise_floor, self.span_carriers, self.current_band.get("limits", ()), timestamp)
+            if self.limit_log is not None:
+                for event in limits.events:
+                    self.limit_log.write(self.limit_record(event))
+            self.profiler.lap("门限", t0)
+
+        lease = self.workspace.lease((psd, self.max_hold, self.min_hold, avg_curve))
+        self.hold_lease = lease.retain()
+        if previous is not None:
+            previous.release()
+        return Sweep(timestamp, self.selected_sat_idx, self.selected_band_idx, self.rb, self.vb,
+                     freq, psd, self.max_hold, self.min_hold, avg_curve, peak_freq, peak_val, detections, limits, lease)
+
+    def detection_record(self, report):
+        return {
+            "timestamp": report.timestamp,
+            "satellite": self.selected_sat["name"],
+            "band": self.current_band["name"],
+            "detections": [det._asdict() for det in report.detections],
+            "unknown": report.unknown,
+            "missing": report.missing,
+        }
+
+    def limit_record(self, event):
+        record = event._asdict()
+        record["satellite"] = self.selected_sat["name"]
+        record["band"] = self.current_band["name"]
+        return record
+
+    # 流水线各阶段: 生成 / 滤波 / 保持平均与检测; 保持与平均状态只在最后一个阶段修改
+    def acquire(self):
+        self.check_catalog()
+        freq, psd = self.generate_raw()
+        return Frame(freq, psd, time.time(), filtered=self.psd_mode == "welch")
+
+    def filter_frame(self, frame):
+        if frame.filtered:
+            return frame
+        # 原始谱缓冲只属于本帧, 滤波结果直接写回
+        return frame._replace(psd=self.apply_rb_vb_filtering(frame.psd, out=frame.psd), filtered=True)
+
+    def process_frame(self, frame):
+        sweep = self.process(frame.freq, frame.psd, frame.timestamp)
+        if frame.replay is not None:
+            sweep = sweep._replace(**frame.replay)
+        return sweep
+
+    def sweep(self):
+        return self.process_frame(self.filter_frame(self.acquire()))
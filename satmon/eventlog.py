@@ -0,0 +1,37 @@
+import json
+import queue
+import threading
+
+
+class AsyncJsonlWriter:
+    # 后台线程写 JSON Lines; 队列满时丢弃并计数, 调用方永不阻塞
+    def __init__(self, path, maxsize=4096):
+        self.path = path
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.written = 0
+        self.file = open(path, "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def write(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                break
+            self.file.write(json.dumps(record, ensure_ascii=False))
+            self.file.write("\n")
+            self.written += 1
+            if self.queue.empty():
+                self.file.flush()
+        self.file.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=5.0)
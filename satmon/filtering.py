@@ -0,0 +1,88 @@
+import functools
+import time
+
+import numpy as np
+
+RB_MIN, RB_MAX = 1.0, 40000.0      # Hz
+VB_MIN, VB_MAX = 1.0, 400.0        # Hz
+VB_DT = 0.01
+# RBW 核长度超过该点数时改用 FFT 重叠相加卷积
+FFT_KERNEL_THRESHOLD = 64
+
+
+@functools.lru_cache(maxsize=64)
+def rbw_kernel(rb, span_mhz, n_points):
+    # 高斯 RBW 核, 按 (RB, 跨度, 点数) 缓存; 核退化为单位脉冲时返回 None
+    rb_sigma_hz = rb / 2.355
+    res_bw_per_point = (span_mhz * 1e6) / n_points
+    sigma_pts = rb_sigma_hz / res_bw_per_point
+    kernel_len = int(sigma_pts * 12)
+    if kernel_len < 5:
+        kernel_len = 5
+    if kernel_len % 2 == 0:
+        kernel_len += 1
+    x = np.arange(kernel_len) - kernel_len // 2
+    kernel = np.exp(-0.5 * (x / sigma_pts) ** 2)
+    kernel /= kernel.sum()
+    if kernel[kernel_len // 2] == 1.0:
+        return None
+    kernel.setflags(write=False)
+    return kernel
+
+
+@functools.lru_cache(maxsize=64)
+def vbw_coefficients(vb):
+    # 一阶 IIR 视频滤波器: y[i] = a*x[i] + (1-a)*y[i-1]
+    tau = 1.0 / (2 * np.pi * vb)
+    alpha = VB_DT / (tau + VB_DT)
+    return np.array([alpha]), np.array([1.0, alpha - 1.0])
+
+
+def ignore_allocations(n):
+    pass
+
+
+class RbVbFilter:
+    # scipy / numpy 的卷积与递推都不支持 out, 每次各产生一个结果数组, 经 on_alloc(n) 计入分配统计
+    def __init__(self, fft_threshold=FFT_KERNEL_THRESHOLD, profiler=None, on_alloc=ignore_allocations):
+        self.fft_threshold = fft_threshold
+        self.profiler = profiler
+        self.on_alloc = on_alloc
+
+    def rbw(self, psd_db, rb, span_mhz):
+        rb = float(np.clip(rb, RB_MIN, RB_MAX))
+        kernel = rbw_kernel(rb, float(span_mhz), len(psd_db))
+        if kernel is None:
+            return psd_db
+        self.on_alloc(1)
+        if len(kernel) > self.fft_threshold:
+            from scipy import signal
+            return signal.oaconvolve(psd_db, kernel, mode='same')
+        return np.convolve(psd_db, kernel, mode='same')
+
+    def vbw(self, psd_db, vb):
+        # scipy.signal 导入较慢, 首次滤波时才导入
+        from scipy import signal
+        vb = float(np.clip(vb, VB_MIN, VB_MAX))
+        b, a = vbw_coefficients(vb)
+        # 初始状态使 y[0] = x[0], 与逐点递推一致
+        zi = [(1.0 - b[0]) * psd_db[0]]
+        self.on_alloc(1)
+        out, _ = signal.lfilter(b, a, psd_db, zi=zi)
+        return out
+
+    def apply(self, psd_db, rb, vb, span_mhz, out=None):
+        # out 可与 psd_db 为同一缓冲: scipy 卷积/递推的临时结果最后拷回
+        profiler = self.profiler
+        if profiler is None:
+            result = self.vbw(self.rbw(psd_db, rb, span_mhz), vb)
+        else:
+            t0 = time.perf_counter()
+            smoothed = self.rbw(psd_db, rb, span_mhz)
+            t0 = profiler.lap("RBW", t0)
+            result = self.vbw(smoothed, vb)
+            profiler.lap("VBW", t0)
+        if out is None:
+            return result
+        out[...] = result
+        return out
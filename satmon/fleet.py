@@ -0,0 +1,90 @@
+import numpy as np
+
+from satmon.averaging import Averager
+from satmon.filtering import RB_MAX, RB_MIN, VB_MAX, VB_MIN, rbw_kernel, vbw_coefficients
+from satmon.synthesis import JITTER_DB, SKIRT_EXTENT, carrier_envelope, roll_off_for
+
+
+class FleetSimulator:
+    # 全部卫星 × 频段一次性合成为 (行, 频点) 二维数组, 保持/平均按行进行
+    def __init__(self, satellites, n_points=1000, rb=1000.0, vb=100.0, avg_count=5, avg_mode="window", avg_scale="log", seed=None):
+        self.satellites = satellites
+        self.n_points = n_points
+        self.rb = rb
+        self.vb = vb
+        self.averager = Averager(avg_count, avg_mode, avg_scale)
+        self.rng = np.random.default_rng(seed)
+
+        self.rows = [(s, b) for s, sat in enumerate(satellites) for b in range(len(sat["bands"]))]
+        bands = [satellites[s]["bands"][b] for s, b in self.rows]
+        self.labels = [f"{satellites[s]['name']} {band['name']}" for (s, b), band in zip(self.rows, bands)]
+        self.freq_min = np.array([band["min"] for band in bands], dtype=float)
+        self.freq_max = np.array([band["max"] for band in bands], dtype=float)
+        self.noise_floor = np.array([band["noise_floor"] for band in bands], dtype=float)
+        self.span = self.freq_max - self.freq_min
+        self.freq = self.freq_min[:, None] + self.span[:, None] * np.linspace(0, 1, n_points)[None, :]
+        self.build_carrier_table()
+        self.reset_holds()
+
+    def build_carrier_table(self):
+        rows, freq, bw, power, roll_off = [], [], [], [], []
+        for r, (s, _) in enumerate(self.rows):
+            for carrier in self.satellites[s]["carriers"]:
+                rows.append(r)
+                freq.append(carrier["freq"])
+                bw.append(carrier["bw"])
+                power.append(carrier["power"])
+                roll_off.append(roll_off_for(carrier["modulation"]))
+        rows = np.array(rows, dtype=np.intp)
+        freq, bw, power, roll_off = (np.array(v, dtype=float) for v in (freq, bw, power, roll_off))
+
+        # 每个载波只覆盖其局部频点窗口, 展平为 (行*N + 频点) 索引
+        n = self.n_points
+        df = self.span[rows] / (n - 1)
+        extent = SKIRT_EXTENT * bw * (1 + roll_off) / 2
+        lo = np.clip(np.ceil((freq - extent - self.freq_min[rows]) / df), 0, n).astype(np.intp)
+        hi = np.clip(np.floor((freq + extent - self.freq_min[rows]) / df) + 1, 0, n).astype(np.intp)
+        counts = np.maximum(hi - lo, 0)
+        owner = np.repeat(np.arange(len(rows)), counts)
+        bins = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + lo[owner]
+        self.carrier_index = rows[owner] * n + bins
+        dist = self.freq.reshape(-1)[self.carrier_index] - freq[owner]
+        envelope = carrier_envelope(dist, bw[owner], roll_off[owner])
+        floor = self.noise_floor[rows[owner]]
+        self.carrier_level = envelope * (power[owner] - floor) + floor
+
+    def reset_holds(self):
+        shape = (len(self.rows), self.n_points)
+        self.max_hold = np.full(shape, -np.inf)
+        self.min_hold = np.full(shape, np.inf)
+        self.averager.reset()
+        self.sweep_count = 0
+
+    def filter(self, psd):
+        from scipy import signal
+        rb = float(np.clip(self.rb, RB_MIN, RB_MAX))
+        for span in np.unique(self.span):
+            kernel = rbw_kernel(rb, float(span), self.n_points)
+            if kernel is None:
+                continue
+            rows = self.span == span
+            psd[rows] = signal.oaconvolve(psd[rows], kernel[None, :], mode='same', axes=1)
+        b, a = vbw_coefficients(float(np.clip(self.vb, VB_MIN, VB_MAX)))
+        out, _ = signal.lfilter(b, a, psd, axis=1, zi=(1.0 - b[0]) * psd[:, :1])
+        return out
+
+    def sweep(self):
+        psd = self.noise_floor[:, None] + self.rng.standard_normal((len(self.rows), self.n_points))
+        levels = self.carrier_level + self.rng.uniform(-JITTER_DB, JITTER_DB, self.carrier_level.shape)
+        np.maximum.at(psd.reshape(-1), self.carrier_index, levels)
+        psd = self.filter(psd)
+
+        np.maximum(self.max_hold, psd, out=self.max_hold)
+        np.minimum(self.min_hold, psd, out=self.min_hold)
+        self.averager.push(psd)
+        self.sweep_count += 1
+        return psd
+
+    @property
+    def average(self):
+        return self.averager.value()
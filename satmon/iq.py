@@ -0,0 +1,153 @@
+import functools
+
+import numpy as np
+
+from satmon.filtering import VB_MAX, ignore_allocations
+from satmon.synthesis import roll_off_for
+
+MIN_NFFT = 256
+MAX_NFFT = 65536
+MAX_AVERAGES = 8
+# Hann 窗等效噪声带宽 (以 FFT 频点间隔为单位)
+HANN_ENBW = 1.5
+PSD_MODES = {"analytic": "解析包络", "welch": "IQ + Welch"}
+
+
+def constellation(modulation):
+    # 单位平均功率的星座点
+    if "QAM" in modulation:
+        levels = np.array([-3, -1, 1, 3], dtype=float)
+        points = (levels[:, None] + 1j * levels[None, :]).ravel()
+    elif "8PSK" in modulation or "S2" in modulation:
+        points = np.exp(2j * np.pi * np.arange(8) / 8)
+    else:
+        points = np.exp(1j * (np.pi / 4 + np.pi / 2 * np.arange(4)))
+    return points / np.sqrt(np.mean(np.abs(points) ** 2))
+
+
+@functools.lru_cache(maxsize=16)
+def hann_window(nfft):
+    # 周期 Hann 窗 (与 scipy get_window("hann") 相同)
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(nfft) / nfft)).astype(np.float32)
+    window.flags.writeable = False
+    return window
+
+
+def fft_size_for(rb, fs):
+    # RBW = ENBW * fs / nfft, 取不小于所需分辨率的 2 的幂
+    nfft = 2 ** int(np.ceil(np.log2(HANN_ENBW * fs / max(rb, 1.0))))
+    return int(np.clip(nfft, MIN_NFFT, MAX_NFFT))
+
+
+def raised_cosine(f, symbol_rate, roll_off):
+    # 升余弦功率谱 (收发根升余弦级联后的形状), 平坦段 Rs(1-a)/2, 边沿 Rs(1+a)/2
+    f = np.abs(f)
+    f1 = symbol_rate * (1 - roll_off) / 2
+    f2 = symbol_rate * (1 + roll_off) / 2
+    edge = 0.5 * (1 + np.cos(np.pi * (f - f1) / max(f2 - f1, 1e-12)))
+    return np.where(f <= f1, 1.0, np.where(f <= f2, edge, 0.0))
+
+
+class WelchPsdEngine:
+    # 按配置载波合成复基带 IQ (星座符号 → 频域升余弦成形 → 一次 IFFT), 再用加窗、50% 重叠的批量 FFT 做 Welch 估计.
+    # 采样率等于频段宽度, 中心对准频段中心; 输出按显示点数做正峰值检波或插值.
+    # 标定: 白噪声每个 FFT 频点显示为底噪, 载波平坦段显示为其 power.
+    # FFT 与批量分帧的中间数组每次扫描新建, 经 on_alloc(n) 计入分配统计
+    def __init__(self, rng, workers=-1, on_alloc=ignore_allocations):
+        self.rng = rng
+        self.workers = workers
+        self.on_alloc = on_alloc
+        self.nfft = MAX_NFFT
+        self.averages = 1
+        self.rbw = 0.0
+        self.shape_key = None
+        self.shapes = []
+        self.map_key = None
+        self.bin_freq = None
+        self.edges = None
+
+    def configure(self, rb, vb, fs):
+        self.nfft = fft_size_for(rb, fs)
+        self.rbw = HANN_ENBW * fs / self.nfft
+        # 视频带宽越窄平均帧数越多
+        self.averages = int(np.clip(round(VB_MAX / max(vb, 1.0)), 1, MAX_AVERAGES))
+        return (self.averages + 1) * self.nfft // 2
+
+    def build_shapes(self, n_samples, fs, center, carriers):
+        # 每个载波的成形幅度与频点索引只在载波、采样长度或频段变化时重算
+        df = fs / n_samples
+        shapes = []
+        for carrier in carriers:
+            roll_off = roll_off_for(carrier["modulation"])
+            symbol_rate = carrier["bw"] * 1e6
+            n_symbols = max(int(round(symbol_rate / df)), 1)
+            offset = (carrier["freq"] - center) * 1e6
+            half = symbol_rate * (1 + roll_off) / 2
+            k = np.arange(int(np.ceil((offset - half) / df)), int(np.floor((offset + half) / df)) + 1)
+            k = k[(k >= -n_samples // 2) & (k < n_samples - n_samples // 2)]
+            if len(k) == 0:
+                continue
+            amplitude = np.sqrt(10 ** (carrier["power"] / 10) * raised_cosine(k * df - offset, symbol_rate, roll_off))
+            # 符号谱以 Rs 为周期, 占用带宽 Rs(1+a) 内按 (频点 mod 符号数) 取值
+            shapes.append((k % n_samples, k % n_symbols, amplitude.astype(np.float32), n_symbols, constellation(carrier["modulation"]).astype(np.complex64)))
+        return shapes
+
+    def synthesize(self, n_samples, fs, center, carriers, noise_floor):
+        from scipy import fft
+        # 频域直接构造: 噪声与各载波的谱在 n_samples 个频点上叠加, 最后一次 IFFT 得到 IQ; 全程单精度
+        key = (n_samples, fs, center, tuple((c["freq"], c["bw"], c["power"], c["modulation"]) for c in carriers))
+        if key != self.shape_key:
+            self.shapes = self.build_shapes(n_samples, fs, center, carriers)
+            self.shape_key = key
+        spectrum = self.rng.standard_normal(2 * n_samples, dtype=np.float32).view(np.complex64)
+        spectrum *= np.float32(np.sqrt(10 ** (noise_floor / 10) / 2))
+        for bins, symbol_bins, amplitude, n_symbols, points in self.shapes:
+            symbols = points[self.rng.integers(0, len(points), n_symbols)]
+            symbol_spectrum = fft.fft(symbols, norm="ortho", workers=self.workers)
+            spectrum[bins] += amplitude * symbol_spectrum[symbol_bins]
+        # 噪声谱与 IQ 各一个, 每个载波: 符号、符号谱、成形结果与索引累加
+        self.on_alloc(2 + 4 * len(self.shapes))
+        return fft.ifft(spectrum, norm="ortho", overwrite_x=True, workers=self.workers)
+
+    def welch(self, iq):
+        from scipy import fft
+        nfft = self.nfft
+        step = nfft // 2
+        n_frames = (len(iq) - nfft) // step + 1
+        frames = np.lib.stride_tricks.as_strided(iq, shape=(n_frames, nfft), strides=(iq.strides[0] * step, iq.strides[0]), writeable=False)
+        window = hann_window(nfft)
+        spectra = fft.fft(frames * window, axis=1, workers=self.workers)
+        power = np.einsum("ij,ij->j", spectra.real, spectra.real)
+        power += np.einsum("ij,ij->j", spectra.imag, spectra.imag)
+        power /= n_frames * np.sum(window.astype(float) ** 2)
+        # 加窗分帧、批量 FFT、两次 einsum 与 fftshift
+        self.on_alloc(5)
+        return fft.fftshift(power)
+
+    def resample(self, power, freq, center, fs, out):
+        from scipy import fft
+        # FFT 频点多于显示点时每个显示点取所覆盖频点的最大值 (正峰值检波), 否则线性插值
+        key = (len(power), len(freq), float(freq[0]), float(freq[-1]), center, fs)
+        if key != self.map_key:
+            self.bin_freq = center + fft.fftshift(fft.fftfreq(len(power), 1e6 / fs))
+            if len(power) >= 2 * len(freq):
+                half = (freq[1] - freq[0]) / 2
+                self.edges = np.searchsorted(self.bin_freq, freq - half).clip(0, len(power) - 1)
+            else:
+                self.edges = None
+            self.map_key = key
+        if self.edges is not None:
+            np.maximum.reduceat(power, self.edges, out=out)
+        else:
+            self.on_alloc(1)
+            out[...] = np.interp(freq, self.bin_freq, power)
+        np.log10(out, out=out)
+        out *= 10
+        return out
+
+    def sweep(self, freq, band, carriers, noise_floor, rb, vb, out):
+        fs = (band["max"] - band["min"]) * 1e6
+        center = (band["max"] + band["min"]) / 2
+        n_samples = self.configure(rb, vb, fs)
+        iq = self.synthesize(n_samples, fs, center, carriers, noise_floor)
+        return self.resample(self.welch(iq), freq, center, fs, out)
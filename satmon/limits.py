@@ -0,0 +1,162 @@
+import collections
+
+import numpy as np
+
+from satmon.synthesis import roll_off_for
+
+MARGIN_DB = 10.0
+TOLERANCE_DB = 6.0
+HYSTERESIS_DB = 2.0
+DEBOUNCE_SWEEPS = 3
+# 载波上限覆盖占用带宽并外扩保护带, 容纳 RBW/VBW 展宽与不同谱估计方式的边沿形状差异;
+# 下限只覆盖平坦段的中心部分
+GUARD_FRACTION = 0.15
+CORE_FRACTION = 0.8
+MAX_EVENTS = 32
+
+LimitEvent = collections.namedtuple("LimitEvent", "timestamp state kind freq_min freq_max level excess")
+# ranges: 当前处于告警的频率区间 (k, 2); events: 本次扫描新出现 / 解除的告警
+LimitReport = collections.namedtuple("LimitReport", "timestamp ranges events")
+
+
+class LimitMask:
+    # 上下限数组按 (频率网格, 底噪, 载波, 频段自定义门限) 缓存:
+    # 载波外上限为底噪 + margin, 载波占用带宽内上限为标称电平 + tolerance, 平坦段中心另设下限 (载波跌落).
+    # 频段字典的 "limits" 列表可追加绝对门限段 {"min", "max", "upper"/"lower"} (MHz, dBm)
+    def __init__(self, margin_db=MARGIN_DB, tolerance_db=TOLERANCE_DB, hysteresis_db=HYSTERESIS_DB):
+        self.margin_db = margin_db
+        self.tolerance_db = tolerance_db
+        self.hysteresis_db = hysteresis_db
+        self.key = None
+        self.upper = self.lower = None
+        self.upper_release = self.lower_release = None
+
+    def build(self, freq, noise_floor, carriers, segments):
+        upper = np.full(len(freq), noise_floor + self.margin_db)
+        lower = np.full(len(freq), -np.inf)
+        for carrier in carriers:
+            half_width = carrier["bw"] * ((1 + roll_off_for(carrier["modulation"])) / 2 + GUARD_FRACTION)
+            lo, hi = np.searchsorted(freq, (carrier["freq"] - half_width, carrier["freq"] + half_width))
+            np.maximum(upper[lo:hi], carrier["power"] + self.tolerance_db, out=upper[lo:hi])
+            half_core = carrier["bw"] * CORE_FRACTION / 2
+            lo, hi = np.searchsorted(freq, (carrier["freq"] - half_core, carrier["freq"] + half_core))
+            lower[lo:hi] = carrier["power"] - self.tolerance_db
+        for segment in segments:
+            lo, hi = np.searchsorted(freq, (segment["min"], segment["max"]), side="right")
+            if "upper" in segment:
+                upper[lo:hi] = segment["upper"]
+            if "lower" in segment:
+                lower[lo:hi] = segment["lower"]
+        self.upper, self.lower = upper, lower
+        # 已告警的点须回落到滞回门限以内才解除
+        self.upper_release = upper - self.hysteresis_db
+        self.lower_release = lower + self.hysteresis_db
+
+    def update(self, freq, noise_floor, carriers, segments=()):
+        key = (len(freq), float(freq[0]), float(freq[-1]), noise_floor, self.margin_db, self.tolerance_db, self.hysteresis_db,
+               tuple((c["freq"], c["bw"], c["power"], c["modulation"]) for c in carriers),
+               tuple(tuple(sorted(s.items())) for s in segments))
+        if key == self.key:
+            return False
+        self.build(freq, noise_floor, carriers, segments)
+        self.key = key
+        return True
+
+
+def alarm_ranges(alarmed):
+    # 布尔数组中连续为真的区间 [start, end)
+    edges = np.flatnonzero(np.diff(alarmed.view(np.int8), prepend=0, append=0))
+    return edges[0::2], edges[1::2]
+
+
+def overlaps(starts, ends, other_starts, other_ends):
+    # 每个区间 [start, end) 是否与另一组有序不相交区间中的任一个相交
+    j = np.searchsorted(other_ends, starts, side="right")
+    hit = np.zeros(len(starts), dtype=bool)
+    valid = j < len(other_starts)
+    hit[valid] = other_starts[j[valid]] < ends[valid]
+    return hit
+
+
+class LimitMonitor:
+    # 每次扫描对整条门限做一次向量化比较, 逐点滞回并去抖 (连续 debounce 次越限才告警);
+    # 告警集合变化时才提取区间, 只有新出现 / 消失的区间生成事件
+    def __init__(self, margin_db=MARGIN_DB, tolerance_db=TOLERANCE_DB, hysteresis_db=HYSTERESIS_DB, debounce=DEBOUNCE_SWEEPS):
+        self.mask = LimitMask(margin_db, tolerance_db, hysteresis_db)
+        self.debounce = debounce
+        self.n_points = 0
+        self.alarms = 0
+        self.reset()
+
+    def reset(self):
+        n = self.n_points
+        self.streak = np.zeros(n, dtype=np.int16)
+        self.alarmed = np.zeros(n, dtype=bool)
+        self.violating = np.zeros(n, dtype=bool)
+        self.scratch = np.zeros(n, dtype=bool)
+        self.starts = self.ends = np.empty(0, dtype=np.intp)
+        self.ranges = np.empty((0, 2))
+
+    def configure(self, margin_db=None, tolerance_db=None, hysteresis_db=None, debounce=None):
+        mask = self.mask
+        if margin_db is not None:
+            mask.margin_db = float(margin_db)
+        if tolerance_db is not None:
+            mask.tolerance_db = float(tolerance_db)
+        if hysteresis_db is not None:
+            mask.hysteresis_db = float(hysteresis_db)
+        if debounce is not None:
+            if not 1 <= int(debounce) <= 1000:
+                raise ValueError("去抖次数须在 1-1000 之间")
+            self.debounce = int(debounce)
+
+    def check(self, freq, psd, noise_floor, carriers, segments=(), timestamp=None):
+        if self.mask.update(freq, noise_floor, carriers, segments) or len(psd) != self.n_points:
+            self.n_points = len(psd)
+            self.reset()
+        mask, alarmed, violating, scratch = self.mask, self.alarmed, self.violating, self.scratch
+        np.greater(psd, mask.upper, out=violating)
+        np.less(psd, mask.lower, out=scratch)
+        violating |= scratch
+        if len(self.starts):
+            # 已告警的点改用滞回门限判定, 只在存在告警时才多做这两次比较
+            np.greater(psd, mask.upper_release, out=scratch)
+            scratch &= alarmed
+            violating |= scratch
+            np.less(psd, mask.lower_release, out=scratch)
+            scratch &= alarmed
+            violating |= scratch
+        # 连续越限计数, 不越限清零; 封顶防止溢出
+        streak = self.streak
+        np.add(streak, 1, out=streak, where=streak < self.debounce)
+        streak *= violating
+        np.greater_equal(streak, self.debounce, out=scratch)
+        self.alarmed, self.scratch = scratch, alarmed
+        events = []
+        if np.not_equal(scratch, alarmed, out=violating).any():
+            events = self.transitions(freq, psd, timestamp)
+        return LimitReport(timestamp, self.ranges, events)
+
+    def transitions(self, freq, psd, timestamp):
+        prev_starts, prev_ends = self.starts, self.ends
+        starts, ends = self.starts, self.ends = alarm_ranges(self.alarmed)
+        self.ranges = np.column_stack((freq[starts], freq[ends - 1]))
+        # 与上一次告警区间都不相交的才算新告警 / 已解除, 区间的伸缩不重复报告; 区间按起点有序, 二分查找即可
+        raised = np.flatnonzero(~overlaps(starts, ends, prev_starts, prev_ends))
+        cleared = np.flatnonzero(~overlaps(prev_starts, prev_ends, starts, ends))
+        events = []
+        for state, starts, ends, idx in (("alarm", self.starts, self.ends, raised), ("clear", prev_starts, prev_ends, cleared)):
+            for i in idx[:MAX_EVENTS]:
+                events.append(self.event(timestamp, state, freq, psd, starts[i], ends[i]))
+        self.alarms += len(raised)
+        return events
+
+    def event(self, timestamp, state, freq, psd, start, end):
+        segment = psd[start:end]
+        over = segment - self.mask.upper[start:end]
+        under = self.mask.lower[start:end] - segment
+        if over.max() >= under.max():
+            kind, level, excess = "over", segment.max(), over.max()
+        else:
+            kind, level, excess = "under", segment.min(), under.max()
+        return LimitEvent(timestamp, state, kind, float(freq[start]), float(freq[end - 1]), float(level), float(excess))
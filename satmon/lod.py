@@ -0,0 +1,27 @@
+import numpy as np
+
+
+def visible_slice(x, x_min=None, x_max=None):
+    # x 单调递增, 返回覆盖 [x_min, x_max] 的切片 (两侧各多留一点以免线段断开)
+    lo, hi = 0, len(x)
+    if x_min is not None:
+        lo = max(int(np.searchsorted(x, x_min)) - 1, 0)
+    if x_max is not None:
+        hi = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    return slice(lo, hi)
+
+
+def minmax_decimate(x, y, n_columns, x_min=None, x_max=None):
+    # 每个像素列只保留一对 (最小值, 最大值), 绘图开销只与窗口宽度相关
+    sl = visible_slice(x, x_min, x_max)
+    x = x[sl]
+    y = y[sl]
+    n_columns = max(int(n_columns), 1)
+    if len(y) <= 2 * n_columns:
+        return x, y
+    edges = np.linspace(0, len(y), n_columns + 1).astype(np.intp)[:-1]
+    out_x = np.repeat(x[edges], 2)
+    out_y = np.empty(2 * n_columns, dtype=y.dtype)
+    out_y[0::2] = np.minimum.reduceat(y, edges)
+    out_y[1::2] = np.maximum.reduceat(y, edges)
+    return out_x, out_y
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+STAGE_QUEUE_DEPTH = 2
+
+
+def ignore(item):
+    pass
+
+
+class LatestSlot:
+    # 单元素邮箱: 新帧覆盖未取走的旧帧, 被覆盖的帧计为丢帧并交给 release; 读写都不阻塞
+    def __init__(self, release=ignore):
+        self.release = release
+        self.lock = threading.Lock()
+        self.item = None
+        self.published = 0
+        self.taken = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self.lock:
+            dropped, self.item = self.item, item
+            if dropped is not None:
+                self.dropped += 1
+            self.published += 1
+        if dropped is not None:
+            self.release(dropped)
+
+    def take(self):
+        with self.lock:
+            item, self.item = self.item, None
+            if item is not None:
+                self.taken += 1
+            return item
+
+    def clear(self):
+        with self.lock:
+            item, self.item = self.item, None
+        if item is not None:
+            self.release(item)
+
+
+class Stage:
+    def __init__(self, name, func, release=ignore):
+        self.name = name
+        self.func = func
+        self.release = release
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0.0
+
+    def __call__(self, item):
+        t0 = time.perf_counter()
+        try:
+            item = self.func(item)
+        except Exception as e:
+            self.errors += 1
+            print(f"{self.name}阶段错误: {e}")
+            self.release(item)
+            item = None
+        self.busy += time.perf_counter() - t0
+        self.processed += 1
+        return item
+
+
+class SweepPipeline:
+    # 生成 → 各处理阶段 → 最新帧邮箱; 阶段之间是有界队列, 下游跟不上时上游在 put 处阻塞 (背压),
+    # 末端邮箱只保留最新一帧, 渲染端慢时丢弃旧帧而不是堆积. 流水线中途丢弃的帧 (覆盖 / 清空 / 出错 / 停止) 都交给 release,
+    # 以便归还帧所持有的缓冲
+    def __init__(self, source, stages, depth=STAGE_QUEUE_DEPTH, interval=0.0, release=ignore):
+        self.release = release
+        self.source = Stage("生成", lambda _: source(), release)
+        self.stages = [Stage(name, func, release) for name, func in stages]
+        self.queues = [queue.Queue(maxsize=depth) for _ in self.stages]
+        self.latest = LatestSlot(release)
+        self.interval = interval
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.threads = [threading.Thread(target=self.run_source, daemon=True)]
+        for i in range(len(self.stages)):
+            self.threads.append(threading.Thread(target=self.run_stage, args=(i,), daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def put(self, i, item):
+        # 带超时重试的阻塞 put, 以便 stop() 时能退出
+        target = self.queues[i] if i < len(self.queues) else None
+        if target is None:
+            self.latest.put(item)
+            return
+        while self.running:
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        self.release(item)
+
+    def run_source(self):
+        while self.running:
+            item = self.source(None)
+            if item is not None:
+                self.put(0, item)
+            time.sleep(self.interval if item is not None else max(self.interval, 0.02))
+
+    def run_stage(self, i):
+        stage = self.stages[i]
+        while self.running:
+            try:
+                item = self.queues[i].get(timeout=0.1)
+            except queue.Empty:
+                continue
+            item = stage(item)
+            if item is not None:
+                self.put(i + 1, item)
+
+    def run_once(self):
+        # 不启动线程, 在调用线程内把一帧走完整条流水线
+        item = self.source(None)
+        for stage in self.stages:
+            if item is None:
+                return None
+            item = stage(item)
+        if item is not None:
+            self.latest.put(item)
+        return item
+
+    def flush(self):
+        for q in self.queues:
+            while True:
+                try:
+                    self.release(q.get_nowait())
+                except queue.Empty:
+                    break
+        self.latest.clear()
+
+    def depths(self):
+        return [(stage.name, q.qsize(), q.maxsize) for stage, q in zip(self.stages, self.queues)]
+
+    def status_text(self):
+        queues = " ".join(f"{name} {size}/{maxsize}" for name, size, maxsize in self.depths())
+        return f"队列: {queues} | 渲染 {self.latest.taken} | 丢帧 {self.latest.dropped}"
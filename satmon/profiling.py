@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+
+import numpy as np
+
+PROFILE_WINDOW = 512
+PERCENTILES = (50, 90, 99)
+
+
+class StageProfiler:
+    # 各阶段耗时的滚动窗口: 每个阶段一个定长环形数组, 记录只是一次数组写入, 百分位在查看时才计算.
+    # 每个阶段只由一个线程写入, 读取端拿到的是近似快照
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, name, seconds):
+        ring = self.samples.get(name)
+        if ring is None:
+            with self.lock:
+                ring = self.samples.setdefault(name, np.zeros(self.window))
+                self.counts.setdefault(name, 0)
+        count = self.counts[name]
+        ring[count % self.window] = seconds
+        self.counts[name] = count + 1
+
+    def lap(self, name, t0):
+        # 记录 t0 至今的耗时并返回当前时刻, 便于串联相邻阶段
+        now = time.perf_counter()
+        self.record(name, now - t0)
+        return now
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}
+            self.counts = {}
+
+    def stats(self):
+        result = {}
+        for name, ring in list(self.samples.items()):
+            count = self.counts[name]
+            data = ring[:min(count, self.window)] * 1000
+            if not len(data):
+                continue
+            p = np.percentile(data, PERCENTILES)
+            result[name] = {"count": count, "mean_ms": float(data.mean()), "max_ms": float(data.max()),
+                            **{f"p{q}_ms": float(v) for q, v in zip(PERCENTILES, p)}}
+        return result
+
+    def status_text(self, names=None):
+        stats = self.stats()
+        parts = [f"{name} {s['p50_ms']:.1f}/{s['p99_ms']:.1f}" for name, s in stats.items() if names is None or name in names]
+        return "耗时 p50/p99 (ms): " + " ".join(parts) if parts else ""
+
+    def to_json(self):
+        return json.dumps({"window": self.window, "stages": self.stats()}, ensure_ascii=False, indent=2)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
@@ -0,0 +1,64 @@
+import collections
+import time
+
+
+class FrameRateMeter:
+    def __init__(self, window=50):
+        self.stamps = collections.deque(maxlen=window)
+
+    def tick(self, now=None):
+        self.stamps.append(time.perf_counter() if now is None else now)
+        return self.fps
+
+    @property
+    def fps(self):
+        if len(self.stamps) < 2:
+            return 0.0
+        elapsed = self.stamps[-1] - self.stamps[0]
+        return (len(self.stamps) - 1) / elapsed if elapsed > 0 else 0.0
+
+
+class BlitManager:
+    # 持久化动态图元 + 缓存背景的 blit 刷新; 关闭时退化为 draw_idle
+    def __init__(self, canvas, artists=(), enabled=False):
+        self.canvas = canvas
+        self.enabled = enabled
+        self.background = None
+        self.artists = []
+        for artist in artists:
+            self.add_artist(artist)
+        self.cid = canvas.mpl_connect("draw_event", self.on_draw)
+
+    def add_artist(self, artist):
+        artist.set_animated(self.enabled)
+        self.artists.append(artist)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        for artist in self.artists:
+            artist.set_animated(enabled)
+        self.background = None
+        self.canvas.draw_idle()
+
+    def on_draw(self, event):
+        if not self.enabled:
+            return
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        figure = self.canvas.figure
+        for artist in self.artists:
+            figure.draw_artist(artist)
+
+    def update(self):
+        if not self.enabled:
+            self.canvas.draw_idle()
+            return
+        if self.background is None:
+            # 首帧或窗口尺寸变化后: 完整重绘, on_draw 会重新缓存背景
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
@@ -0,0 +1,59 @@
+import time
+
+PLAYBACK_SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+
+class CapturePlayer:
+    # 以采集时间轴驱动回放: 播放/暂停/拖动/变速都只是重新锚定 (采集时间, 墙钟时间)
+    def __init__(self, reader, clock=time.monotonic):
+        self.reader = reader
+        self.clock = clock
+        self.speed = 1.0
+        self.playing = False
+        self.last_index = -1
+        self.anchor_time = reader.start_time
+        self.anchor_clock = clock()
+
+    @property
+    def duration(self):
+        return self.reader.end_time - self.reader.start_time
+
+    def current_time(self):
+        if not self.playing:
+            return self.anchor_time
+        return self.anchor_time + (self.clock() - self.anchor_clock) * self.speed
+
+    def reanchor(self, timestamp):
+        self.anchor_time = min(max(timestamp, self.reader.start_time), self.reader.end_time)
+        self.anchor_clock = self.clock()
+
+    def play(self):
+        if self.current_time() >= self.reader.end_time:
+            self.reanchor(self.reader.start_time)
+        else:
+            self.reanchor(self.current_time())
+        self.playing = True
+
+    def pause(self):
+        self.reanchor(self.current_time())
+        self.playing = False
+
+    def set_speed(self, speed):
+        self.reanchor(self.current_time())
+        self.speed = speed
+
+    def seek(self, timestamp):
+        self.reanchor(timestamp)
+        self.last_index = -1
+
+    def next_index(self):
+        # 返回应显示的记录序号; 与上次相同则返回 None
+        timestamp = self.current_time()
+        if self.playing and timestamp >= self.reader.end_time:
+            self.reanchor(self.reader.end_time)
+            self.playing = False
+        i = self.reader.index_at(timestamp)
+        if i == self.last_index:
+            return None
+        self.last_index = i
+        return i
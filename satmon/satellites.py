@@ -0,0 +1,71 @@
+CHINASAT_SATELLITES = [
+    {
+        "name": "中星6A",
+        "position": "125.0°E",
+        "bands": [
+            {"name": "C波段下行", "min": 3700, "max": 4200, "center": 3950, "unit": "MHz", "noise_floor": -110}
+        ],
+        "cover": "中国、亚太地区",
+        "carriers": [
+            {"freq": 3920, "bw": 36, "power": -42, "name": "电视转发", "modulation": "DVB-S"},
+            {"freq": 4015, "bw": 27, "power": -46, "name": "数据", "modulation": "QPSK"}
+        ]
+    },
+    {
+        "name": "中星9号",
+        "position": "92.2°E",
+        "bands": [
+            {"name": "Ku波段下行", "min": 12250, "max": 12750, "center": 12500, "unit": "MHz", "noise_floor": -110}
+        ],
+        "cover": "中国全境及周边",
+        "carriers": [
+            {"freq": 12380, "bw": 36, "power": -44, "name": "直播星", "modulation": "QPSK"}
+        ]
+    },
+    {
+        "name": "中星10号",
+        "position": "110.5°E",
+        "bands": [
+            {"name": "C波段下行", "min": 3700, "max": 4200, "center": 3950, "unit": "MHz", "noise_floor": -110}
+        ],
+        "cover": "中国全境、东南亚",
+        "carriers": [
+            {"freq": 3850, "bw": 36, "power": -45, "name": "电视传输", "modulation": "DVB-S2"},
+            {"freq": 3950, "bw": 54, "power": -40, "name": "数据链路", "modulation": "8PSK"},
+            {"freq": 4050, "bw": 27, "power": -50, "name": "通信系统", "modulation": "QPSK"}
+        ]
+    },
+    {
+        "name": "中星16号",
+        "position": "110.5°E",
+        "bands": [
+            {"name": "Ka波段下行", "min": 19500, "max": 20200, "center": 19850, "unit": "MHz", "noise_floor": -110}
+        ],
+        "cover": "中国全境、重点覆盖东部",
+        "carriers": [
+            {"freq": 19800, "bw": 250, "power": -30, "name": "宽带互联网", "modulation": "QAM"}
+        ]
+    },
+    {
+        "name": "中星6C",
+        "position": "130.0°E",
+        "bands": [
+            {"name": "C波段下行", "min": 3700, "max": 4200, "center": 3950, "unit": "MHz", "noise_floor": -110}
+        ],
+        "cover": "中国及周边",
+        "carriers": [
+            {"freq": 4000, "bw": 36, "power": -43, "name": "电视", "modulation": "DVB-S2"}
+        ]
+    },
+    {
+        "name": "中星9B",
+        "position": "101.4°E",
+        "bands": [
+            {"name": "Ku波段下行", "min": 12200, "max": 12700, "center": 12450, "unit": "MHz", "noise_floor": -110}
+        ],
+        "cover": "中国全境",
+        "carriers": [
+            {"freq": 12400, "bw": 54, "power": -46, "name": "直播星", "modulation": "QPSK"}
+        ]
+    }
+]
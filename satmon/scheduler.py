@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from satmon.catalog import Catalog
+from satmon.engine import SpectrumEngine
+from satmon.workspace import BufferPool, release, retain
+
+REVISIT_S = 0.5
+DEFAULT_PRIORITY = 0
+
+
+class BandTask:
+    # 一个 (卫星, 频段) 的调度项; 引擎自带该频段的保持/平均/检测/门限状态
+    def __init__(self, key, engine, interval, priority):
+        self.key = key
+        self.engine = engine
+        self.interval = interval
+        self.priority = priority
+        self.due = 0.0
+        self.running = False
+        self.sweeps = 0
+        self.busy = 0.0
+        self.late = 0.0
+        self.errors = 0
+        self.last = None
+
+
+class BandScheduler:
+    # 多频段并发扫描: 每个 (卫星, 频段) 一个独立引擎, 在线程池上按重访周期与优先级派发.
+    # 扫描的主要耗时 (噪声填充 / FFT / 卷积 / 递推滤波) 都在释放 GIL 的 numpy / scipy 内, 线程可在多核上并行;
+    # 只有一个线程时直接在调度线程内扫描. 各频段引擎共用一个缓冲空闲表.
+    # 同一频段同时最多一个扫描在执行; 多个频段到期时优先级高者先, 同优先级到期早者先.
+    # 扫描参数 (RB/VB/点数/平均/检测等) 在每次派发前从 follow() 指定的模板引擎复制
+    def __init__(self, satellites, workers=None, interval=REVISIT_S, priority=DEFAULT_PRIORITY, seed=None, on_sweep=None):
+        # 各频段引擎共用同一目录及其区间索引
+        self.catalog = Catalog.from_satellites(satellites)
+        self.satellites = self.catalog.satellites
+        self.workers = workers or os.cpu_count() or 1
+        self.on_sweep = on_sweep
+        self.source = None
+        keys = [(s, b) for s, sat in enumerate(self.satellites) for b in range(len(sat["bands"]))]
+        seeds = np.random.SeedSequence(seed).spawn(len(keys))
+        self.pool = BufferPool()
+        self.tasks = {key: BandTask(key, SpectrumEngine(self.catalog, *key, seed=ss, pool=self.pool), interval, priority)
+                      for key, ss in zip(keys, seeds)}
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.dispatched = 0
+        self.budget = None   # 派发总次数上限, None 表示不限
+        self.running = False
+        self.executor = None
+        self.thread = None
+        self.started = None
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def engine(self, key):
+        return self.tasks[key].engine
+
+    def last(self, key):
+        # 切换查看频段时直接取该频段最近一次扫描, 不必等待重新扫描; 返回的一帧已为调用方持有, 用完 release()
+        task = self.tasks.get(key)
+        if task is None:
+            return None
+        with self.cond:
+            return retain(task.last)
+
+    def follow(self, engine):
+        self.source = engine
+
+    def configure(self, key, interval=None, priority=None):
+        task = self.tasks[key]
+        with self.cond:
+            if interval is not None:
+                if interval < 0:
+                    raise ValueError("重访周期不能为负")
+                task.interval = float(interval)
+                task.due = min(task.due, time.monotonic() + task.interval)
+            if priority is not None:
+                task.priority = int(priority)
+            self.cond.notify()
+
+    def reset_holds(self, key=None):
+        for task in self.tasks.values() if key is None else (self.tasks[key],):
+            task.engine.reset_holds()
+
+    def sync(self, task):
+        # 只在该频段没有扫描执行时调用
+        source, engine = self.source, task.engine
+        if source is None:
+            return
+        # 模板引擎可能正被界面 / SCPI 线程修改, 在其锁内复制一份一致的参数
+        with source.lock:
+            # 模板引擎热加载了目录时跟随; 该频段的卫星已从目录中删除则继续使用旧目录
+            if source.catalog is not engine.catalog and engine.selected_sat["name"] in source.catalog.sat_index:
+                engine.set_catalog(source.catalog)
+            engine.rb, engine.vb = source.rb, source.vb
+            if engine.psd_mode != source.psd_mode:
+                engine.set_psd_mode(source.psd_mode)
+            engine.sweep_points = source.sweep_points
+            if (engine.averager.count, engine.averager.mode, engine.averager.scale) != (source.averager.count, source.averager.mode, source.averager.scale):
+                engine.configure_averaging(source.averager.count, source.averager.mode, source.averager.scale)
+            engine.avg_enabled = source.avg_enabled
+            engine.peak_search_enabled = source.peak_search_enabled
+            engine.detect_enabled = source.detect_enabled
+            engine.limits_enabled = source.limits_enabled
+            engine.limits.configure(source.limits.mask.margin_db, source.limits.mask.tolerance_db,
+                                    source.limits.mask.hysteresis_db, source.limits.debounce)
+            # 扫描跨度只跟随当前查看的频段
+            if task.key == (source.selected_sat_idx, source.selected_band_idx):
+                engine.set_span(*(source.span or ()))
+
+    def check_catalog(self):
+        # 调度时模板引擎自身不扫描, 由持有模板引擎的线程 (界面 / 命令行主线程) 定期调用代为检查目录文件;
+        # 不在调度线程中调用, 以免与该线程对模板引擎的修改并发
+        if self.source is not None:
+            self.source.check_catalog()
+
+    def due_tasks(self, now):
+        ready = [task for task in self.tasks.values() if not task.running and task.due <= now]
+        ready.sort(key=lambda task: (-task.priority, task.due))
+        return ready
+
+    def next_due(self):
+        pending = [task.due for task in self.tasks.values() if not task.running]
+        return min(pending) if pending else None
+
+    def dispatch(self, task, now):
+        self.sync(task)
+        task.running = True
+        if task.due:
+            task.late += now - task.due
+        # 按固定节拍排下一次; 落后超过一个周期时不补扫, 从本次开始重新计时
+        next_due = task.due + task.interval
+        task.due = next_due if next_due > now else now + task.interval
+        self.in_flight += 1
+        self.dispatched += 1
+
+    def execute(self, task):
+        # 各频段最近一帧由 task.last 持有, 被下一帧替换时归还缓冲; on_sweep 回调期间另持有一份,
+        # 回调里要保存这一帧须自行 retain(). 返回的一帧只在下次扫描该频段前有效
+        t0 = time.perf_counter()
+        sweep = previous = None
+        failed = False
+        try:
+            sweep = task.engine.sweep()
+        except Exception as e:
+            failed = True
+            print(f"{task.engine.selected_sat['name']} 扫描错误: {e}")
+        with self.cond:
+            task.busy += time.perf_counter() - t0
+            task.running = False
+            self.in_flight -= 1
+            if failed:
+                task.errors += 1
+            if sweep is not None:
+                task.sweeps += 1
+                previous, task.last = task.last, sweep
+                if self.on_sweep is not None:
+                    retain(sweep)
+            self.cond.notify()
+        release(previous)
+        if sweep is not None and self.on_sweep is not None:
+            try:
+                self.on_sweep(task.key, sweep)
+            finally:
+                release(sweep)
+        return sweep
+
+    def run_once(self):
+        # 不启动线程, 在调用线程内按优先级扫描一轮全部已到期的频段
+        self.check_catalog()
+        now = time.monotonic()
+        with self.cond:
+            ready = self.due_tasks(now)
+            for task in ready:
+                self.dispatch(task, now)
+        return [(task.key, self.execute(task)) for task in ready]
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.started = time.monotonic()
+        if self.workers > 1:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="band")
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        with self.cond:
+            while self.running:
+                now = time.monotonic()
+                slots = self.workers - self.in_flight
+                if self.budget is not None:
+                    slots = min(slots, self.budget - self.dispatched)
+                if slots > 0:
+                    ready = self.due_tasks(now)[:slots]
+                    for task in ready:
+                        self.dispatch(task, now)
+                        if self.executor is None:
+                            # 扫描期间放开条件锁, 界面仍可取各频段最近一帧、修改重访周期
+                            self.cond.release()
+                            try:
+                                self.execute(task)
+                            finally:
+                                self.cond.acquire()
+                        else:
+                            self.executor.submit(self.execute, task)
+                    if ready:
+                        continue
+                # 线程池已满时等扫描完成的通知, 否则等到下一个频段到期
+                timeout = None
+                due = self.next_due()
+                if due is not None and slots > 0:
+                    timeout = max(due - now, 0.001)
+                self.cond.wait(timeout)
+
+    def stop(self):
+        if not self.running:
+            return
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(2.0)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        result = {}
+        for key, task in self.tasks.items():
+            result[key] = {"sweeps": task.sweeps, "rate": task.sweeps / elapsed if elapsed else 0.0,
+                           "mean_ms": task.busy / task.sweeps * 1000 if task.sweeps else 0.0,
+                           "late_ms": task.late / task.sweeps * 1000 if task.sweeps else 0.0,
+                           "errors": task.errors, "interval": task.interval, "priority": task.priority}
+        return result
+
+    def status_text(self):
+        total = sum(task.sweeps for task in self.tasks.values())
+        return f"多频段调度: {len(self.tasks)} 个频段, {self.workers} 线程, 共 {total} 次扫描"
@@ -0,0 +1,501 @@
+import asyncio
+import collections
+import inspect
+import os
+import re
+import threading
+
+import numpy as np
+
+from satmon.server import ServerThread
+from satmon.workspace import release, retain
+
+DEFAULT_PORT = 5025
+IDN = "CHINASAT,SATMON,0,1.0"
+ERROR_QUEUE_DEPTH = 32
+WRITE_HIGH_WATER = 1 << 16
+UNITS = {"HZ": 1.0, "KHZ": 1e3, "MHZ": 1e6, "GHZ": 1e9, "DBM": 1.0, "DB": 1.0, "S": 1.0, "MS": 1e-3}
+TRACES = {"TRACE1": "psd", "TRAC1": "psd", "MAXH": "max_hold", "MINH": "min_hold", "AVER": "avg"}
+
+
+class ScpiError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def compile_header(pattern):
+    # "[SENSe:]BANDwidth[:RESolution]" -> [(短形式, 长形式, 可省略), ...]
+    nodes = []
+    for optional, name in re.findall(r"(\[?):?([A-Za-z*]+)\]?", pattern):
+        short = "".join(c for c in name if c.isupper() or c == "*")
+        nodes.append((short, name.upper(), bool(optional)))
+    return nodes
+
+
+def match_header(nodes, tokens):
+    if not nodes:
+        return not tokens
+    short, long, optional = nodes[0]
+    if tokens and tokens[0] in (short, long) and match_header(nodes[1:], tokens[1:]):
+        return True
+    return optional and match_header(nodes[1:], tokens)
+
+
+def parse_number(text, unit=1.0):
+    # 数值可带单位后缀 (MHZ, KHZ ...); 不带单位时按 unit 换算
+    m = re.fullmatch(r"\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([A-Za-z]*)\s*", text)
+    if m is None:
+        raise ScpiError(-224, "Illegal parameter value")
+    suffix = m.group(2).upper()
+    if suffix and suffix not in UNITS:
+        raise ScpiError(-131, "Invalid suffix")
+    return float(m.group(1)) * (UNITS[suffix] if suffix else unit)
+
+
+def parse_bool(text):
+    value = text.strip().upper()
+    if value in ("ON", "1"):
+        return True
+    if value in ("OFF", "0"):
+        return False
+    raise ScpiError(-224, "Illegal parameter value")
+
+
+def arity(func):
+    # 处理函数可接受的参数个数范围 (必需, 最多)
+    required = maximum = 0
+    for param in inspect.signature(func).parameters.values():
+        if param.kind == param.VAR_POSITIONAL:
+            maximum = None
+        elif param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+            if maximum is not None:
+                maximum += 1
+            if param.default is param.empty:
+                required += 1
+    return required, maximum
+
+
+def block_data(payload):
+    # IEEE 488.2 定长块: #<位数><字节数><数据>
+    size = str(len(payload))
+    return b"#" + str(len(size)).encode() + size.encode() + payload
+
+
+def split_units(line):
+    # 按分号拆分多条命令, 引号内的分号不拆
+    units, current, quote = [], [], None
+    for c in line:
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == ";":
+            units.append("".join(current))
+            current = []
+            continue
+        current.append(c)
+    units.append("".join(current))
+    return [unit.strip() for unit in units if unit.strip()]
+
+
+class DisplayState:
+    # 无界面运行时的显示参数; 界面运行时由监测窗口本身提供同名属性
+    def __init__(self):
+        self.ref_level = -30.0
+        self.ylim_scale = 10.0
+
+
+class ScpiInstrument:
+    # 仿台式频谱仪的 SCPI 命令集. 引擎参数在调用线程内立即生效, 因此流水线式发送的命令按顺序可见;
+    # 卫星 / 跨度 / 点数 / 保持平均的修改由引擎自身的锁与流水线线程互斥;
+    # ui(name, value) 回调只负责在界面线程同步控件与图形 (无界面时为 None)
+    def __init__(self, engine, display=None, ui=None, export_dir="."):
+        self.engine = engine
+        # MMEMory 命令只能在此目录内写文件
+        self.export_dir = os.path.abspath(export_dir)
+        self.display = display if display is not None else DisplayState()
+        self.ui = ui
+        self.latest_lock = threading.Lock()
+        self.latest = None
+        self.sweep_count = 0
+        self.errors = collections.deque(maxlen=ERROR_QUEUE_DEPTH)
+        self.data_format = "REAL"
+        self.marker = None
+        self.commands = []
+        self.header_cache = {}
+        self.register_commands()
+
+    def update(self, sweep):
+        # 处理阶段每出一帧调用一次; 持有最新一帧直到下一帧到来
+        with self.latest_lock:
+            previous, self.latest = self.latest, retain(sweep)
+            self.sweep_count += 1
+        release(previous)
+
+    def notify(self, name, value=None):
+        if self.ui is not None:
+            self.ui(name, value)
+
+    def command(self, pattern, query=False):
+        def register(func):
+            self.commands.append((compile_header(pattern), query, (func, *arity(func))))
+            return func
+        return register
+
+    def lookup(self, header):
+        key = header.upper()
+        handler = self.header_cache.get(key)
+        if handler is None:
+            query = key.endswith("?")
+            tokens = [re.sub(r"\d+$", "", tok) for tok in key.rstrip("?").lstrip(":").split(":")]
+            for nodes, is_query, func in self.commands:
+                if is_query == query and match_header(nodes, tokens):
+                    handler = self.header_cache[key] = func
+                    break
+        return handler
+
+    def execute(self, line):
+        # 执行一行 (可含多条以分号分隔的命令), 返回应答字节串; 无查询时返回 b""
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        responses = []
+        for unit in split_units(line):
+            header, _, args = unit.partition(" ")
+            handler = self.lookup(header)
+            if handler is None:
+                self.push_error(-113, "Undefined header")
+                continue
+            func, required, maximum = handler
+            params = [arg.strip() for arg in args.split(",")] if args.strip() else []
+            if len(params) < required:
+                self.push_error(-109, "Missing parameter")
+                continue
+            if maximum is not None and len(params) > maximum:
+                self.push_error(-108, "Parameter not allowed")
+                continue
+            try:
+                result = func(*params)
+            except ScpiError as e:
+                self.push_error(e.code, str(e))
+                continue
+            except ValueError as e:
+                self.push_error(-222, f"Data out of range; {e}")
+                continue
+            except OSError as e:
+                self.push_error(-250, f"Mass storage error; {e.strerror or e}")
+                continue
+            except Exception as e:
+                # 处理函数内的其他异常只记入错误队列, 不断开连接
+                self.push_error(-200, f"Execution error; {e}")
+                continue
+            if result is not None:
+                responses.append(result if isinstance(result, bytes) else str(result).encode())
+        if not responses:
+            return b""
+        return b";".join(responses) + b"\n"
+
+    def push_error(self, code, message):
+        if len(self.errors) == self.errors.maxlen:
+            self.errors[-1] = (-350, "Queue overflow")
+            return
+        self.errors.append((code, message))
+
+    def view_range(self):
+        lo, hi = self.engine.sweep_range
+        return lo * 1e6, hi * 1e6
+
+    def set_view(self, lo, hi):
+        # 起止 / 中心 / 跨度命令直接改变引擎的扫描跨度, 与仪器一致
+        try:
+            self.engine.set_span(lo / 1e6, hi / 1e6)
+        except ValueError:
+            raise ScpiError(-222, "Data out of range")
+        self.notify("view")
+
+    def export_path(self, name):
+        # 只接受导出目录内的文件名: 拒绝绝对路径与 "..", 其余目录部分一律去掉
+        name = name.strip().strip("\"'")
+        parts = re.split(r"[\\/]", name)
+        if not name or os.path.isabs(name) or re.match(r"^[A-Za-z]:", name) or ".." in parts:
+            raise ScpiError(-257, "File name error")
+        base = parts[-1]
+        if not base or base in (".", ".."):
+            raise ScpiError(-257, "File name error")
+        return os.path.join(self.export_dir, base)
+
+    def trace(self, name="TRACE1"):
+        # 持有期间复制所需区段, 返回后最新一帧的缓冲可被归还复用
+        field = TRACES.get(name.strip().upper())
+        if field is None:
+            raise ScpiError(-224, "Illegal parameter value")
+        with self.latest_lock:
+            sweep = retain(self.latest)
+        try:
+            if sweep is None or getattr(sweep, field) is None:
+                raise ScpiError(-230, "Data corrupt or stale")
+            lo, hi = self.view_range()
+            sl = slice(*np.searchsorted(sweep.freq, (lo / 1e6, hi / 1e6 + 1e-9)))
+            if sl.stop <= sl.start:
+                raise ScpiError(-230, "Data corrupt or stale")
+            return sweep.freq[sl].copy(), getattr(sweep, field)[sl].copy()
+        finally:
+            release(sweep)
+
+    def register_commands(self):
+        engine, display = self.engine, self.display
+        command = self.command
+
+        @command("*IDN", query=True)
+        def idn():
+            return IDN
+
+        @command("*RST")
+        def reset():
+            # 复位作为一个整体生效, 流水线不会处理到复位一半的参数
+            with engine.lock:
+                engine.rb, engine.vb = 1000.0, 100.0
+                engine.peak_search_enabled = False
+                engine.avg_enabled = False
+                engine.set_span()
+                engine.reset_holds()
+            display.ref_level, display.ylim_scale = -30.0, 10.0
+            self.marker = None
+            self.notify("reset")
+
+        @command("*CLS")
+        def clear_status():
+            self.errors.clear()
+
+        @command("*OPC", query=True)
+        def operation_complete():
+            return "1"
+
+        @command("SYSTem:ERRor[:NEXT]", query=True)
+        def next_error():
+            code, message = self.errors.popleft() if self.errors else (0, "No error")
+            return f'{code},"{message}"'
+
+        @command("[SENSe:]FREQuency:CENTer", query=True)
+        def center_query():
+            lo, hi = self.view_range()
+            return f"{(lo + hi) / 2:.6e}"
+
+        @command("[SENSe:]FREQuency:CENTer")
+        def center(value):
+            lo, hi = self.view_range()
+            c = parse_number(value)
+            self.set_view(c - (hi - lo) / 2, c + (hi - lo) / 2)
+
+        @command("[SENSe:]FREQuency:SPAN", query=True)
+        def span_query():
+            lo, hi = self.view_range()
+            return f"{hi - lo:.6e}"
+
+        @command("[SENSe:]FREQuency:SPAN")
+        def span(value):
+            lo, hi = self.view_range()
+            s = parse_number(value)
+            self.set_view((lo + hi) / 2 - s / 2, (lo + hi) / 2 + s / 2)
+
+        @command("[SENSe:]FREQuency:STARt", query=True)
+        def start_query():
+            return f"{self.view_range()[0]:.6e}"
+
+        @command("[SENSe:]FREQuency:STARt")
+        def start(value):
+            self.set_view(parse_number(value), self.view_range()[1])
+
+        @command("[SENSe:]FREQuency:STOP", query=True)
+        def stop_query():
+            return f"{self.view_range()[1]:.6e}"
+
+        @command("[SENSe:]FREQuency:STOP")
+        def stop(value):
+            self.set_view(self.view_range()[0], parse_number(value))
+
+        @command("[SENSe:]BANDwidth[:RESolution]", query=True)
+        def rbw_query():
+            return f"{engine.rb:g}"
+
+        @command("[SENSe:]BANDwidth[:RESolution]")
+        def rbw(value):
+            engine.rb = float(np.clip(parse_number(value), 1, 40000))
+            self.notify("rb", engine.rb)
+
+        @command("[SENSe:]BANDwidth:VIDeo", query=True)
+        def vbw_query():
+            return f"{engine.vb:g}"
+
+        @command("[SENSe:]BANDwidth:VIDeo")
+        def vbw(value):
+            engine.vb = float(np.clip(parse_number(value), 1, 400))
+            self.notify("vb", engine.vb)
+
+        @command("[SENSe:]SWEep:POINts", query=True)
+        def points_query():
+            return str(engine.sweep_points)
+
+        @command("[SENSe:]SWEep:POINts")
+        def points(value):
+            engine.set_sweep_points(int(parse_number(value)))
+            self.notify("points", engine.sweep_points)
+
+        @command("[SENSe:]SWEep:TIME", query=True)
+        def sweep_time_query():
+            # 按当前跨度 / RBW / VBW / 点数估算的仪表扫描时间 (秒)
+            return f"{engine.sweep_time():.6g}"
+
+        @command("[SENSe:]SWEep:COUNt", query=True)
+        def sweep_count():
+            return str(self.sweep_count)
+
+        @command("[SENSe:]AVERage[:STATe]", query=True)
+        def average_query():
+            return "1" if engine.avg_enabled else "0"
+
+        @command("[SENSe:]AVERage[:STATe]")
+        def average(value):
+            engine.avg_enabled = parse_bool(value)
+
+        @command("[SENSe:]AVERage:COUNt", query=True)
+        def average_count_query():
+            return str(engine.avg_count)
+
+        @command("[SENSe:]AVERage:COUNt")
+        def average_count(value):
+            engine.configure_averaging(count=int(parse_number(value)))
+
+        @command("SATellite[:SELect]", query=True)
+        def satellite_query():
+            return f'"{engine.selected_sat["name"]}"'
+
+        @command("SATellite[:SELect]")
+        def satellite(value):
+            name = value.strip().strip("\"'")
+            if name in engine.catalog.sat_index:
+                idx = engine.catalog.sat_index[name]
+            elif name.isdigit() and int(name) < len(engine.sat_names):
+                idx = int(name)
+            else:
+                raise ScpiError(-224, "Illegal parameter value")
+            engine.select_satellite(idx)
+            self.notify("satellite", idx)
+
+        @command("DISPlay[:WINDow]:TRACe:Y[:SCALe]:RLEVel", query=True)
+        def ref_level_query():
+            return f"{display.ref_level:g}"
+
+        @command("DISPlay[:WINDow]:TRACe:Y[:SCALe]:RLEVel")
+        def ref_level(value):
+            display.ref_level = parse_number(value)
+            self.notify("ref_level", display.ref_level)
+
+        @command("DISPlay[:WINDow]:TRACe:Y[:SCALe]:PDIVision", query=True)
+        def scale_query():
+            return f"{display.ylim_scale:g}"
+
+        @command("DISPlay[:WINDow]:TRACe:Y[:SCALe]:PDIVision")
+        def scale(value):
+            value = parse_number(value)
+            if value <= 0:
+                raise ScpiError(-222, "Data out of range")
+            display.ylim_scale = value
+            self.notify("ylim_scale", value)
+
+        @command("FORMat[:DATA]", query=True)
+        def format_query():
+            return "REAL,32" if self.data_format == "REAL" else "ASC,8"
+
+        @command("FORMat[:DATA]")
+        def data_format(kind, length=None):
+            kind = kind.upper()
+            if kind.startswith("REAL"):
+                self.data_format = "REAL"
+            elif kind.startswith("ASC"):
+                self.data_format = "ASC"
+            else:
+                raise ScpiError(-224, "Illegal parameter value")
+
+        @command("TRACe[:DATA]", query=True)
+        def trace_data(name="TRACE1"):
+            _, values = self.trace(name)
+            if self.data_format == "REAL":
+                return block_data(np.asarray(values, dtype="<f4").tobytes())
+            return ",".join(f"{v:.2f}" for v in values)
+
+        @command("TRACe:X", query=True)
+        def trace_x(name="TRACE1"):
+            freq, _ = self.trace(name)
+            if self.data_format == "REAL":
+                return block_data(np.asarray(freq * 1e6, dtype="<f8").tobytes())
+            return ",".join(f"{f * 1e6:.1f}" for f in freq)
+
+        @command("TRACe:HOLD")
+        def trace_hold():
+            self.notify("hold")
+
+        @command("CALCulate:MARKer:MAXimum[:PEAK]")
+        def marker_max():
+            freq, values = self.trace()
+            i = int(np.argmax(values))
+            self.marker = (float(freq[i]), float(values[i]))
+            self.notify("marker", self.marker[0])
+
+        @command("CALCulate:MARKer:X", query=True)
+        def marker_x():
+            if self.marker is None:
+                raise ScpiError(-221, "Settings conflict; no marker")
+            return f"{self.marker[0] * 1e6:.6e}"
+
+        @command("CALCulate:MARKer:Y", query=True)
+        def marker_y():
+            if self.marker is None:
+                raise ScpiError(-221, "Settings conflict; no marker")
+            return f"{self.marker[1]:.2f}"
+
+        @command("CALCulate:MARKer:PEAK[:STATe]", query=True)
+        def peak_search_query():
+            return "1" if engine.peak_search_enabled else "0"
+
+        @command("CALCulate:MARKer:PEAK[:STATe]")
+        def peak_search(value):
+            engine.peak_search_enabled = parse_bool(value)
+            self.notify("peak", engine.peak_search_enabled)
+
+        @command("MMEMory:STORe:TRACe")
+        def store_trace(path, name="TRACE1"):
+            path = self.export_path(path)
+            freq, values = self.trace(name)
+            np.savetxt(path, np.column_stack((freq, values)), delimiter=",", fmt="%.6f",
+                       header="Frequency_MHz,PSD_dBm", comments="")
+
+
+class ScpiServer(ServerThread):
+    # SCPI 原始套接字服务 (惯用端口 5025): 按行读取, 客户端可连续发送大量命令不等应答 (流水线),
+    # 应答按顺序写回, 只有发送缓冲积压时才等待 drain
+    def __init__(self, instrument, host="127.0.0.1", port=DEFAULT_PORT):
+        super().__init__(host, port, self.handle_client)
+        self.instrument = instrument
+        self.clients = 0
+        self.commands = 0
+
+    async def handle_client(self, reader, writer):
+        self.clients += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.commands += 1
+                response = self.instrument.execute(line)
+                if response:
+                    writer.write(response)
+                    if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                        await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
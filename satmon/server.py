@@ -0,0 +1,249 @@
+import asyncio
+import base64
+import hashlib
+import struct
+import threading
+
+import numpy as np
+
+from satmon.workspace import release, retain
+
+DEFAULT_PORT = 8765
+CLIENT_QUEUE_DEPTH = 8
+# 每个客户端排队待发的字节上限: 大点数的全分辨率帧按字节而不只按帧数限长, 客户端多时内存也有界
+CLIENT_QUEUE_BYTES = 8 << 20
+# 扫描帧: 魔数, 版本, 标志, 时间戳, 卫星, 频段, RB, VB, 起止频率(MHz), 点数; 其后为 float32 功率谱 (dBm)
+FRAME_MAGIC = b"SWP1"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<4sHHdiiffddI")
+FLAG_DECIMATED = 1
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def decimate_max(psd, n_points):
+    # 每个输出点取所覆盖频点的最大值, 窄载波不会在抽取后丢失
+    if n_points <= 0 or n_points >= len(psd):
+        return psd
+    edges = np.linspace(0, len(psd), n_points + 1).astype(np.intp)[:-1]
+    return np.maximum.reduceat(psd, edges)
+
+
+def parse_points(text):
+    # 客户端请求的抽取点数, 0 表示不抽取; 负数或非整数抛 ValueError
+    n_points = int(text)
+    if n_points < 0:
+        raise ValueError(f"点数不能为负: {n_points}")
+    return n_points
+
+
+def encode_frame(sweep, n_points=0):
+    psd = decimate_max(sweep.psd, n_points)
+    flags = FLAG_DECIMATED if len(psd) != len(sweep.psd) else 0
+    header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, flags, sweep.timestamp, sweep.sat_idx, sweep.band_idx,
+                               sweep.rb, sweep.vb, sweep.freq[0], sweep.freq[-1], len(psd))
+    return header + np.asarray(psd, dtype="<f4").tobytes()
+
+
+def decode_frame(data):
+    magic, version, flags, timestamp, sat, band, rb, vb, freq_min, freq_max, n_points = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError("不是扫描帧")
+    psd = np.frombuffer(data, dtype="<f4", count=n_points, offset=FRAME_HEADER.size)
+    return {"timestamp": timestamp, "sat": sat, "band": band, "rb": rb, "vb": vb,
+            "freq_min": freq_min, "freq_max": freq_max, "flags": flags}, psd
+
+
+def websocket_header(n_bytes, opcode=0x2):
+    # 服务端发出的帧不加掩码
+    if n_bytes < 126:
+        return struct.pack("!BB", 0x80 | opcode, n_bytes)
+    if n_bytes < 1 << 16:
+        return struct.pack("!BBH", 0x80 | opcode, 126, n_bytes)
+    return struct.pack("!BBQ", 0x80 | opcode, 127, n_bytes)
+
+
+class Subscriber:
+    def __init__(self, writer, n_points=0, websocket=False, depth=CLIENT_QUEUE_DEPTH, max_bytes=CLIENT_QUEUE_BYTES):
+        self.writer = writer
+        self.n_points = n_points
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=depth)
+        self.max_bytes = max_bytes
+        self.queued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.peer = writer.get_extra_info("peername")
+
+    def offer(self, data):
+        # 在事件循环线程内调用且从不等待: 超过帧数或字节上限时丢弃最旧的帧 (最新一帧总能入队),
+        # 慢客户端只会落后, 不会拖住其他客户端或发布端
+        while not self.queue.empty() and (self.queue.full() or self.queued + len(data) > self.max_bytes):
+            self.queued -= len(self.queue.get_nowait())
+            self.dropped += 1
+        self.queue.put_nowait(data)
+        self.queued += len(data)
+
+
+class ServerThread:
+    # 在独立线程中运行 asyncio TCP 服务; handler(reader, writer) 为每个连接的协程
+    def __init__(self, host, port, handler):
+        self.host = host
+        self.port = port
+        self.handler = handler
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.ready.wait(5.0)
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.handler, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        self.loop.run_forever()
+        # 退出前取消所有客户端任务并等其收尾, 再关闭监听与事件循环
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def stop(self):
+        if self.loop is None or self.error is not None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(2.0)
+
+
+class SweepServer(ServerThread):
+    # 局域网扫描推送: 同一端口同时接受原始 TCP (客户端先发一行 "SUB [点数]") 与 WebSocket (GET /?points=N).
+    # publish() 可在任意线程调用; 每次扫描对每种抽取点数只编码一次. 每个客户端一个有界发送队列与发送协程,
+    # 分发只把编码好的帧放入各队列, 写套接字与等待 drain 都在各自的发送协程内
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, depth=CLIENT_QUEUE_DEPTH, queue_bytes=CLIENT_QUEUE_BYTES):
+        super().__init__(host, port, self.handle_client)
+        self.depth = depth
+        self.queue_bytes = queue_bytes
+        self.subscribers = set()
+        self.published = 0
+
+    def publish(self, sweep):
+        # 编码在事件循环线程进行, 其间持有这一帧
+        if self.loop is not None and self.subscribers:
+            try:
+                self.loop.call_soon_threadsafe(self.broadcast, retain(sweep))
+            except RuntimeError:
+                release(sweep)
+
+    def broadcast(self, sweep):
+        self.published += 1
+        encoded = {}
+        try:
+            for sub in self.subscribers:
+                data = encoded.get(sub.n_points)
+                if data is None:
+                    data = encoded[sub.n_points] = encode_frame(sweep, sub.n_points)
+                sub.offer(data)
+        finally:
+            release(sweep)
+
+    async def handle_client(self, reader, writer):
+        try:
+            line = await asyncio.wait_for(reader.readline(), 10.0)
+            if line.startswith(b"GET "):
+                sub = await self.accept_websocket(line, reader, writer)
+            elif line.upper().startswith(b"SUB"):
+                parts = line.split()
+                sub = Subscriber(writer, parse_points(parts[1]) if len(parts) > 1 else 0, depth=self.depth, max_bytes=self.queue_bytes)
+            else:
+                writer.close()
+                return
+        except (asyncio.TimeoutError, asyncio.CancelledError, ValueError, ConnectionError):
+            writer.close()
+            return
+        if sub is None:
+            return
+        self.subscribers.add(sub)
+        sender = asyncio.ensure_future(self.send_loop(sub))
+        receiver = asyncio.ensure_future(self.drain_input(sub, reader))
+        try:
+            # 任一方向结束 (写失败或对端关闭) 即注销该客户端
+            await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # 服务停止时被取消; 正常返回, 避免 asyncio 在连接回调里报告未取回的异常
+            pass
+        finally:
+            self.subscribers.discard(sub)
+            sender.cancel()
+            receiver.cancel()
+            writer.close()
+
+    async def send_loop(self, sub):
+        try:
+            while True:
+                data = await sub.queue.get()
+                sub.queued -= len(data)
+                if sub.websocket:
+                    sub.writer.write(websocket_header(len(data)))
+                sub.writer.write(data)
+                await sub.writer.drain()
+                sub.sent += 1
+        except ConnectionError:
+            pass
+
+    async def drain_input(self, sub, reader):
+        # 读取并丢弃客户端输入, 收到 EOF 或 WebSocket 关闭帧时返回
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data or (sub.websocket and data[0] & 0x0F == 0x8):
+                    return
+        except ConnectionError:
+            pass
+
+    async def accept_websocket(self, request_line, reader, writer):
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), 10.0)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        path = request_line.split()[1].decode("latin-1")
+        n_points = 0
+        try:
+            if "points=" in path:
+                n_points = parse_points(path.split("points=")[1].split("&")[0])
+        except ValueError:
+            key = None
+        if key is None:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+            writer.close()
+            return None
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        return Subscriber(writer, n_points, websocket=True, depth=self.depth, max_bytes=self.queue_bytes)
+
+    def stats(self):
+        subscribers = list(self.subscribers)
+        return {"clients": len(subscribers), "published": self.published,
+                "sent": sum(sub.sent for sub in subscribers),
+                "dropped": sum(sub.dropped for sub in subscribers)}
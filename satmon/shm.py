@@ -0,0 +1,432 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from satmon.catalog import Catalog
+from satmon.engine import Sweep, SpectrumEngine
+from satmon.profiling import StageProfiler
+from satmon.sweeptime import FIXED_PERIOD_S, FrameClock
+from satmon.workspace import Lease
+
+# 界面一侧同时持有的扫描帧数上限: 流水线各级队列与阶段 (8) + 正在显示 + SCPI 最新一帧;
+# 达到上限时不再取新帧, 直到有帧被释放
+READER_HOLD = 10
+TRACES = ("psd", "max_hold", "min_hold", "avg")
+ALIGN = 64
+HEADER_DTYPE = np.dtype([
+    ("seq", "<i8"),        # 已写完的扫描数, 即最新一帧的序号
+    ("latest", "<i8"),     # 最新一帧所在槽位
+    ("pinned", "<u8"),     # 读端仍持有的槽位 (位掩码), 写端不会覆盖
+    ("capacity", "<i8"),
+    ("slots", "<i8"),
+])
+SLOT_DTYPE = np.dtype([
+    ("seq", "<i8"),        # -1 表示正在写入
+    ("timestamp", "<f8"),
+    ("sat", "<i4"),
+    ("band", "<i4"),
+    ("rb", "<f8"),
+    ("vb", "<f8"),
+    ("n_points", "<i8"),
+    ("freq_min", "<f8"),
+    ("freq_max", "<f8"),
+    ("has_avg", "?"),
+    ("has_peak", "?"),
+    ("peak_freq", "<f8"),
+    ("peak_val", "<f8"),
+    ("has_extras", "?"),   # 检测 / 门限结果随后经管道送达
+])
+# 控制消息里可直接转发的引擎属性
+FORWARDED = ("rb", "vb", "avg_enabled", "peak_search_enabled", "detect_enabled", "limits_enabled")
+STATS_INTERVAL_S = 1.0
+EXTRAS_KEPT = 8
+EXTRAS_WAIT_S = 0.05
+
+
+def aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+class SweepRing:
+    # 共享内存扫描环: 头部 + 每槽元数据 + (槽位, 曲线, 点数) float32 数据. 写端逐槽轮换, 跳过最新槽与读端持有的槽;
+    # 读端直接在共享内存上建数组视图 (零拷贝), 读到的槽位一直持有到 unpin() (即该帧的所有使用者都已释放).
+    # 读端至多同时持有 hold 个槽位, n_slots = hold + 2 保证写端总有空槽.
+    # 写端选槽/发布与读端取槽/持有都在与引擎进程共享的锁内进行; 数据拷贝与读取视图在锁外
+    def __init__(self, shm, n_slots, capacity, owner, hold=READER_HOLD, lock=None):
+        self.shm = shm
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+        self.owner = owner
+        self.n_slots = n_slots
+        self.capacity = capacity
+        self.hold = hold
+        self.pins = []
+        buf = shm.buf
+        offset = aligned(HEADER_DTYPE.itemsize)
+        self.header = np.ndarray(1, HEADER_DTYPE, buf, 0)[0]
+        self.meta = np.ndarray(n_slots, SLOT_DTYPE, buf, offset)
+        offset += aligned(SLOT_DTYPE.itemsize * n_slots)
+        self.data = np.ndarray((n_slots, len(TRACES), capacity), np.float32, buf, offset)
+        self.grid_key = None
+        self.grid = None
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @staticmethod
+    def nbytes(n_slots, capacity):
+        return aligned(HEADER_DTYPE.itemsize) + aligned(SLOT_DTYPE.itemsize * n_slots) + n_slots * len(TRACES) * capacity * 4
+
+    @classmethod
+    def create(cls, capacity, hold=READER_HOLD, lock=None):
+        # 持有的槽位与最新槽之外, 写端总还有空槽可用
+        n_slots = hold + 2
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(n_slots, capacity))
+        ring = cls(shm, n_slots, capacity, owner=True, hold=hold, lock=lock)
+        ring.header["seq"] = 0
+        ring.header["latest"] = -1
+        ring.header["pinned"] = 0
+        ring.header["capacity"] = capacity
+        ring.header["slots"] = n_slots
+        ring.meta["seq"] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, lock=None):
+        # 附加方是创建方 spawn 出的子进程, 与其共用资源跟踪器; 删除只由创建方负责
+        shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray(1, HEADER_DTYPE, shm.buf, 0)[0]
+        n_slots, capacity = int(header["slots"]), int(header["capacity"])
+        del header
+        return cls(shm, n_slots, capacity, owner=False, lock=lock)
+
+    def write(self, sweep):
+        n = len(sweep.psd)
+        if n > self.capacity:
+            raise ValueError(f"扫描点数 {n} 超出共享内存容量 {self.capacity}")
+        header, meta = self.header, self.meta
+        with self.lock:
+            latest = int(header["latest"])
+            pinned = int(header["pinned"])
+            for slot in range(self.n_slots):
+                slot = (latest + 1 + slot) % self.n_slots
+                if slot != latest and not pinned & (1 << slot):
+                    break
+            else:
+                return 0
+            meta[slot]["seq"] = -1
+        rows = self.data[slot]
+        for i, name in enumerate(TRACES):
+            trace = getattr(sweep, name)
+            if trace is not None:
+                rows[i, :n] = trace
+        record = meta[slot]
+        record["timestamp"] = sweep.timestamp
+        record["sat"], record["band"] = sweep.sat_idx, sweep.band_idx
+        record["rb"], record["vb"] = sweep.rb, sweep.vb
+        record["n_points"] = n
+        record["freq_min"], record["freq_max"] = sweep.freq[0], sweep.freq[-1]
+        record["has_avg"] = sweep.avg is not None
+        record["has_peak"] = sweep.peak_freq is not None
+        if sweep.peak_freq is not None:
+            record["peak_freq"], record["peak_val"] = sweep.peak_freq, sweep.peak_val
+        record["has_extras"] = sweep.detections is not None or sweep.limits is not None
+        with self.lock:
+            seq = int(header["seq"]) + 1
+            record["seq"] = seq
+            header["latest"] = slot
+            header["seq"] = seq
+        return seq
+
+    def pin(self):
+        mask = 0
+        for slot in self.pins:
+            mask |= 1 << slot
+        self.header["pinned"] = mask
+
+    def read(self, last_seq=0):
+        # 返回 (序号, 槽位) 并持有该槽, 用完须 unpin(槽位); 没有比 last_seq 新的扫描或已持有 hold 个槽位时返回 None
+        header = self.header
+        with self.lock:
+            seq = int(header["seq"])
+            if seq == last_seq or seq == 0 or len(self.pins) >= self.hold:
+                return None
+            slot = int(header["latest"])
+            self.pins.append(slot)
+            self.pin()
+        return seq, slot
+
+    def unpin(self, slot):
+        # 可在任意线程调用; 已关闭的环不再需要解除
+        with self.lock:
+            if self.header is None or slot not in self.pins:
+                return
+            self.pins.remove(slot)
+            self.pin()
+
+    def frequencies(self, freq_min, freq_max, n):
+        key = (freq_min, freq_max, n)
+        if key != self.grid_key:
+            self.grid = np.linspace(freq_min, freq_max, n)
+            self.grid_key = key
+        return self.grid
+
+    def sweep(self, slot, detections=None, limits=None):
+        record = self.meta[slot]
+        n = int(record["n_points"])
+        rows = self.data[slot, :, :n]
+        freq = self.frequencies(float(record["freq_min"]), float(record["freq_max"]), n)
+        peak_freq = peak_val = None
+        if record["has_peak"]:
+            peak_freq, peak_val = float(record["peak_freq"]), float(record["peak_val"])
+        return Sweep(float(record["timestamp"]), int(record["sat"]), int(record["band"]), float(record["rb"]), float(record["vb"]),
+                     freq, rows[0], rows[1], rows[2], rows[3] if record["has_avg"] else None, peak_freq, peak_val, detections, limits)
+
+    def close(self):
+        # 先删除名字 (已映射的一方不受影响); 仍有数组视图引用共享内存时无法解除映射, 留给下次再试
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.owner = False
+        self.header = self.meta = self.data = self.grid = None
+        try:
+            self.shm.close()
+        except BufferError:
+            return False
+        return True
+
+
+def engine_main(conn, ring_name, ring_lock, satellites, catalog_path, sat_idx, band_idx, settings):
+    # 引擎进程: 处理控制消息 → 扫描 → 写入共享内存环; 检测 / 门限结果先经管道发出, 再写扫描数据
+    catalog = Catalog.load(catalog_path) if catalog_path else Catalog(satellites)
+    engine = SpectrumEngine(catalog, sat_idx, band_idx, seed=settings.pop("seed", None))
+    clock = FrameClock(engine.sweep_time, *settings.pop("clock"))
+    for name, value in settings.items():
+        setattr(engine, name, value)
+    ring = SweepRing.attach(ring_name, ring_lock)
+    last_stats = time.monotonic()
+    paused = False
+    running = True
+    while running:
+        while conn.poll():
+            message = conn.recv()
+            kind = message[0]
+            try:
+                if kind == "stop":
+                    running = False
+                elif kind == "set":
+                    setattr(engine, message[1], message[2])
+                elif kind == "call":
+                    getattr(engine, message[1])(*message[2])
+                elif kind == "ring":
+                    ring.close()
+                    ring = SweepRing.attach(message[1], ring_lock)
+                elif kind == "catalog":
+                    engine.set_catalog(Catalog.load(message[1]) if message[1] else Catalog(message[2]))
+                elif kind == "clock":
+                    clock.configure(*message[1:])
+                elif kind == "pause":
+                    paused = message[1]
+                    clock.reset()
+            except Exception as e:
+                conn.send(("error", f"{kind}: {e}"))
+        if not running:
+            break
+        if paused:
+            time.sleep(0.05)
+            continue
+        # 等待期间有控制消息到达时先处理, 再按新参数继续等同一个截止时刻
+        if not clock.wait(lambda: not conn.poll()):
+            continue
+        try:
+            sweep = engine.sweep()
+        except Exception as e:
+            conn.send(("error", f"扫描: {e}"))
+            time.sleep(0.1)
+            continue
+        # 没有写入的扫描 (超出容量或无空槽) 不发送其检测 / 门限结果; 写入后按实际序号发送
+        seq = ring.write(sweep) if len(sweep.psd) <= ring.capacity else 0
+        if seq and (sweep.detections is not None or sweep.limits is not None):
+            conn.send(("extras", ring.name, seq, sweep.detections, sweep.limits, engine.limits.alarms))
+        now = time.monotonic()
+        if now - last_stats >= STATS_INTERVAL_S:
+            conn.send(("stats", engine.profiler.stats(), clock.stats()))
+            last_stats = now
+    ring.close()
+    conn.close()
+
+
+class RemoteProfiler(StageProfiler):
+    # 本进程只记录渲染等阶段, 引擎进程的各阶段统计定期经管道送来后合并显示
+    def __init__(self):
+        super().__init__()
+        self.remote = {}
+
+    def stats(self):
+        return {**self.remote, **super().stats()}
+
+
+class RemoteEngine(SpectrumEngine):
+    # 引擎在独立进程中扫描, 本对象作为界面一侧的参数镜像: 参数修改在本地生效的同时经管道转发,
+    # acquire() 从共享内存环取最新一帧 (零拷贝) 作为已处理完的 Sweep; 回放等本地帧仍走父类的处理
+    def __init__(self, satellites, sat_idx=2, band_idx=0, seed=None, clock_mode="max", clock_period=FIXED_PERIOD_S, **kwargs):
+        super().__init__(satellites, sat_idx, band_idx, seed=seed, **kwargs)
+        # 节拍在引擎进程中执行, 这里只保存设置并显示引擎进程报告的实测速率
+        self.clock = FrameClock(self.sweep_time, clock_mode, clock_period)
+        self.clock_stats = None
+        self.profiler = RemoteProfiler()
+        self.rbvb_filter.profiler = self.profiler
+        ctx = multiprocessing.get_context("spawn")
+        # 环的选槽 / 持有锁须在启动引擎进程时传入, 换环时沿用同一把
+        self.ring_lock = ctx.Lock()
+        self.ring = SweepRing.create(self.sweep_points, lock=self.ring_lock)
+        self.retired = []
+        self.last_seq = 0
+        self.extras = {}
+        self.send_lock = threading.Lock()
+        self.conn, child = ctx.Pipe()
+        settings = {name: getattr(self, name) for name in FORWARDED}
+        settings.update(seed=seed, clock=(clock_mode, clock_period), sweep_points=self.sweep_points, psd_mode=self.psd_mode)
+        self.process = ctx.Process(target=engine_main, daemon=True, name="satmon-engine",
+                                   args=(child, self.ring.name, self.ring_lock, self.satellites, self.catalog.path, sat_idx, band_idx, settings))
+        self.process.start()
+        child.close()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in FORWARDED and "process" in self.__dict__:
+            self.send("set", name, value)
+
+    def send(self, *message):
+        # 界面、SCPI 与扫描线程都可能发送控制消息
+        with self.send_lock:
+            try:
+                self.conn.send(message)
+            except (OSError, ValueError):
+                pass
+
+    def set_clock(self, mode=None, period=None):
+        self.clock.configure(mode, period)
+        self.send("clock", mode, period)
+
+    def pause(self, paused=True):
+        self.send("pause", paused)
+
+    def select_satellite(self, sat_idx, band_idx=0):
+        super().select_satellite(sat_idx, band_idx)
+        if "process" in self.__dict__:
+            self.send("call", "select_satellite", (sat_idx, band_idx))
+
+    def set_span(self, freq_min=None, freq_max=None):
+        super().set_span(freq_min, freq_max)
+        self.send("call", "set_span", (freq_min, freq_max))
+
+    def set_sweep_points(self, n_points):
+        super().set_sweep_points(n_points)
+        if n_points > self.ring.capacity:
+            # 新建更大的环再通知引擎进程切换; 旧环在界面释放其视图后关闭
+            ring = SweepRing.create(n_points, lock=self.ring_lock)
+            self.send("ring", ring.name)
+            self.retired.append(self.ring)
+            self.ring, self.last_seq = ring, 0
+        self.send("call", "set_sweep_points", (n_points,))
+
+    def set_psd_mode(self, mode):
+        super().set_psd_mode(mode)
+        self.send("call", "set_psd_mode", (mode,))
+
+    def configure_averaging(self, count=None, mode=None, scale=None):
+        super().configure_averaging(count, mode, scale)
+        self.send("call", "configure_averaging", (count, mode, scale))
+
+    def reset_holds(self):
+        super().reset_holds()
+        if "process" in self.__dict__:
+            self.send("call", "reset_holds", ())
+
+    def set_catalog(self, catalog):
+        super().set_catalog(catalog)
+        self.send("catalog", catalog.path, None if catalog.path else catalog.satellites)
+        self.send("call", "select_satellite", (self.selected_sat_idx, self.selected_band_idx))
+        if self.span is not None:
+            self.send("call", "set_span", self.span)
+
+    def drain(self):
+        while self.conn.poll():
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "extras":
+                _, name, seq, detections, limits, alarms = message
+                self.extras[name, seq] = (detections, limits)
+                if len(self.extras) > EXTRAS_KEPT:
+                    del self.extras[next(iter(self.extras))]
+                self.limits.alarms = alarms
+                if detections is not None and self.detection_log is not None:
+                    self.detection_log.write(self.detection_record(detections))
+                if limits is not None and self.limit_log is not None:
+                    for event in limits.events:
+                        self.limit_log.write(self.limit_record(event))
+            elif message[0] == "stats":
+                self.profiler.remote = message[1]
+                self.clock_stats = message[2]
+            elif message[0] == "error":
+                print(f"引擎进程错误: {message[1]}")
+
+    def acquire(self):
+        self.check_catalog()
+        self.drain()
+        self.retired = [ring for ring in self.retired if not ring.close()]
+        found = self.ring.read(self.last_seq)
+        if found is None:
+            return None
+        seq, slot = found
+        key = (self.ring.name, seq)
+        if self.ring.meta[slot]["has_extras"]:
+            # 检测 / 门限结果在写入共享内存之后才发出, 稍等其到达; 仍未到达时下次再取, 不交出缺少结果的帧
+            deadline = time.monotonic() + EXTRAS_WAIT_S
+            while key not in self.extras and self.conn.poll(max(deadline - time.monotonic(), 0)):
+                self.drain()
+            if key not in self.extras:
+                self.ring.unpin(slot)
+                return None
+        self.last_seq = seq
+        detections, limits = self.extras.get(key, (None, None))
+        ring = self.ring
+        # 槽位一直持有到这一帧的所有使用者都释放 (见 workspace.Lease)
+        sweep = ring.sweep(slot, detections, limits)._replace(lease=Lease(lambda: ring.unpin(slot)))
+        if limits is not None:
+            # 门限曲线在本地按同样的参数重建 (有缓存), 供界面绘制
+            self.limits.mask.update(sweep.freq, self.noise_floor, self.span_carriers, self.current_band.get("limits", ()))
+        return sweep
+
+    def filter_frame(self, frame):
+        if isinstance(frame, Sweep):
+            return frame
+        return super().filter_frame(frame)
+
+    def process_frame(self, frame):
+        if isinstance(frame, Sweep):
+            return frame
+        return super().process_frame(frame)
+
+    def status_text(self):
+        state = "运行" if self.process.is_alive() else "已退出"
+        if self.clock_stats is None:
+            return f"引擎进程{state}"
+        return f"引擎进程{state} | {self.clock.status_text(self.clock_stats)}"
+
+    def close(self):
+        self.send("stop")
+        self.process.join(2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        for ring in self.retired + [self.ring]:
+            ring.close()
@@ -0,0 +1,122 @@
+import math
+import time
+from collections import deque
+
+SWEEP_K = 2.5            # 扫频模式扫描时间系数 (高斯 RBW 滤波器典型值)
+FFT_SEGMENT_HZ = 10e6    # FFT 模式每段分析带宽
+FFT_K = 2.5              # FFT 模式每段采集时间 ≈ FFT_K / RBW
+POINT_TIME_S = 1e-6      # 每个扫描点的最短检波时间
+MIN_SWEEP_S = 1e-3
+FIXED_PERIOD_S = 0.1
+WAIT_SLICE_S = 0.05      # 长周期分段等待, 期间参数变化或停止能及时生效
+RATE_WINDOW_S = 2.0       # 实测速率的统计窗口, 长周期时放宽到 3 个周期
+CLOCK_MODES = {"instrument": "仪表扫描时间", "max": "最大速率", "fixed": "固定周期"}
+
+
+def swept_time(span_hz, rbw, vbw):
+    # 扫频: 滤波器在每个 RBW 宽度上需驻留约 1/RBW 才能建立响应; VBW 窄于 RBW 时由视频滤波器决定
+    return SWEEP_K * span_hz / (rbw * min(rbw, vbw))
+
+
+def fft_time(span_hz, rbw, vbw):
+    # FFT: 跨度按 FFT_SEGMENT_HZ 分段, 每段采集约 FFT_K / RBW; VBW 窄于 RBW 时每段需平均 RBW / VBW 次
+    segments = max(1, math.ceil(span_hz / FFT_SEGMENT_HZ))
+    return segments * FFT_K / rbw * max(1.0, rbw / vbw)
+
+
+def sweep_time(span_hz, rbw, vbw, points):
+    # 同频谱仪自动模式: 取扫频与 FFT 中较快者, 且不短于点数决定的最短时间
+    return max(min(swept_time(span_hz, rbw, vbw), fft_time(span_hz, rbw, vbw)), points * POINT_TIME_S, MIN_SWEEP_S)
+
+
+class FrameClock:
+    # 扫描节拍: 按单调时钟的截止时刻排帧, 计算耗时计入周期而不是做完再睡固定时长.
+    # 每帧的截止时刻 = 上一帧开始 + 当前周期, 等待中按最新参数重算; 落后超过一个周期时不补扫, 从当前时刻重新计时
+    def __init__(self, sweep_time, mode="fixed", period=FIXED_PERIOD_S):
+        self.sweep_time = sweep_time   # 返回仪表模式下的扫描时间 (秒)
+        self.mode = None
+        self.period = None
+        self.start = None
+        self.starts = deque()   # 最近各帧的开始时刻, 只由扫描线程修改
+        self.frames = 0
+        self.late = 0
+        self.configure(mode, period)
+
+    def configure(self, mode=None, period=None):
+        if mode is not None:
+            if mode not in CLOCK_MODES:
+                raise ValueError(f"未知扫描节拍: {mode}")
+            self.mode = mode
+        if period is not None:
+            if period <= 0:
+                raise ValueError("扫描周期必须为正")
+            self.period = float(period)
+
+    def target_period(self):
+        if self.mode == "max":
+            return 0.0
+        if self.mode == "fixed":
+            return self.period
+        return self.sweep_time()
+
+    def reset(self):
+        # 暂停或没有取到帧后, 下一帧不必等满周期
+        self.start = None
+        self.starts.clear()
+
+    def wait(self, running=None):
+        # 等到下一帧的截止时刻并登记开始; 等待期间 running() 变为假时返回 False
+        now = time.monotonic()
+        if self.start is not None:
+            while True:
+                period = self.target_period()
+                deadline = self.start + period
+                if now >= deadline:
+                    break
+                if running is not None and not running():
+                    return False
+                time.sleep(min(deadline - now, WAIT_SLICE_S))
+                now = time.monotonic()
+            if period and now - deadline > period:
+                self.late += 1
+                self.start = now
+            else:
+                self.start = deadline if period else now
+        else:
+            self.start = now
+        self.frames += 1
+        self.starts.append(self.start)
+        horizon = self.horizon()
+        while now - self.starts[0] > horizon:
+            self.starts.popleft()
+        return True
+
+    def horizon(self):
+        return max(RATE_WINDOW_S, 3 * self.target_period())
+
+    def rate(self):
+        # 在快照上计算, 扫描停止超过统计窗口后归零
+        now = time.monotonic()
+        horizon = self.horizon()
+        starts = [t for t in list(self.starts) if now - t <= horizon]
+        if len(starts) < 2 or starts[-1] == starts[0]:
+            return 0.0
+        return (len(starts) - 1) / (starts[-1] - starts[0])
+
+    def target_rate(self):
+        period = self.target_period()
+        return 1.0 / period if period else 0.0
+
+    def stats(self):
+        return {"mode": self.mode, "period_s": self.target_period(), "target_rate": self.target_rate(),
+                "rate": self.rate(), "frames": self.frames, "late": self.late}
+
+    def status_text(self, stats=None):
+        stats = stats or self.stats()
+        target = f"{stats['target_rate']:.2f}" if stats["target_rate"] else "全速"
+        text = f"{CLOCK_MODES[stats['mode']]}: 实测 {stats['rate']:.2f} / 目标 {target} 次/秒"
+        if stats["mode"] == "instrument":
+            text += f" (扫描时间 {stats['period_s'] * 1e3:.1f} ms)"
+        if stats["late"]:
+            text += f" | 超时 {stats['late']}"
+        return text
@@ -0,0 +1,68 @@
+import numpy as np
+
+JITTER_DB = 0.8
+SKIRT_WEIGHT = 0.08
+# 载波高斯裙边在 3 个半占用带宽外已低于 0.1 dB, 只在该窗口内计算
+SKIRT_EXTENT = 3.0
+
+
+def roll_off_for(modulation):
+    return 0.35 if "QAM" in modulation or "PSK" in modulation else 0.2
+
+
+def carrier_envelope(dist, bw, roll_off):
+    # 升余弦包络 + 高斯裙边, bw/roll_off 可为与 dist 广播的数组
+    half_bw = bw / 2
+    half_symbol_bw = bw * (1 + roll_off) / 2
+    abs_dist = np.abs(dist)
+    rolloff = 0.5 * (1 + np.cos(np.pi * (abs_dist - half_bw) / (half_symbol_bw - half_bw)))
+    envelope = np.where(abs_dist <= half_bw, 1.0, np.where(abs_dist <= half_symbol_bw, rolloff, 0.0))
+    envelope += SKIRT_WEIGHT * np.exp(-0.5 * ((dist / half_symbol_bw) ** 2))
+    return envelope.clip(0, 1)
+
+
+def carrier_window(carrier):
+    half_symbol_bw = carrier["bw"] * (1 + roll_off_for(carrier["modulation"])) / 2
+    return carrier["freq"] - SKIRT_EXTENT * half_symbol_bw, carrier["freq"] + SKIRT_EXTENT * half_symbol_bw
+
+
+class CarrierTemplates:
+    # 载波电平模板按 (载波参数, 底噪, 频率网格) 缓存, 每个模板只覆盖载波的局部频点窗口;
+    # 参数不变时每次扫描只需叠加抖动并与噪声取最大值
+    def __init__(self):
+        self.key = None
+        self.slices = []
+        self.levels = np.empty(0)
+        self.jitter = np.empty(0)
+
+    def build(self, freq, carriers, noise_floor):
+        slices, levels, offset = [], [], 0
+        for carrier in carriers:
+            lo_freq, hi_freq = carrier_window(carrier)
+            lo, hi = np.searchsorted(freq, (lo_freq, hi_freq))
+            if hi <= lo:
+                continue
+            envelope = carrier_envelope(freq[lo:hi] - carrier["freq"], carrier["bw"], roll_off_for(carrier["modulation"]))
+            levels.append(envelope * (carrier["power"] - noise_floor) + noise_floor)
+            slices.append((lo, hi, offset))
+            offset += hi - lo
+        self.slices = slices
+        self.levels = np.concatenate(levels) if levels else np.empty(0)
+        self.jitter = np.empty_like(self.levels)
+
+    def update(self, freq, carriers, noise_floor):
+        key = (len(freq), float(freq[0]), float(freq[-1]), noise_floor,
+               tuple((c["freq"], c["bw"], c["power"], c["modulation"]) for c in carriers))
+        if key != self.key:
+            self.build(freq, carriers, noise_floor)
+            self.key = key
+
+    def apply(self, psd, rng):
+        # 抖动在预分配的缓冲中原地生成: U[0,1) → U[-JITTER_DB, JITTER_DB) + 模板电平
+        levels = rng.random(out=self.jitter)
+        levels -= 0.5
+        levels *= 2 * JITTER_DB
+        levels += self.levels
+        for lo, hi, offset in self.slices:
+            np.maximum(psd[lo:hi], levels[offset:offset + hi - lo], out=psd[lo:hi])
+        return psd
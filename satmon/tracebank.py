@@ -0,0 +1,142 @@
+import numpy as np
+
+TRACE_CAPACITY = 64
+MAX_BANK_BYTES = 1 << 30
+META_DTYPE = np.dtype([
+    ("seq", "<i8"),
+    ("timestamp", "<f8"),
+    ("sat", "<i4"),
+    ("band", "<i4"),
+    ("rb", "<f4"),
+    ("vb", "<f4"),
+    ("freq_min", "<f8"),
+    ("freq_max", "<f8"),
+    ("relative", "?"),   # 差值类运算结果 (dB), 其余为绝对电平 (dBm)
+    ("visible", "?"),
+    ("used", "?"),
+    ("name", "<U32"),
+])
+
+
+class TraceBank:
+    # 迹线存储区: 冻结的扫描按槽位存放在一个预分配的 (槽位 × 频点) float32 数组中, 元数据为等长结构化数组.
+    # 所有迹线共用同一频率网格; 存满后覆盖最早的一条. version 在内容或显示选择变化时递增, 供界面判断是否重绘
+    def __init__(self, capacity=TRACE_CAPACITY):
+        self.max_capacity = capacity
+        self.data = np.empty((0, 0), dtype=np.float32)
+        self.meta = np.zeros(0, dtype=META_DTYPE)
+        self.seq = 0
+        self.version = 0
+
+    @property
+    def n_points(self):
+        return self.data.shape[1]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.meta["used"]))
+
+    def allocate(self, n_points):
+        capacity = max(1, min(self.max_capacity, MAX_BANK_BYTES // (n_points * 4)))
+        self.data = np.empty((capacity, n_points), dtype=np.float32)
+        self.meta = np.zeros(capacity, dtype=META_DTYPE)
+
+    def grid(self):
+        slots = self.slots()
+        if not len(slots):
+            return None
+        meta = self.meta[slots[0]]
+        return np.linspace(meta["freq_min"], meta["freq_max"], self.n_points)
+
+    def compatible(self, freq):
+        slots = self.slots()
+        if not len(slots):
+            return True
+        meta = self.meta[slots[0]]
+        return len(freq) == self.n_points and freq[0] == meta["freq_min"] and freq[-1] == meta["freq_max"]
+
+    def slots(self, visible_only=False):
+        # 使用中的槽位, 按存入顺序
+        used = self.meta["used"] & self.meta["visible"] if visible_only else self.meta["used"]
+        slots = np.flatnonzero(used)
+        return slots[np.argsort(self.meta["seq"][slots])]
+
+    def take_slot(self):
+        free = np.flatnonzero(~self.meta["used"])
+        if len(free):
+            return int(free[0])
+        return int(np.argmin(self.meta["seq"]))
+
+    def store_array(self, freq, psd, name=None, relative=False, timestamp=0.0, sat=-1, band=-1, rb=0.0, vb=0.0):
+        if not self.compatible(freq):
+            raise ValueError("曲线点数或频率范围与存储区中的曲线不一致")
+        if not len(self.slots()) and len(freq) != self.n_points:
+            self.allocate(len(freq))
+        slot = self.take_slot()
+        self.data[slot] = psd
+        self.seq += 1
+        self.version += 1
+        self.meta[slot] = (self.seq, timestamp, sat, band, rb, vb, freq[0], freq[-1], relative, True, True, name or f"T{self.seq}")
+        return slot
+
+    def store(self, sweep, name=None):
+        return self.store_array(sweep.freq, sweep.psd, name, timestamp=sweep.timestamp, sat=sweep.sat_idx, band=sweep.band_idx,
+                                rb=sweep.rb, vb=sweep.vb)
+
+    def remove(self, slots):
+        self.meta["used"][slots] = False
+        self.version += 1
+
+    def clear(self):
+        self.meta["used"] = False
+        self.version += 1
+
+    def set_visible(self, slots, visible=True):
+        self.meta["visible"][slots] = visible
+        self.version += 1
+
+    def name(self, slot):
+        return str(self.meta["name"][slot])
+
+    # 迹线运算: 逐频点向量化, 结果存为新迹线并返回其槽位
+    def difference(self, a, b):
+        freq = self.grid()
+        result = np.subtract(self.data[a], self.data[b])
+        return self.store_array(freq, result, f"{self.name(a)}−{self.name(b)}", relative=True, timestamp=self.meta["timestamp"][a])
+
+    def reference_difference(self, slots, reference):
+        # 每条所选迹线减去参考迹线 (广播, 一次减法)
+        slots = [s for s in slots if s != reference]
+        freq = self.grid()
+        results = self.data[slots] - self.data[reference]
+        return [self.store_array(freq, row, f"{self.name(s)}−{self.name(reference)}", relative=True, timestamp=self.meta["timestamp"][s])
+                for s, row in zip(slots, results)]
+
+    def reduce(self, op, slots):
+        # 所选迹线逐频点取最大 / 最小: 逐行原地累积到一个结果缓冲, 不把所选行整体复制出来
+        ufunc = {"max": np.maximum, "min": np.minimum}[op]
+        result = self.data[slots[0]].copy()
+        for slot in slots[1:]:
+            ufunc(result, self.data[slot], out=result)
+        names = "/".join(self.name(s) for s in slots[:4]) + ("…" if len(slots) > 4 else "")
+        relative = bool(self.meta["relative"][slots].any())
+        return self.store_array(self.grid(), result, f"{op}({names})", relative=relative, timestamp=self.meta["timestamp"][slots].max())
+
+    def save(self, path):
+        slots = self.slots()
+        np.savez(path, data=self.data[slots], meta=self.meta[slots])
+
+    def load(self, path):
+        with np.load(path, allow_pickle=False) as archive:
+            data, meta = archive["data"], archive["meta"].astype(META_DTYPE)
+        if len(data) == 0:
+            self.clear()
+            return 0
+        self.max_capacity = max(self.max_capacity, len(data))
+        self.allocate(data.shape[1])
+        if len(data) > len(self.data):
+            data, meta = data[-len(self.data):], meta[-len(self.data):]
+        self.data[:len(data)] = data
+        self.meta[:len(meta)] = meta
+        self.seq = int(meta["seq"].max())
+        self.version += 1
+        return len(data)
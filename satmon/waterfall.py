@@ -0,0 +1,39 @@
+import numpy as np
+
+
+class WaterfallBuffer:
+    # 预分配双倍行数的环形缓冲: 每行同时写入 i 与 i+rows 两处,
+    # 因此 data[pos:pos+rows] 始终是按时间排序(旧→新)的连续视图, 无需 np.roll/vstack
+    def __init__(self, n_rows, n_cols, dtype=np.float32):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.data = np.full((2 * n_rows, n_cols), np.nan, dtype=dtype)
+        self.pos = 0
+        self.count = 0
+        self._edges = {}
+
+    def clear(self):
+        self.data.fill(np.nan)
+        self.pos = 0
+        self.count = 0
+
+    def column_edges(self, n_points):
+        edges = self._edges.get(n_points)
+        if edges is None:
+            edges = np.linspace(0, n_points, self.n_cols + 1).astype(np.intp)[:-1]
+            self._edges = {n_points: edges}
+        return edges
+
+    def push(self, sweep):
+        # 每列取峰值, 原地写入当前行
+        row = self.data[self.pos]
+        if len(sweep) >= self.n_cols:
+            np.maximum.reduceat(sweep, self.column_edges(len(sweep)), out=row)
+        else:
+            row[:] = np.interp(np.linspace(0, len(sweep) - 1, self.n_cols), np.arange(len(sweep)), sweep)
+        self.data[self.pos + self.n_rows] = row
+        self.pos = (self.pos + 1) % self.n_rows
+        self.count += 1
+
+    def view(self):
+        return self.data[self.pos:self.pos + self.n_rows]
@@ -0,0 +1,135 @@
+import threading
+import weakref
+
+import numpy as np
+
+# 空闲表最多保留的缓冲字节数, 超出的缓冲释放后直接交还分配器
+MAX_FREE_BYTES = 256 << 20
+
+
+class Lease:
+    # 一帧扫描所占资源的持有计数: 交出扫描的一方持有一份, 之后还要读取的使用者 retain() 各加一份、用完 release();
+    # 全部释放后才调用 on_free 交还资源 (工作区缓冲回到空闲表 / 共享内存槽位解除持有)
+    def __init__(self, on_free):
+        self.lock = threading.Lock()
+        self.count = 1
+        self.on_free = on_free
+
+    def retain(self):
+        with self.lock:
+            if self.count <= 0:
+                raise RuntimeError("扫描缓冲已释放")
+            self.count += 1
+        return self
+
+    def release(self):
+        with self.lock:
+            if self.count <= 0:
+                return
+            self.count -= 1
+            if self.count:
+                return
+        self.on_free()
+
+
+def retain(item):
+    # 继续持有一帧扫描 (跨线程保存或稍后读取), 返回同一帧; 没有 lease 的帧 (回放等) 不需要持有
+    lease = getattr(item, "lease", None)
+    if lease is not None:
+        lease.retain()
+    return item
+
+
+def release(item):
+    lease = getattr(item, "lease", None)
+    if lease is not None:
+        lease.release()
+
+
+class BufferPool:
+    # 曲线缓冲的空闲表: 缓冲随扫描交出后由 Lease 计数, 所有使用者释放后才回到空闲表再被改写;
+    # 没有释放的缓冲随扫描一起被回收, 不会被复用. 空闲表后进先出 (刚释放的缓冲多半还在缓存中),
+    # 其长度即实际在途的扫描所需, 不随点数预留. 多个引擎 (多频段调度) 可共用一个, 空闲缓冲不按频段数重复保留
+    def __init__(self, max_free_bytes=MAX_FREE_BYTES):
+        self.max_free_bytes = max_free_bytes
+        self.lock = threading.Lock()
+        self.free = []
+        self.issued = weakref.WeakValueDictionary()
+        self.n_points = 0
+
+    def take(self, n_points):
+        # 返回 (缓冲, 是否新分配); 取用与释放可能来自任意线程, 空闲表在锁内存取
+        with self.lock:
+            if n_points != self.n_points:
+                self.free = []
+                self.n_points = n_points
+            if self.free:
+                return self.free.pop(), False
+            buf = np.empty(n_points)
+            self.issued[id(buf)] = buf
+            return buf, True
+
+    def lease(self, buffers):
+        # 只计入本空闲表发出的缓冲, 回放帧等外部数组不会进入空闲表
+        with self.lock:
+            owned = [buf for buf in buffers if buf is not None and self.issued.get(id(buf)) is buf]
+        return Lease(lambda: self.recycle(owned))
+
+    def recycle(self, buffers):
+        with self.lock:
+            for buf in buffers:
+                if len(buf) == self.n_points and (len(self.free) + 1) * self.n_points * 8 <= self.max_free_bytes:
+                    self.free.append(buf)
+
+
+class SweepWorkspace:
+    # 扫描工作区: 频率网格按 (频段, 点数) 缓存, 功率谱/保持/平均缓冲从空闲表 (BufferPool) 取用, 噪声用 Generator 原地填充
+    def __init__(self, rng, pool=None):
+        self.rng = rng
+        self.pool = pool or BufferPool()
+        self.lock = threading.Lock()
+        self.grid_key = None
+        self.grid = None
+        self.allocations = 0
+        self.sweeps = 0
+        self.last_allocations = 0
+        self.mark = 0
+
+    def begin_sweep(self):
+        self.last_allocations = self.allocations - self.mark
+        self.mark = self.allocations
+        self.sweeps += 1
+
+    def frequencies(self, f_min, f_max, n_points):
+        key = (f_min, f_max, n_points)
+        if key != self.grid_key:
+            self.grid = np.linspace(f_min, f_max, n_points)
+            self.grid.flags.writeable = False
+            self.grid_key = key
+            self.count()
+        return self.grid
+
+    def count(self, n=1):
+        # 工作区之外的新分配 (scipy 卷积 / 递推结果、IQ 合成等) 也计入, 统计反映整条扫描路径; 可能来自滤波线程
+        with self.lock:
+            self.allocations += n
+
+    def buffer(self, n_points):
+        buf, new = self.pool.take(n_points)
+        if new:
+            self.count()
+        return buf
+
+    def lease(self, buffers):
+        return self.pool.lease(buffers)
+
+    def noise(self, mean, n_points):
+        buf = self.buffer(n_points)
+        self.rng.standard_normal(out=buf)
+        buf += mean
+        return buf
+
+    def stats(self):
+        pool = self.pool
+        return {"sweeps": self.sweeps, "allocations": self.allocations, "last_sweep": self.last_allocations,
+                "pooled": len(pool.free), "pool_bytes": len(pool.free) * pool.n_points * 8}
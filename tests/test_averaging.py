@@ -0,0 +1,80 @@
+# 迹线平均: 滑动窗口 / 指数两种方式在对数、功率、电压三个域的结果与直接计算一致
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.averaging import Averager
+
+FACTORS = {"log": None, "power": 10.0, "voltage": 20.0}
+
+
+def sweeps(n, n_points=64):
+    rng = np.random.default_rng(0)
+    return [-80.0 + 5.0 * rng.standard_normal(n_points) for _ in range(n)]
+
+
+def mean_in_scale(rows, scale):
+    rows = np.array(rows)
+    factor = FACTORS[scale]
+    if factor is None:
+        return rows.mean(axis=0)
+    return factor * np.log10((10 ** (rows / factor)).mean(axis=0))
+
+
+@pytest.mark.parametrize("scale", sorted(FACTORS))
+def test_window_averages_last_count_sweeps(scale):
+    averager = Averager(count=4, mode="window", scale=scale)
+    rows = sweeps(10)
+    for i, row in enumerate(rows):
+        value = averager.push(row)
+        expected = mean_in_scale(rows[max(0, i - 3):i + 1], scale)
+        # 环形缓冲为 float32
+        np.testing.assert_allclose(value, expected, atol=1e-4)
+
+
+@pytest.mark.parametrize("scale", sorted(FACTORS))
+def test_exp_starts_as_running_mean_then_decays(scale):
+    count = 4
+    averager = Averager(count=count, mode="exp", scale=scale)
+    rows = sweeps(10)
+    factor = FACTORS[scale]
+    linear = [row if factor is None else 10 ** (row / factor) for row in rows]
+    total = np.zeros_like(linear[0])
+    for i, (row, x) in enumerate(zip(rows, linear)):
+        total += (x - total) / min(i + 1, count)
+        value = averager.push(row)
+        expected = total if factor is None else factor * np.log10(total)
+        np.testing.assert_allclose(value, expected, atol=1e-9)
+    np.testing.assert_allclose(averager.push(rows[0]), averager.value(), atol=1e-12)
+
+
+def test_push_does_not_modify_input_and_writes_out():
+    averager = Averager(count=3, mode="window", scale="power")
+    row = sweeps(1)[0]
+    before = row.copy()
+    out = np.empty_like(row)
+    assert averager.push(row, out=out) is out
+    np.testing.assert_array_equal(row, before)
+
+
+def test_configure_resets_and_validates():
+    averager = Averager(count=3)
+    averager.push(sweeps(1)[0])
+    averager.configure(mode="exp")
+    assert averager.value() is None
+    for kwargs in ({"count": 0}, {"mode": "median"}, {"scale": "dbuv"}):
+        with pytest.raises(ValueError):
+            averager.configure(**kwargs)
+
+
+def test_window_memory_limit():
+    averager = Averager(count=100, mode="window", max_ring_bytes=1000)
+    with pytest.raises(ValueError):
+        averager.push(np.zeros(10))
+    # 指数平均不需要环形缓冲
+    averager.configure(mode="exp")
+    assert averager.push(np.zeros(10)) is not None
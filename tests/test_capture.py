@@ -0,0 +1,111 @@
+# 采集与回放: 写入后读回的记录一致, 写端异常退出时已写入的记录仍可读回, 回放按采集时间轴推进
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from satmon.capture import CaptureReader, CaptureWriter, read_header
+from satmon.engine import SpectrumEngine
+from satmon.replay import CapturePlayer
+from satmon.satellites import CHINASAT_SATELLITES
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(path, n_sweeps, clock, n_points=200, chunk_bytes=4096):
+    engine = SpectrumEngine(sweep_points=n_points, seed=0)
+    writer = CaptureWriter(path, n_points, CHINASAT_SATELLITES, chunk_bytes=chunk_bytes, clock=clock)
+    sweeps = []
+    for _ in range(n_sweeps):
+        clock.now += 0.5
+        sweep = engine.sweep()
+        writer.append_sweep(sweep)
+        sweeps.append(sweep.psd.astype(np.float32))
+    return writer, sweeps
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "a.satcap")
+    clock = FakeClock()
+    writer, sweeps = record(path, 25, clock)
+    writer.close()
+    reader = CaptureReader(path)
+    assert len(reader) == 25
+    np.testing.assert_array_equal(reader.psd, np.array(sweeps))
+    np.testing.assert_allclose(np.diff(reader.timestamps), 0.5)
+    assert reader.satellite_name(0) == CHINASAT_SATELLITES[2]["name"]
+    freq = reader.frequencies(0)
+    assert len(freq) == 200 and freq[0] < freq[-1]
+    assert reader.index_at(reader.start_time + 1.2) == 2
+    assert reader.index_at(reader.start_time - 10) == 0
+    assert reader.index_at(reader.end_time + 10) == 24
+    reader.close()
+
+
+def test_point_count_mismatch(tmp_path):
+    writer = CaptureWriter(str(tmp_path / "b.satcap"), 100)
+    with pytest.raises(ValueError):
+        writer.append(0.0, 0, 0, 1000.0, 100.0, 3700.0, 3800.0, np.zeros(50))
+    writer.close()
+
+
+def test_crashed_writer_keeps_written_records(tmp_path):
+    # 子进程写入后直接退出, 不关闭采集文件
+    path = str(tmp_path / "crash.satcap")
+    script = textwrap.dedent(f"""
+        import os, sys
+        sys.path.insert(0, {ROOT!r})
+        from satmon.capture import CaptureWriter
+        import numpy as np
+        writer = CaptureWriter({path!r}, 100, chunk_bytes=4096)
+        for i in range(37):
+            writer.append(writer.stamp(), 0, 0, 1000.0, 100.0, 3700.0, 3800.0, np.full(100, float(i)))
+        os._exit(1)
+    """)
+    subprocess.run([sys.executable, "-c", script], check=False, timeout=60)
+    _, n_points, count, _ = read_header(path)
+    assert n_points == 100 and count == 37
+    reader = CaptureReader(path)
+    np.testing.assert_array_equal(reader.psd[:, 0], np.arange(37))
+    assert np.all(np.diff(reader.timestamps) >= 0)
+    reader.close()
+
+
+def test_player_follows_capture_time(tmp_path):
+    path = str(tmp_path / "c.satcap")
+    writer, _ = record(path, 10, FakeClock())
+    writer.close()
+    reader = CaptureReader(path)
+    clock = FakeClock()
+    player = CapturePlayer(reader, clock=clock)
+    assert player.duration == pytest.approx(4.5)
+    assert player.next_index() == 0
+    assert player.next_index() is None
+    player.play()
+    clock.now += 1.0
+    assert player.next_index() == 2
+    player.set_speed(2.0)
+    clock.now += 1.0
+    assert player.next_index() == 6
+    player.pause()
+    clock.now += 10.0
+    assert player.next_index() is None
+    player.seek(reader.start_time + 1.6)
+    assert player.next_index() == 3
+    player.play()
+    clock.now += 10.0
+    assert player.next_index() == 9
+    assert not player.playing
+    reader.close()
@@ -0,0 +1,29 @@
+# 载波目录: 建立目录不应改动传入的卫星列表 (包括全局 CHINASAT_SATELLITES)
+import copy
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.catalog import Catalog
+from satmon.satellites import CHINASAT_SATELLITES
+
+
+def test_catalog_does_not_mutate_input():
+    satellites = [
+        {"name": "A", "bands": [], "carriers": [{"name": "a2", "freq": 3750.0, "bw": 1.0, "power": -60.0, "modulation": "QPSK"},
+                                               {"name": "a1", "freq": 3720.0, "bw": 1.0, "power": -60.0, "modulation": "QPSK"}]},
+    ]
+    before = copy.deepcopy(satellites)
+    carriers = satellites[0]["carriers"]
+    catalog = Catalog(satellites)
+    assert satellites == before
+    assert satellites[0]["carriers"] is carriers
+    assert [c["name"] for c in catalog.satellites[0]["carriers"]] == ["a1", "a2"]
+
+
+def test_default_catalog_keeps_global_list():
+    before = [sat["carriers"] for sat in CHINASAT_SATELLITES]
+    Catalog(CHINASAT_SATELLITES)
+    assert [sat["carriers"] for sat in CHINASAT_SATELLITES] == before
+    assert all(sat["carriers"] is carriers for sat, carriers in zip(CHINASAT_SATELLITES, before))
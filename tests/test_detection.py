@@ -0,0 +1,53 @@
+# 多载波检测: 配置载波为空时不应抛出异常; 高点数扫描按块抽取后检测频率不偏移
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.detection import CarrierDetector
+
+NOISE_FLOOR = -110.0
+
+
+def two_carrier_spectrum():
+    freq = np.linspace(3700.0, 3800.0, 2001)
+    psd = np.full_like(freq, NOISE_FLOOR)
+    for center in (3730.0, 3770.0):
+        psd = np.maximum(psd, -60.0 - ((freq - center) / 2.0) ** 2)
+    return freq, psd
+
+
+def test_detect_without_carriers():
+    freq, psd = two_carrier_spectrum()
+    report = CarrierDetector().detect(freq, psd, NOISE_FLOOR, [], timestamp=1.0)
+    assert len(report.detections) == 2
+    assert report.unknown == 2
+    assert report.missing == []
+    assert all(d.carrier is None for d in report.detections)
+
+
+def test_detect_matches_configured_carrier():
+    freq, psd = two_carrier_spectrum()
+    carriers = [{"name": "A", "freq": 3730.0, "bw": 6.0}, {"name": "B", "freq": 3790.0, "bw": 6.0}]
+    report = CarrierDetector().detect(freq, psd, NOISE_FLOOR, carriers)
+    assert [d.carrier for d in report.detections] == ["A", None]
+    assert report.unknown == 1
+    assert report.missing == ["B"]
+
+
+def test_decimated_detections_are_centred():
+    # 点数超过 max_points 时按块取峰值, 块频率取块中心而不是左端
+    detector = CarrierDetector()
+    centers = (3800.0, 3950.0, 4100.0)
+    for n_points in (100_000, 1_000_000):
+        freq = np.linspace(3700.0, 4200.0, n_points)
+        psd = np.full_like(freq, NOISE_FLOOR)
+        for center in centers:
+            psd = np.maximum(psd, -60.0 - 30.0 * ((freq - center) / 2.0) ** 2)
+        report = detector.detect(freq, psd, NOISE_FLOOR, [])
+        block = (freq[1] - freq[0]) * -(-n_points // detector.max_points)
+        assert len(report.detections) == len(centers)
+        for detection, center in zip(report.detections, centers):
+            assert abs(detection.freq - center) < block / 4
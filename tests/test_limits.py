@@ -0,0 +1,86 @@
+# 门限告警: 连续越限 debounce 次才告警, 滞回门限以内不解除, 回落后生成解除事件; 载波跌落报下限告警
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.limits import LimitMonitor
+
+NOISE_FLOOR = -110.0
+CARRIER = {"name": "A", "freq": 3750.0, "bw": 10.0, "power": -60.0, "modulation": "QPSK"}
+
+
+def grid():
+    return np.linspace(3700.0, 3800.0, 1001)
+
+
+def nominal(freq):
+    psd = np.full(len(freq), NOISE_FLOOR)
+    core = np.abs(freq - CARRIER["freq"]) <= CARRIER["bw"] / 2
+    psd[core] = CARRIER["power"]
+    return psd
+
+
+def with_spur(freq, level):
+    psd = nominal(freq)
+    psd[(freq >= 3720.0) & (freq <= 3721.0)] = level
+    return psd
+
+
+def test_alarm_after_debounce_and_clear_with_hysteresis():
+    freq = grid()
+    monitor = LimitMonitor(margin_db=10.0, hysteresis_db=2.0, debounce=3)
+    monitor.check(freq, nominal(freq), NOISE_FLOOR, [CARRIER], timestamp=0.0)
+    spur = with_spur(freq, NOISE_FLOOR + 20.0)
+    for t in (1.0, 2.0):
+        report = monitor.check(freq, spur, NOISE_FLOOR, [CARRIER], timestamp=t)
+        assert report.events == [] and len(report.ranges) == 0
+    report = monitor.check(freq, spur, NOISE_FLOOR, [CARRIER], timestamp=3.0)
+    assert [(e.state, e.kind) for e in report.events] == [("alarm", "over")]
+    event = report.events[0]
+    assert event.freq_min == pytest.approx(3720.0) and event.freq_max == pytest.approx(3721.0)
+    assert event.excess == pytest.approx(10.0)
+    assert monitor.alarms == 1
+    # 回落到门限以下但仍在滞回带内: 保持告警, 不重复报告
+    report = monitor.check(freq, with_spur(freq, NOISE_FLOOR + 9.0), NOISE_FLOOR, [CARRIER], timestamp=4.0)
+    assert report.events == [] and len(report.ranges) == 1
+    report = monitor.check(freq, nominal(freq), NOISE_FLOOR, [CARRIER], timestamp=5.0)
+    assert [(e.state, e.timestamp) for e in report.events] == [("clear", 5.0)]
+    assert len(report.ranges) == 0
+    assert monitor.alarms == 1
+
+
+def test_interrupted_violation_does_not_alarm():
+    freq = grid()
+    monitor = LimitMonitor(debounce=3)
+    spur = with_spur(freq, NOISE_FLOOR + 20.0)
+    for psd in (spur, spur, nominal(freq), spur, spur):
+        report = monitor.check(freq, psd, NOISE_FLOOR, [CARRIER])
+        assert report.events == []
+    assert monitor.alarms == 0
+
+
+def test_carrier_drop_raises_under_alarm():
+    freq = grid()
+    monitor = LimitMonitor(tolerance_db=6.0, debounce=1)
+    dropped = nominal(freq)
+    dropped[np.abs(freq - CARRIER["freq"]) <= 1.0] = CARRIER["power"] - 15.0
+    report = monitor.check(freq, dropped, NOISE_FLOOR, [CARRIER])
+    assert [(e.state, e.kind) for e in report.events] == [("alarm", "under")]
+    assert report.events[0].excess == pytest.approx(9.0)
+
+
+def test_band_segment_overrides_upper_limit():
+    freq = grid()
+    monitor = LimitMonitor(debounce=1)
+    segments = [{"min": 3710.0, "max": 3730.0, "upper": NOISE_FLOOR + 30.0}]
+    report = monitor.check(freq, with_spur(freq, NOISE_FLOOR + 20.0), NOISE_FLOOR, [CARRIER], segments)
+    assert report.events == []
+
+
+def test_debounce_is_validated():
+    with pytest.raises(ValueError):
+        LimitMonitor().configure(debounce=0)
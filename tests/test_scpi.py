@@ -0,0 +1,105 @@
+# SCPI 命令解析: 长短形式与可省略节点、数值单位、分号拆分、参数个数与错误队列、迹线数据格式
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.scpi import ScpiError, ScpiInstrument, parse_bool, parse_number, split_units
+from satmon.workspace import release
+
+
+def make_instrument(tmp_path="."):
+    engine = SpectrumEngine(sweep_points=200, seed=0)
+    return ScpiInstrument(engine, export_dir=str(tmp_path))
+
+
+def query(instrument, line):
+    return instrument.execute(line).decode().strip()
+
+
+def test_parse_number_units():
+    assert parse_number("10") == 10.0
+    assert parse_number("1.5 MHZ") == 1.5e6
+    assert parse_number("2.5e3khz") == 2.5e6
+    assert parse_number(".5", unit=1e6) == 0.5e6
+    assert parse_number("-30 DBM") == -30.0
+    with pytest.raises(ScpiError) as e:
+        parse_number("abc")
+    assert e.value.code == -224
+    with pytest.raises(ScpiError) as e:
+        parse_number("10 FURLONG")
+    assert e.value.code == -131
+
+
+def test_parse_bool_and_split_units():
+    assert parse_bool("on") and parse_bool("1")
+    assert not parse_bool("OFF") and not parse_bool("0")
+    with pytest.raises(ScpiError):
+        parse_bool("maybe")
+    assert split_units("*RST; BAND 1000 ;;BAND?") == ["*RST", "BAND 1000", "BAND?"]
+    assert split_units('MMEM:STOR:TRAC "a;b.csv"') == ['MMEM:STOR:TRAC "a;b.csv"']
+
+
+def test_long_short_and_optional_headers():
+    instrument = make_instrument()
+    engine = instrument.engine
+    instrument.execute("SENS:BAND:RES 2 kHz")
+    assert engine.rb == 2000.0
+    instrument.execute(":bandwidth 3000")
+    assert engine.rb == 3000.0
+    instrument.execute("sense:bandwidth:video 50")
+    assert engine.vb == 50.0
+    assert query(instrument, "BAND?;BAND:VID?") == "3000;50"
+    # 节点后缀数字 (SENSe1 等) 被忽略
+    assert query(instrument, "SENS1:BAND1?") == "3000"
+    assert query(instrument, "*IDN?").startswith("CHINASAT")
+    assert query(instrument, "SYST:ERR?") == '0,"No error"'
+
+
+def test_errors_are_queued():
+    instrument = make_instrument()
+    assert instrument.execute("FOO:BAR 1") == b""
+    instrument.execute("BAND")
+    instrument.execute("BAND 1,2")
+    instrument.execute("BAND abc")
+    instrument.execute("SWE:POIN 0")
+    codes = [int(query(instrument, "SYST:ERR?").split(",")[0]) for _ in range(6)]
+    assert codes == [-113, -109, -108, -224, -222, 0]
+
+
+def test_frequency_commands_set_span():
+    instrument = make_instrument()
+    engine = instrument.engine
+    lo, hi = engine.sweep_range
+    instrument.execute(f"FREQ:CENT {(lo + hi) / 2} MHz;FREQ:SPAN 10 MHz")
+    start, stop = engine.sweep_range
+    assert stop - start == pytest.approx(10.0)
+    assert float(query(instrument, "FREQ:STAR?")) == pytest.approx(start * 1e6)
+    instrument.execute("*RST")
+    assert engine.sweep_range == (lo, hi)
+
+
+def test_trace_data_formats(tmp_path):
+    instrument = make_instrument(tmp_path)
+    assert query(instrument, "TRAC?") == ""
+    assert int(query(instrument, "SYST:ERR?").split(",")[0]) == -230
+    sweep = instrument.engine.sweep()
+    instrument.update(sweep)
+    release(sweep)
+    data = instrument.execute("TRAC? TRACE1")
+    digits = int(data[1:2])
+    size = int(data[2:2 + digits])
+    values = np.frombuffer(data[2 + digits:2 + digits + size], dtype="<f4")
+    np.testing.assert_allclose(values, sweep.psd, rtol=1e-6)
+    instrument.execute("FORM ASC")
+    assert len(query(instrument, "TRAC?").split(",")) == len(sweep.psd)
+    instrument.execute("CALC:MARK:MAX")
+    assert float(query(instrument, "CALC:MARK:Y?")) == pytest.approx(sweep.psd.max(), abs=0.01)
+    instrument.execute('MMEM:STOR:TRAC "trace.csv"')
+    assert os.path.exists(tmp_path / "trace.csv")
+    instrument.execute('MMEM:STOR:TRAC "../escape.csv"')
+    assert int(query(instrument, "SYST:ERR?").split(",")[0]) == -257
@@ -0,0 +1,93 @@
+# 共享内存扫描环: 写入后读回的曲线与元数据一致, 读端持有的槽位不被覆盖, 持有数达到上限时不再取新帧
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.shm import SweepRing
+from satmon.workspace import release
+
+TRACES = ("psd", "max_hold", "min_hold")
+
+
+@pytest.fixture
+def ring():
+    ring = SweepRing.create(500, hold=3)
+    yield ring
+    ring.close()
+
+
+def make_engine():
+    engine = SpectrumEngine(sweep_points=500, seed=0)
+    engine.peak_search_enabled = True
+    return engine
+
+
+def copies(sweep):
+    return [getattr(sweep, name).astype(np.float32) for name in TRACES]
+
+
+def test_round_trip(ring):
+    engine = make_engine()
+    sweep = engine.sweep()
+    assert ring.read() is None
+    seq = ring.write(sweep)
+    seq_read, slot = ring.read()
+    assert seq_read == seq == 1
+    shared = ring.sweep(slot)
+    for name in TRACES:
+        np.testing.assert_array_equal(getattr(shared, name), getattr(sweep, name).astype(np.float32))
+    assert shared.avg is None
+    np.testing.assert_allclose(shared.freq, sweep.freq)
+    assert (shared.timestamp, shared.sat_idx, shared.rb, shared.peak_freq) == \
+        (sweep.timestamp, sweep.sat_idx, sweep.rb, pytest.approx(sweep.peak_freq))
+    assert ring.read(seq) is None
+    ring.unpin(slot)
+    release(sweep)
+
+
+def test_pinned_slots_survive_writes(ring):
+    engine = make_engine()
+    held = []
+    for _ in range(ring.hold):
+        sweep = engine.sweep()
+        expected = copies(sweep)
+        ring.write(sweep)
+        release(sweep)
+        seq, slot = ring.read()
+        held.append((slot, expected))
+    # 持有数已达上限: 不再取新帧, 写端只能轮换剩下的槽位
+    for _ in range(50):
+        sweep = engine.sweep()
+        ring.write(sweep)
+        release(sweep)
+        assert ring.read() is None
+    for slot, expected in held:
+        shared = ring.sweep(slot)
+        for name, values in zip(TRACES, expected):
+            np.testing.assert_array_equal(getattr(shared, name), values)
+    # 解除一个持有后又能读到最新一帧
+    ring.unpin(held[0][0])
+    assert ring.read() is not None
+
+
+def test_unpin_is_idempotent_and_safe_after_close():
+    ring = SweepRing.create(100, hold=2)
+    engine = SpectrumEngine(sweep_points=100, seed=0)
+    ring.write(engine.sweep())
+    _, slot = ring.read()
+    ring.unpin(slot)
+    ring.unpin(slot)
+    assert ring.pins == []
+    ring.close()
+    ring.unpin(slot)
+
+
+def test_rejects_oversized_sweep(ring):
+    engine = SpectrumEngine(sweep_points=1000, seed=0)
+    with pytest.raises(ValueError):
+        ring.write(engine.sweep())
@@ -0,0 +1,84 @@
+# 迹线存储区: 存满覆盖最早的一条, 迹线运算逐频点正确, 保存 / 加载后内容与顺序不变
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.tracebank import TraceBank
+
+FREQ = np.linspace(3700.0, 3800.0, 101)
+
+
+def level(value):
+    return np.full(len(FREQ), value)
+
+
+def test_store_overwrites_oldest_when_full():
+    bank = TraceBank(capacity=3)
+    for i in range(5):
+        bank.store_array(FREQ, level(-100.0 + i), name=f"T{i}")
+    assert len(bank) == 3
+    assert [bank.name(s) for s in bank.slots()] == ["T2", "T3", "T4"]
+    assert [bank.data[s][0] for s in bank.slots()] == [-98.0, -97.0, -96.0]
+
+
+def test_rejects_incompatible_grid():
+    bank = TraceBank()
+    bank.store_array(FREQ, level(-100.0))
+    with pytest.raises(ValueError):
+        bank.store_array(np.linspace(3700.0, 3900.0, 101), level(-100.0))
+    with pytest.raises(ValueError):
+        bank.store_array(np.linspace(3700.0, 3800.0, 51), np.zeros(51))
+    # 清空后可以换网格
+    bank.clear()
+    bank.store_array(np.linspace(3700.0, 3800.0, 51), np.zeros(51))
+    assert bank.n_points == 51
+
+
+def test_trace_math():
+    bank = TraceBank()
+    a = bank.store_array(FREQ, level(-90.0))
+    b = bank.store_array(FREQ, level(-100.0))
+    c = bank.store_array(FREQ, np.linspace(-110.0, -80.0, len(FREQ)))
+    diff = bank.difference(a, b)
+    assert bank.meta["relative"][diff]
+    np.testing.assert_array_equal(bank.data[diff], 10.0)
+    top = bank.reduce("max", [a, b, c])
+    np.testing.assert_array_equal(bank.data[top], np.maximum(-90.0, bank.data[c]))
+    bottom = bank.reduce("min", [a, b, c])
+    np.testing.assert_array_equal(bank.data[bottom], np.minimum(-100.0, bank.data[c]))
+    refs = bank.reference_difference([a, b, c], b)
+    assert len(refs) == 2
+    np.testing.assert_array_equal(bank.data[refs[0]], 10.0)
+    np.testing.assert_allclose(bank.data[refs[1]], bank.data[c] + 100.0)
+
+
+def test_visibility_and_version():
+    bank = TraceBank()
+    a = bank.store_array(FREQ, level(-90.0))
+    b = bank.store_array(FREQ, level(-95.0))
+    version = bank.version
+    bank.set_visible([a], False)
+    assert bank.version > version
+    assert list(bank.slots(visible_only=True)) == [b]
+    bank.remove([b])
+    assert list(bank.slots()) == [a]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    bank = TraceBank(capacity=3)
+    for i in range(4):
+        bank.store_array(FREQ, level(-100.0 + i), name=f"T{i}", timestamp=float(i))
+    path = str(tmp_path / "traces.npz")
+    bank.save(path)
+    loaded = TraceBank()
+    assert loaded.load(path) == 3
+    assert [loaded.name(s) for s in loaded.slots()] == ["T1", "T2", "T3"]
+    np.testing.assert_array_equal(loaded.data[loaded.slots()], bank.data[bank.slots()])
+    np.testing.assert_array_equal(loaded.grid(), FREQ)
+    # 加载后新存入的迹线排在最后
+    loaded.store_array(FREQ, level(-50.0), name="new")
+    assert loaded.name(loaded.slots()[-1]) == "new"
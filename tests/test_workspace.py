@@ -0,0 +1,104 @@
+# 工作区缓冲的生命周期: 仍被持有的扫描不会被后续扫描改写, 释放后的缓冲才被复用
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from satmon.engine import SpectrumEngine
+from satmon.pipeline import LatestSlot
+from satmon.workspace import BufferPool, SweepWorkspace, release, retain
+
+TRACES = ("psd", "max_hold", "min_hold", "avg")
+
+
+def snapshot(sweep):
+    return [getattr(sweep, name).copy() for name in TRACES]
+
+
+def unchanged(sweep, copies):
+    return all(np.array_equal(getattr(sweep, name), copy) for name, copy in zip(TRACES, copies))
+
+
+def make_engine():
+    engine = SpectrumEngine(sweep_points=500, seed=0)
+    engine.avg_enabled = True
+    return engine
+
+
+def test_held_sweep_survives_later_sweeps():
+    engine = make_engine()
+    held = engine.sweep()
+    copies = snapshot(held)
+    for _ in range(100):
+        release(engine.sweep())
+    assert unchanged(held, copies)
+    release(held)
+
+
+def test_unreleased_sweep_is_never_reused():
+    engine = make_engine()
+    held = engine.sweep()
+    copies = snapshot(held)
+    for _ in range(100):
+        engine.sweep()
+    assert unchanged(held, copies)
+
+
+def test_released_buffers_are_reused():
+    engine = make_engine()
+    for _ in range(5):
+        release(engine.sweep())
+    pooled = len(engine.workspace.pool.issued)
+    per_sweep = engine.workspace.last_allocations
+    for _ in range(50):
+        release(engine.sweep())
+    # 工作区不再新建缓冲; 剩下的只有滤波结果等固定的临时数组
+    assert len(engine.workspace.pool.issued) == pooled
+    assert engine.workspace.last_allocations == per_sweep <= 2
+
+
+def test_retained_sweep_needs_every_release():
+    engine = make_engine()
+    sweep = retain(engine.sweep())
+    copies = snapshot(sweep)
+    release(sweep)
+    for _ in range(20):
+        release(engine.sweep())
+    assert unchanged(sweep, copies)
+    release(sweep)
+
+
+def test_foreign_arrays_are_not_pooled():
+    workspace = SweepWorkspace(np.random.default_rng(0))
+    own = workspace.buffer(16)
+    foreign = np.zeros(16)
+    workspace.lease((own, foreign)).release()
+    assert workspace.buffer(16) is own
+    assert workspace.buffer(16) is not foreign
+
+
+def test_engines_share_a_pool():
+    pool = BufferPool()
+    engines = [SpectrumEngine(sat_idx=b, sweep_points=500, seed=b, pool=pool) for b in range(2)]
+    for _ in range(2):
+        for engine in engines:
+            release(engine.sweep())
+    issued = len(pool.issued)
+    for _ in range(20):
+        for engine in engines:
+            release(engine.sweep())
+    # 各引擎轮流扫描, 释放的缓冲被下一个引擎取用, 不按引擎数重复保留
+    assert len(pool.issued) == issued
+    assert len(pool.free) <= len(TRACES)
+
+
+def test_latest_slot_releases_dropped_frames():
+    engine = make_engine()
+    slot = LatestSlot(release)
+    first = engine.sweep()
+    slot.put(first)
+    slot.put(engine.sweep())
+    assert first.lease.count == 0
+    release(slot.take())